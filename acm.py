@@ -4,6 +4,7 @@ import os
 from dotenv import load_dotenv
 import sys
 import random
+import asyncio
 from datetime import datetime
 
 # Add the commands directory to the Python path
@@ -11,19 +12,96 @@ current_dir = os.path.dirname(os.path.abspath(__file__))
 commands_dir = os.path.join(current_dir, "commands")
 sys.path.append(commands_dir)
 
-# Load environment variables from config directory
+# Load environment variables once for every module: config/.env, then a .env in the working directory
 load_dotenv(os.path.join(current_dir, "config", ".env"))
+load_dotenv()
 
-# Bot setup with required intents
-intents = discord.Intents.default()
-intents.guilds = True
-intents.members = True
-bot = commands.Bot(command_prefix="‎ ", intents=intents)
+from http_client import start_session, close_session
+from renders import render_store
+from cache import warm_caches
+from nameindex import name_index
+from altgraph import alt_graph
+from diskcache import disk_cache
+from metrics import instrument_tree, start_metrics_server, stop_metrics_server
+from tree_sync import sync_commands
+from extensions import load_extensions
+from utils import log_error, log_info
+from gateway import gateway_options, memory_report, format_memory_report
+from ipc import cluster_client, shard_report, shard_connected_at, CLUSTER_ID, CLUSTER_REPORT_INTERVAL, SHARD_IDS, SHARD_COUNT
+
+# Started by cluster.py with a shard range, the bot runs those shards; otherwise it is a single unsharded bot
+BotBase = commands.AutoShardedBot if SHARD_IDS else commands.Bot
+
+class ACMBot(BotBase):
+    # Startup work that runs alongside commands; cancelled before the stores close
+    background_tasks = ()
+
+    async def setup_hook(self):
+        # Open the shared HTTP pool once the event loop is running
+        await start_session()
+        # Command modules are extensions so /reload can swap one without dropping the gateway
+        failed_extensions = await load_extensions(self)
+        # Record latency and errors for every registered command
+        instrument_tree(self)
+        # Refill the caches (registered by the modules just loaded) from disk so a restart doesn't stampede the upstreams
+        await warm_caches()
+        # The similar-names index can hold hundreds of thousands of names, so it loads in the background
+        loop = asyncio.get_running_loop()
+        self.background_tasks = [loop.create_task(name_index.warm())]
+        # Same for the alt clusters; /altcheck fetches alts live until they are loaded
+        self.background_tasks.append(loop.create_task(alt_graph.load()))
+        # The one-time rendertype.json import resolves every legacy name, so it never holds up a command
+        await render_store.open()
+        self.background_tasks.append(loop.create_task(render_store.migrate()))
+        # Prometheus endpoint on a local port
+        await start_metrics_server()
+        # Runs once per process (not on every reconnect) and only pushes a changed command tree;
+        # in a cluster the first process does it for everyone
+        if CLUSTER_ID == 0:
+            if failed_extensions:
+                # Syncing a partial tree would delete the failed modules' commands from Discord
+                log_error("Command Sync", "System", "setup_hook",
+                          f"Not syncing, these extensions failed to load: {', '.join(failed_extensions)}")
+            else:
+                await sync_commands(self)
+        if cluster_client.enabled:
+            try:
+                await cluster_client.connect()
+            except ConnectionError as e:
+                log_error("Cluster IPC", "System", "setup_hook", f"Launcher unreachable, using local rate limits: {e}")
+
+    async def before_identify_hook(self, shard_id, *, initial=False):
+        # The IDENTIFY limit is per bot, so processes take turns through the launcher
+        if cluster_client.enabled:
+            try:
+                await cluster_client.identify(shard_id)
+                return
+            except (ConnectionError, RuntimeError):
+                pass
+        await super().before_identify_hook(shard_id, initial=initial)
+
+    async def close(self):
+        await super().close()
+        # Stop the startup tasks first so none of them touches a store after it closed
+        for task in self.background_tasks:
+            task.cancel()
+        await asyncio.gather(*self.background_tasks, return_exceptions=True)
+        await close_session()
+        await render_store.close()
+        await alt_graph.close()
+        await disk_cache.close()
+        await stop_metrics_server()
+        await cluster_client.close()
+
+# Bot setup with the intents and caches of the configured MEMORY_PROFILE
+shard_options = {"shard_ids": SHARD_IDS, "shard_count": SHARD_COUNT} if SHARD_IDS else {}
+bot = ACMBot(command_prefix="‎ ", **gateway_options(), **shard_options)
 bot.start_time = datetime.now()
 
 # List of commands to rotate through
 COMMANDS = [
     "Alt Checker | /altcheck",
+    "Alt Checker | /lobbycheck",
     "Bedwars Stats | /bedwars",
     "Utility | /ping",
     "Utility | /help",
@@ -48,35 +126,36 @@ async def rotate_activity():
         )
     )
 
+@tasks.loop(seconds=CLUSTER_REPORT_INTERVAL)
+async def report_shards():
+    # Feeds the cluster-wide /info totals
+    try:
+        await cluster_client.report(shard_report(bot))
+    except (ConnectionError, RuntimeError) as e:
+        # An error reply must not stop the loop, or this process drops out of /info for good
+        log_error("Cluster IPC", "System", "report_shards", str(e))
+
+@bot.event
+async def on_connect():
+    if not SHARD_IDS:
+        shard_connected_at[0] = datetime.now().timestamp()
+
+@bot.event
+async def on_shard_connect(shard_id):
+    shard_connected_at[shard_id] = datetime.now().timestamp()
+
 @bot.event
 async def on_ready():
     print(f"Logged in as {bot.user}")
     print(f"Bot is in {len(bot.guilds)} servers:")
     for guild in bot.guilds:
         print(f"- {guild.name} (ID: {guild.id})")
-    await bot.tree.sync()
-    # Start the activity rotation
-    rotate_activity.start()
-
-# Load commands
-from altcheck import setup as setup_altcheck
-from setrender import setup as setup_setrender
-from suggest import setup as setup_suggest
-from requestchange import setup as setup_requestchange
-from discord_invite import setup as setup_discord
-from bedwars import setup as setup_bedwars
-from utility import setup as setup_utility
-from server import setup as setup_server
-
-# Setup commands
-setup_altcheck(bot)
-setup_setrender(bot)
-setup_suggest(bot)
-setup_requestchange(bot)
-setup_discord(bot)
-setup_bedwars(bot)
-setup_utility(bot)
-setup_server(bot)
+    # on_ready fires again after every reconnect; the rotation only needs starting once
+    if not rotate_activity.is_running():
+        log_info("Memory", "System", "on_ready", format_memory_report(memory_report(bot)))
+        rotate_activity.start()
+    if cluster_client.enabled and not report_shards.is_running():
+        report_shards.start()
 
 # Run bot
 bot.run(os.environ["TOKEN"])
\ No newline at end of file
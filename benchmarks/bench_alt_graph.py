@@ -0,0 +1,139 @@
+"""Benchmark: alt cluster lookups from the union-find alt graph at a million edges.
+
+Writes a synthetic alt graph (heavy-tailed cluster sizes, a spanning tree per cluster
+plus some extra links) into a temporary altgraph database, then reports how long
+AltGraph.load() takes and the memory it uses, cluster() latency with and without the
+ALT_CLUSTER_LIMIT cap, record() latency for new edges, and, for comparison, the same
+lookups as a recursive SQL query over the edges table.
+
+    python benchmarks/bench_alt_graph.py --edges 1000000 --lookups 5000
+"""
+import argparse
+import asyncio
+import os
+import random
+import sqlite3
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(os.path.join(ROOT, "commands"))
+
+import psutil
+from altgraph import AltGraph, SCHEMA
+
+COMPONENT_QUERY = """
+WITH RECURSIVE component(id) AS (
+    SELECT ?
+    UNION SELECT b FROM edges JOIN component ON a = id
+    UNION SELECT a FROM edges JOIN component ON b = id
+)
+SELECT COUNT(*) FROM component
+"""
+
+def make_graph(edge_count, seed):
+    """Return (player count, edges): clusters of Pareto-distributed size until edge_count edges"""
+    rnd = random.Random(seed)
+    edges = set()
+    next_id = 1
+    while len(edges) < edge_count:
+        size = min(5000, int(rnd.paretovariate(1.6)) + 1)
+        members = range(next_id, next_id + size)
+        next_id += size
+        # Each new member links to an earlier one, and about a third get a second link
+        for offset in range(1, size):
+            member = members[offset]
+            edges.add((rnd.choice(members[:offset]), member))
+            if offset > 1 and rnd.random() < 0.3:
+                other = rnd.choice(members[:offset])
+                edges.add((min(other, member), max(other, member)))
+    return next_id - 1, sorted(edges)[:edge_count]
+
+def write_graph(path, players, edges):
+    conn = sqlite3.connect(path, isolation_level=None)
+    conn.executescript(SCHEMA)
+    with conn:
+        conn.execute("BEGIN")
+        conn.executemany("INSERT INTO players (id, uuid, name, checked_at) VALUES (?, ?, ?, ?)",
+                         ((i, f"{i:032x}", f"Player_{i}", time.time()) for i in range(1, players + 1)))
+        conn.executemany("INSERT INTO edges (a, b, seen_at) VALUES (?, ?, ?)", ((a, b, time.time()) for a, b in edges))
+    conn.close()
+
+def percentile(values, fraction):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * fraction))]
+
+def describe(timings):
+    return (f"p50 {percentile(timings, 0.5) * 1000:.3f}ms  p99 {percentile(timings, 0.99) * 1000:.3f}ms  "
+            f"max {max(timings) * 1000:.3f}ms")
+
+async def run(args, path, players):
+    graph = AltGraph(path)
+    rss_before = psutil.Process().memory_info().rss
+    started = time.perf_counter()
+    await graph.load()
+    load = time.perf_counter() - started
+    stats = graph.stats()
+    print(f"load: {stats['edges']:,} edges, {stats['players']:,} players, {stats['clusters']:,} clusters "
+          f"(largest {stats['largest']:,}) in {load:.2f}s, ~{(psutil.Process().memory_info().rss - rss_before) / 1024 / 1024:.0f} MiB RSS")
+
+    rnd = random.Random(args.seed + 1)
+    uuids = [f"{rnd.randint(1, players):032x}" for _ in range(args.lookups)]
+    for limit in (args.limit, None):
+        timings, sizes = [], []
+        for uuid in uuids:
+            started = time.perf_counter()
+            cluster = await graph.cluster(uuid, limit=limit)
+            timings.append(time.perf_counter() - started)
+            sizes.append(cluster["size"])
+        print(f"cluster(limit={limit}): {describe(timings)}  (mean cluster size {sum(sizes) / len(sizes):.1f})")
+
+    # The union-find part alone, without the SQLite round trips for the player's ID and names
+    ids = [int(uuid, 16) for uuid in uuids]
+    started = time.perf_counter()
+    for player_id in ids:
+        graph._members(graph._find(player_id))
+    print(f"in-memory find + members: {(time.perf_counter() - started) / len(ids) * 1e6:.1f}us per lookup")
+
+    timings = []
+    for i in range(args.records):
+        # A new player with three alts, one of them already in some cluster
+        alts = [(f"{players + 10 * i + j + 1:032x}", f"New_{i}_{j}") for j in range(2)] + [(rnd.choice(uuids), "Existing")]
+        started = time.perf_counter()
+        await graph.record(f"{players + 10 * i:032x}", f"New_{i}", alts)
+        timings.append(time.perf_counter() - started)
+    print(f"record (3 alts): {describe(timings)}")
+
+    # Correctness and baseline: recursive SQL over the edges, with an index on b so it can walk both ways
+    conn = sqlite3.connect(path)
+    conn.execute("CREATE INDEX IF NOT EXISTS edges_b ON edges (b)")
+    timings, mismatches = [], 0
+    for uuid in uuids[:args.sql_lookups]:
+        player_id = int(uuid, 16)
+        started = time.perf_counter()
+        size = conn.execute(COMPONENT_QUERY, (player_id,)).fetchone()[0]
+        timings.append(time.perf_counter() - started)
+        mismatches += size != graph._size[graph._find(player_id)]
+    conn.close()
+    print(f"recursive SQL component: {describe(timings)}  "
+          f"(cluster sizes match on {len(timings) - mismatches}/{len(timings)})")
+    await graph.close()
+
+def main(args):
+    started = time.perf_counter()
+    players, edges = make_graph(args.edges, args.seed)
+    path = os.path.join(tempfile.mkdtemp(prefix="bench_alt_graph_"), "altgraph.db")
+    write_graph(path, players, edges)
+    print(f"generated {len(edges):,} edges between {players:,} players in {time.perf_counter() - started:.1f}s")
+    asyncio.run(run(args, path, players))
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--edges", type=int, default=1000000)
+    parser.add_argument("--lookups", type=int, default=5000)
+    parser.add_argument("--limit", type=int, default=10, help="ALT_CLUSTER_LIMIT for the capped lookups")
+    parser.add_argument("--records", type=int, default=500)
+    parser.add_argument("--sql-lookups", type=int, default=200)
+    parser.add_argument("--seed", type=int, default=1)
+    main(parser.parse_args())
@@ -0,0 +1,55 @@
+"""Micro-benchmark: per-field extract_value scans vs. the single-pass bwstats parser.
+
+Parses every saved page in benchmarks/samples/ with both approaches and reports
+the per-page parse time.
+
+    python benchmarks/bench_bwstats_parse.py --iterations 20000
+"""
+import argparse
+import glob
+import os
+import sys
+import timeit
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(os.path.join(ROOT, "commands"))
+
+from bwstats import parse_bwstats
+
+def extract_value(text, start_delimiter, end_delimiter):
+    """The previous helper: one str.find scan per field"""
+    start_index = text.find(start_delimiter)
+    if start_index == -1:
+        return "0"
+    start_index += len(start_delimiter)
+    end_index = text.find(end_delimiter, start_index)
+    return text[start_index:end_index].strip() if end_index != -1 else "0"
+
+def legacy_parse(html):
+    """The previous nine-scan parse, with the star glyph stripped so it can run on UTF-8 pages"""
+    fields = {}
+    for label, key in (("Final Kills", "final_kills"), ("Final Deaths", "final_deaths"), ("Wins", "wins"),
+                       ("Losses", "losses"), ("Beds Broken", "beds_broken"), ("Beds Lost", "beds_lost"),
+                       ("Kills", "kills"), ("Deaths", "deaths")):
+        fields[key] = int(extract_value(html, f"<td>{label}</td><td>", "</td>").replace(",", ""))
+    stars = extract_value(html, "Level: ", " ").replace(",", "")
+    fields["stars"] = int("".join(char for char in stars if char.isdigit()) or 0)
+    return fields
+
+def main(args):
+    pages = sorted(glob.glob(os.path.join(ROOT, "benchmarks", "samples", "*.html")))
+    print(f"{args.iterations} parses per page")
+    for path in pages:
+        with open(path, encoding="utf-8") as f:
+            html = f.read()
+        parsed = parse_bwstats(html)
+        legacy = min(timeit.repeat(lambda: legacy_parse(html), number=args.iterations, repeat=3)) / args.iterations
+        single = min(timeit.repeat(lambda: parse_bwstats(html), number=args.iterations, repeat=3)) / args.iterations
+        print(f"  {os.path.basename(path):<22} {len(html):6d} bytes  "
+              f"extract_value {legacy * 1e6:7.2f} us  single-pass {single * 1e6:7.2f} us  "
+              f"missing={list(parsed.missing)}")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--iterations", type=int, default=20000)
+    main(parser.parse_args())
@@ -0,0 +1,90 @@
+"""Benchmark: first /altcheck burst after a cold restart vs. a restart warmed from the disk cache.
+
+Starts local stand-ins for Mojang, bwstats, Polsu and Urchin (fixed latency, request
+counters), runs the altcheck pipeline for a set of players against an empty disk cache,
+then simulates a restart: the in-memory caches are dropped, the disk cache is closed
+and reopened, warm_caches() reloads the working set, and the same burst runs again.
+
+    python benchmarks/bench_cache_restart.py --players 200 --alts 3 --latency 50
+"""
+import argparse
+import asyncio
+import os
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(os.path.join(ROOT, "commands"))
+
+from fake_upstreams import FakeUpstreams, make_players
+
+async def altcheck_pipeline(name):
+    """The upstream work /altcheck does for one player"""
+    from mojang import resolve_username
+    from bwstats import get_final_kd
+    from polsu import fetch_quickbuy_alts
+    from urchin import fetch_urchin_data
+    from alts import resolve_alts
+
+    profile = await resolve_username(name)
+    _, quickbuy, _ = await asyncio.gather(
+        get_final_kd(profile["id"]),
+        fetch_quickbuy_alts(profile["id"]),
+        fetch_urchin_data(profile["name"])
+    )
+    return await resolve_alts(quickbuy or [])
+
+async def run_burst(label, names, counters):
+    counters.clear()
+    started = time.perf_counter()
+    await asyncio.gather(*(altcheck_pipeline(name) for name in names))
+    elapsed = time.perf_counter() - started
+    print(f"  {label:<14} {elapsed * 1000:8.1f} ms  upstream requests: "
+          + "  ".join(f"{upstream} {counters[upstream]:4d}" for upstream in ("mojang", "bwstats", "polsu", "urchin")))
+    return elapsed, dict(counters)
+
+async def main(args):
+    import http_client
+    import diskcache
+    from cache import caches, warm_caches
+
+    players, mains, alts = make_players(args.players, args.alts)
+    upstreams = FakeUpstreams(players, alts, args.latency / 1000)
+    await upstreams.start()
+    upstreams.install()
+    counters = upstreams.counters
+
+    with tempfile.TemporaryDirectory() as directory:
+        diskcache.disk_cache.path = os.path.join(directory, "cache.db")
+        names = [profile["name"] for profile in mains]
+        print(f"{args.players} players x {args.alts} alts, {args.latency} ms upstream latency")
+
+        await diskcache.disk_cache.open()
+        await run_burst("cold restart", names, counters)
+
+        # Restart: drop everything in memory, flush and reopen the disk cache, then warm up
+        await diskcache.disk_cache.close()
+        for cache in caches.values():
+            cache.clear()
+        started = time.perf_counter()
+        loaded = await warm_caches()
+        print(f"  warm load      {(time.perf_counter() - started) * 1000:8.1f} ms  "
+              f"{sum(loaded.values())} entries ({', '.join(f'{k} {v}' for k, v in loaded.items())})")
+        await run_burst("warm restart", names, counters)
+        await diskcache.disk_cache.close()
+
+    await http_client.close_session()
+    await upstreams.stop()
+
+if __name__ == "__main__":
+    os.environ.setdefault("POLSU_KEY", "bench")
+    os.environ.setdefault("URCHIN_KEY", "bench")
+    # Measure the caches/batching, not the production rate limits
+    for upstream in ("MOJANG", "BWSTATS", "POLSU", "URCHIN"):
+        os.environ.setdefault(f"{upstream}_RATE", "0")
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--players", type=int, default=200)
+    parser.add_argument("--alts", type=int, default=3)
+    parser.add_argument("--latency", type=float, default=50, help="fake upstream latency in ms")
+    asyncio.run(main(parser.parse_args()))
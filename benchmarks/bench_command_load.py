@@ -0,0 +1,250 @@
+"""Load test: the registered slash command handlers under concurrent invocations.
+
+Builds a bot with every command extension loaded, pulls the callbacks out of
+bot.tree and replays a command mix at a target rate (open loop, so a slow handler
+does not slow down arrivals). Each call gets a fake discord.Interaction whose
+response/followup record when the handler deferred and replied, with an optional
+simulated Discord API latency. Upstreams are the local stand-ins from
+fake_upstreams.py and logging goes through the real queue-backed logger (to a
+temporary file). Reports per-command outcomes, time to first response and
+completion percentiles, plus event-loop lag sampled during the run.
+
+    python benchmarks/bench_command_load.py --rate 100 --duration 20 --mix bedwars=60,altcheck=30,help=10
+"""
+import argparse
+import asyncio
+import math
+import os
+import random
+import sys
+import tempfile
+import time
+from collections import defaultdict
+
+import discord
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(os.path.join(ROOT, "commands"))
+
+from fake_upstreams import FakeUpstreams, make_players
+
+HELP_TOPICS = (None, "altcheck", "bedwars", "setrender")
+
+class FakeUser:
+    def __init__(self, user_id):
+        self.id = user_id
+        self.name = f"loadtest_{user_id}"
+        self.display_name = self.name
+        self.mention = f"<@{user_id}>"
+        self.avatar = None
+        self.display_avatar = None
+        self.guild = None
+
+class FakeResponse:
+    """Stands in for InteractionResponse and records when the handler first responded"""
+
+    def __init__(self, call):
+        self.call = call
+        self._done = False
+
+    def is_done(self):
+        return self._done
+
+    async def _respond(self, **kwargs):
+        if self._done:
+            raise RuntimeError("interaction already responded to")
+        await asyncio.sleep(self.call.api_latency)
+        self._done = True
+        self.call.first_response = time.perf_counter()
+        self.call.messages.append(kwargs)
+
+    async def defer(self, ephemeral=False, thinking=False):
+        await self._respond(deferred=True)
+
+    async def send_message(self, content=None, **kwargs):
+        await self._respond(content=content, **kwargs)
+
+class FakeFollowup:
+    """Stands in for the followup webhook"""
+
+    def __init__(self, call):
+        self.call = call
+
+    async def send(self, content=None, **kwargs):
+        await asyncio.sleep(self.call.api_latency)
+        self.call.messages.append({"content": content, **kwargs})
+
+class Call:
+    """Timings and messages for one invocation"""
+
+    def __init__(self, command, api_latency):
+        self.command = command
+        self.api_latency = api_latency
+        self.messages = []
+        self.started = None
+        self.first_response = None
+        self.finished = None
+        self.exception = None
+
+    @property
+    def outcome(self):
+        if self.exception is not None:
+            return "exception"
+        if any(str(message.get("content") or "").startswith("An error occurred") for message in self.messages):
+            return "error"
+        return "ok"
+
+def fake_interaction(call, interaction_id):
+    """A real discord.Interaction instance (so isinstance checks pass) with recording response/followup"""
+    interaction = discord.Interaction.__new__(discord.Interaction)
+    interaction.id = interaction_id
+    interaction.user = FakeUser(1000 + interaction_id % 500)
+    interaction.guild_id = None
+    interaction.channel = None
+    interaction._state = None
+    interaction._cs_response = FakeResponse(call)
+    interaction._cs_followup = FakeFollowup(call)
+    return interaction
+
+def parse_mix(text):
+    mix = {}
+    for part in text.split(","):
+        name, _, weight = part.partition("=")
+        mix[name.strip()] = float(weight or 1)
+    return mix
+
+def percentile(ordered, q):
+    """Nearest-rank percentile of an already sorted list"""
+    if not ordered:
+        return None
+    return ordered[max(0, math.ceil(q * len(ordered)) - 1)]
+
+def describe(values):
+    ordered = sorted(values)
+    if not ordered:
+        return "-"
+    return "  ".join(f"{label} {percentile(ordered, q) * 1000:7.1f}" for label, q in (("p50", 0.5), ("p95", 0.95), ("p99", 0.99))) \
+        + f"  max {ordered[-1] * 1000:7.1f}"
+
+async def monitor_loop_lag(interval, samples, stop):
+    """Sleep for interval and record how late the loop woke us up"""
+    while not stop.is_set():
+        expected = time.perf_counter() + interval
+        await asyncio.sleep(interval)
+        samples.append(max(0.0, time.perf_counter() - expected))
+
+async def build_bot():
+    from discord.ext import commands
+    from extensions import load_extensions
+
+    bot = commands.Bot(command_prefix="!", intents=discord.Intents.default())
+    await load_extensions(bot)
+    return bot
+
+def arguments_for(command, mains, rng):
+    if command in ("bedwars", "altcheck"):
+        return {"username": rng.choice(mains)["name"]}
+    if command == "help":
+        return {"command": rng.choice(HELP_TOPICS)}
+    return {}
+
+async def main(args):
+    import http_client
+    from renders import render_store
+
+    mix = parse_mix(args.mix)
+    bot = await build_bot()
+    callbacks = {}
+    for name in mix:
+        command = bot.tree.get_command(name)
+        if command is None:
+            raise SystemExit(f"Unknown command: /{name}")
+        callbacks[name] = command.callback
+
+    players, mains, alts = make_players(args.players, args.alts)
+    upstreams = FakeUpstreams(players, alts, args.latency / 1000, args.jitter / 1000, args.error_rate)
+    await upstreams.start()
+    upstreams.install()
+
+    rng = random.Random(1)
+    names, weights = list(mix), list(mix.values())
+    total = int(args.rate * args.duration)
+    api_latency = args.discord_latency / 1000
+    calls = []
+
+    async def invoke(call, interaction, kwargs):
+        call.started = time.perf_counter()
+        try:
+            await callbacks[call.command](interaction, **kwargs)
+        except Exception as e:
+            call.exception = e
+        call.finished = time.perf_counter()
+
+    lag_samples = []
+    stop = asyncio.Event()
+    with tempfile.TemporaryDirectory() as directory:
+        render_store.path = os.path.join(directory, "renders.db")
+        render_store.json_path = os.path.join(directory, "rendertype.json")
+        print(f"{total} calls at {args.rate}/s ({args.mix}), {args.players} players, "
+              f"upstream latency {args.latency}±{args.jitter} ms, Discord latency {args.discord_latency} ms")
+
+        monitor = asyncio.create_task(monitor_loop_lag(args.lag_interval / 1000, lag_samples, stop))
+        tasks = []
+        started = time.perf_counter()
+        for i in range(total):
+            # Open loop: wait for the scheduled arrival time, not for earlier calls to finish
+            delay = started + i / args.rate - time.perf_counter()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            call = Call(rng.choices(names, weights)[0], api_latency)
+            calls.append(call)
+            tasks.append(asyncio.create_task(invoke(call, fake_interaction(call, i + 1), arguments_for(call.command, mains, rng))))
+        offered = time.perf_counter() - started
+        await asyncio.gather(*tasks)
+        elapsed = time.perf_counter() - started
+        stop.set()
+        await monitor
+        await render_store.close()
+
+    await http_client.close_session()
+    await upstreams.stop()
+
+    by_command = defaultdict(list)
+    for call in calls:
+        by_command[call.command].append(call)
+    print(f"Offered {len(calls) / offered:.1f} calls/s over {offered:.1f}s, all finished after {elapsed:.1f}s")
+    for name, group in sorted(by_command.items()):
+        outcomes = defaultdict(int)
+        for call in group:
+            outcomes[call.outcome] += 1
+        print(f"/{name}: {len(group)} calls, " + ", ".join(f"{outcome} {count}" for outcome, count in sorted(outcomes.items())))
+        print(f"  first response ms  {describe([call.first_response - call.started for call in group if call.first_response])}")
+        print(f"  completion ms      {describe([call.finished - call.started for call in group])}")
+        for call in group:
+            if call.exception is not None:
+                print(f"  first exception: {call.exception!r}")
+                break
+    print(f"Event loop lag ms    {describe(lag_samples)}  ({len(lag_samples)} samples every {args.lag_interval:g} ms)")
+    print("Upstream requests    " + "  ".join(f"{upstream} {count}" for upstream, count in sorted(upstreams.counters.items())))
+
+if __name__ == "__main__":
+    for key, value in {"POLSU_KEY": "bench", "URCHIN_KEY": "bench", "ADMIN_IDS": "1", "SUGGESTIONS": "1", "RENDERS": "1"}.items():
+        os.environ.setdefault(key, value)
+    # Measure the command layer, not the production rate limits; keep logging off the console
+    for upstream in ("MOJANG", "BWSTATS", "POLSU", "URCHIN"):
+        os.environ.setdefault(f"{upstream}_RATE", "0")
+    os.environ.setdefault("LOG_STDOUT", "0")
+    os.environ.setdefault("LOG_DIR", tempfile.mkdtemp(prefix="acm-load-logs-"))
+
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--mix", default="bedwars=60,altcheck=30,help=10", help="command=weight pairs")
+    parser.add_argument("--rate", type=float, default=50, help="target invocations per second")
+    parser.add_argument("--duration", type=float, default=10, help="seconds of arrivals")
+    parser.add_argument("--players", type=int, default=500, help="distinct usernames to look up")
+    parser.add_argument("--alts", type=int, default=3, help="quickbuy alts per player")
+    parser.add_argument("--latency", type=float, default=50, help="fake upstream latency in ms")
+    parser.add_argument("--jitter", type=float, default=10, help="uniform +/- jitter on the upstream latency in ms")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="share of upstream requests answered with 503")
+    parser.add_argument("--discord-latency", type=float, default=30, help="simulated Discord API latency per response in ms")
+    parser.add_argument("--lag-interval", type=float, default=10, help="event loop lag sampling interval in ms")
+    asyncio.run(main(parser.parse_args()))
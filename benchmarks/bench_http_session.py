@@ -0,0 +1,136 @@
+"""Benchmark: one ClientSession per call vs. the shared pooled session.
+
+Starts a local TLS stand-in for bwstats.shivam.pro and Urchin, then runs the
+same fetches twice: once opening a new ClientSession per call (the old
+pattern) and once through the bot-wide session from http_client. Reports wall
+time and the number of TCP/TLS connections the stand-in accepted.
+
+    python benchmarks/bench_http_session.py --requests 200 --concurrency 20
+"""
+import argparse
+import asyncio
+import os
+import ssl
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(os.path.join(ROOT, "commands"))
+
+BWSTATS_PAGE = (
+    "<html><body><div>Level: 312✫ </div><table>"
+    "<tr><td>Final Kills</td><td>4,210</td></tr>"
+    "<tr><td>Final Deaths</td><td>1,337</td></tr>"
+    "</table></body></html>"
+)
+
+def make_certificate(directory):
+    """Create a throwaway self-signed certificate for 127.0.0.1"""
+    cert = os.path.join(directory, "cert.pem")
+    key = os.path.join(directory, "key.pem")
+    subprocess.run(
+        ["openssl", "req", "-x509", "-newkey", "rsa:2048", "-nodes", "-days", "1",
+         "-subj", "/CN=127.0.0.1", "-addext", "subjectAltName=IP:127.0.0.1",
+         "-keyout", key, "-out", cert],
+        check=True, capture_output=True
+    )
+    return cert, key
+
+async def start_stand_in(cert, key):
+    from aiohttp import web
+
+    peers = set()
+
+    async def bwstats(request):
+        peers.add(request.transport.get_extra_info("peername"))
+        return web.Response(text=BWSTATS_PAGE, content_type="text/html")
+
+    async def urchin(request):
+        peers.add(request.transport.get_extra_info("peername"))
+        return web.json_response({"uuid": request.match_info["name"], "tags": []})
+
+    app = web.Application()
+    app.router.add_get("/user/{uuid}", bwstats)
+    app.router.add_get("/player/{name}", urchin)
+    runner = web.AppRunner(app, access_log=None)
+    await runner.setup()
+    context = ssl.create_default_context(ssl.Purpose.CLIENT_AUTH)
+    context.load_cert_chain(cert, key)
+    site = web.TCPSite(runner, "127.0.0.1", 0, ssl_context=context)
+    await site.start()
+    port = site._server.sockets[0].getsockname()[1]
+    return runner, port, peers
+
+async def run_batch(fetch, total, concurrency):
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def one(i):
+        async with semaphore:
+            await fetch(i)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(one(i) for i in range(total)))
+    return time.perf_counter() - started
+
+async def main(args):
+    import aiohttp
+    import http_client
+    import bwstats
+    import urchin
+
+    base = f"https://127.0.0.1:{args.port}"
+    http_client.BWSTATS_URL = base
+    http_client.URCHIN_API_URL = base
+    bwstats.BWSTATS_URL = base
+    urchin.URCHIN_API_URL = base
+
+    async def per_call_session(i):
+        # The pre-pool pattern: a new connector, DNS lookup and TLS handshake per call
+        async with aiohttp.ClientSession() as session:
+            async with session.get(f"{base}/user/{i:032x}") as response:
+                await response.text()
+        async with aiohttp.ClientSession() as session:
+            async with session.get(f"{base}/player/alt{i}?api_key=x") as response:
+                await response.json()
+
+    async def shared_session(i):
+        await bwstats.fetch_bwstats(f"{i:032x}")
+        await urchin.fetch_urchin_data(f"alt{i}", "x")
+
+    results = {}
+    for label, fetch in (("per-call session", per_call_session), ("shared session", shared_session)):
+        args.peers.clear()
+        elapsed = await run_batch(fetch, args.requests, args.concurrency)
+        results[label] = (elapsed, len(args.peers))
+        await http_client.close_session()
+
+    print(f"{args.requests} iterations x 2 upstream calls, concurrency {args.concurrency}")
+    for label, (elapsed, connections) in results.items():
+        print(f"  {label:<17} {elapsed * 1000:8.1f} ms  {connections:5d} TLS connections  "
+              f"{elapsed * 1000 / args.requests:6.2f} ms/iteration")
+
+async def bootstrap(args):
+    with tempfile.TemporaryDirectory() as directory:
+        cert, key = make_certificate(directory)
+        # Trust the throwaway certificate through the default SSL context
+        os.environ["SSL_CERT_FILE"] = cert
+        runner, args.port, args.peers = await start_stand_in(cert, key)
+        try:
+            await main(args)
+        finally:
+            await runner.cleanup()
+
+if __name__ == "__main__":
+    os.environ.setdefault("POLSU_KEY", "bench")
+    os.environ.setdefault("URCHIN_KEY", "bench")
+    # Measure the connection pool, not the production rate limits
+    for upstream in ("BWSTATS", "URCHIN"):
+        os.environ.setdefault(f"{upstream}_RATE", "0")
+    os.environ.setdefault("LOG_STDOUT", "0")
+    os.environ.setdefault("LOG_DIR", tempfile.mkdtemp(prefix="acm-session-logs-"))
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=20)
+    asyncio.run(bootstrap(parser.parse_args()))
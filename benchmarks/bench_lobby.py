@@ -0,0 +1,118 @@
+"""Benchmark: one /lobbycheck against N separate /altcheck commands for the same lobby size.
+
+Runs the real command handlers against the local fake upstreams (fake_upstreams.py)
+for lobbies of --size players, three ways: N /altcheck commands one after another (a
+staff member checking a lobby by hand), N /altcheck commands at once, and a single
+/lobbycheck. Every round uses players no earlier round has seen, so no answer comes
+from a cache. Reports the time until the whole lobby is answered and the upstream
+requests each way made, including the background alt graph recording.
+
+    python benchmarks/bench_lobby.py --size 16 --rounds 5 --latency 80
+"""
+import argparse
+import asyncio
+import os
+import statistics
+import sys
+import tempfile
+import time
+from collections import Counter
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(os.path.join(ROOT, "commands"))
+
+from fake_upstreams import FakeUpstreams, make_players
+from bench_command_load import Call, build_bot, fake_interaction
+
+async def run_round(mode, callbacks, lobby, api_latency, interaction_ids):
+    """Check one lobby; returns (seconds until every player was answered, calls)"""
+    names = [profile["name"] for profile in lobby]
+    if mode == "lobbycheck":
+        invocations = [("lobbycheck", {"usernames": " ".join(names)})]
+    else:
+        invocations = [("altcheck", {"username": name}) for name in names]
+    calls = [Call(command, api_latency) for command, _ in invocations]
+
+    async def invoke(call, kwargs):
+        await callbacks[call.command](fake_interaction(call, next(interaction_ids)), **kwargs)
+
+    started = time.perf_counter()
+    if mode == "sequential":
+        for call, (_, kwargs) in zip(calls, invocations):
+            await invoke(call, kwargs)
+    else:
+        await asyncio.gather(*(invoke(call, kwargs) for call, (_, kwargs) in zip(calls, invocations)))
+    return time.perf_counter() - started, calls
+
+async def drain(flights):
+    """Wait for background work (alt graph recording, refreshes) so it is not billed to the next round"""
+    while flights._inflight:
+        await asyncio.gather(*list(flights._inflight.values()), return_exceptions=True)
+
+async def main(args):
+    import http_client
+    from renders import render_store
+    from diskcache import disk_cache
+    from altgraph import alt_graph
+    from singleflight import flights
+
+    bot = await build_bot()
+    callbacks = {name: bot.tree.get_command(name).callback for name in ("altcheck", "lobbycheck")}
+    modes = ("sequential", "concurrent", "lobbycheck")
+
+    # Enough players that every round of every mode gets its own lobby
+    players, mains, alts = make_players(args.size * args.rounds * len(modes), args.alts)
+    upstreams = FakeUpstreams(players, alts, args.latency / 1000, args.jitter / 1000)
+    await upstreams.start()
+    upstreams.install()
+    await alt_graph.load()
+
+    api_latency = args.discord_latency / 1000
+    interaction_ids = iter(range(1, 10 ** 9))
+    print(f"lobbies of {args.size} players with {args.alts} alts each, {args.rounds} rounds, "
+          f"upstream latency {args.latency}±{args.jitter} ms, Discord latency {args.discord_latency} ms")
+    with tempfile.TemporaryDirectory() as directory:
+        render_store.path = os.path.join(directory, "renders.db")
+        render_store.json_path = os.path.join(directory, "rendertype.json")
+        lobbies = iter(mains[start:start + args.size] for start in range(0, len(mains), args.size))
+        for mode in modes:
+            timings, failures = [], 0
+            before = Counter(upstreams.counters)
+            for _ in range(args.rounds):
+                elapsed, calls = await run_round(mode, callbacks, next(lobbies), api_latency, interaction_ids)
+                timings.append(elapsed)
+                await drain(flights)
+                failures += sum(call.outcome != "ok" for call in calls)
+            requests = Counter(upstreams.counters)
+            requests.subtract(before)
+            label = f"{args.size} x /altcheck {mode}" if mode != "lobbycheck" else "1 x /lobbycheck"
+            print(f"{label:<28} median {statistics.median(timings) * 1000:7.0f} ms  max {max(timings) * 1000:7.0f} ms  "
+                  f"failed {failures}  upstream requests per lobby: "
+                  + "  ".join(f"{upstream} {count / args.rounds:.0f}" for upstream, count in sorted(requests.items())))
+        await render_store.close()
+
+    await alt_graph.close()
+    await disk_cache.close()
+    await http_client.close_session()
+    await upstreams.stop()
+
+if __name__ == "__main__":
+    data = tempfile.mkdtemp(prefix="bench_lobby_")
+    for key, value in {"POLSU_KEY": "bench", "URCHIN_KEY": "bench", "ADMIN_IDS": "1", "SUGGESTIONS": "1", "RENDERS": "1",
+                       "CACHE_DB_PATH": os.path.join(data, "cache.db"),
+                       "ALT_GRAPH_DB_PATH": os.path.join(data, "altgraph.db")}.items():
+        os.environ.setdefault(key, value)
+    # Compare the commands, not the production rate limits; keep logging off the console
+    for upstream in ("MOJANG", "BWSTATS", "POLSU", "URCHIN"):
+        os.environ.setdefault(f"{upstream}_RATE", "0")
+    os.environ.setdefault("LOG_STDOUT", "0")
+    os.environ.setdefault("LOG_DIR", os.path.join(data, "logs"))
+
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--size", type=int, default=16, help="players per lobby")
+    parser.add_argument("--rounds", type=int, default=5, help="lobbies checked per mode")
+    parser.add_argument("--alts", type=int, default=3, help="quickbuy alts per player")
+    parser.add_argument("--latency", type=float, default=80, help="fake upstream latency in ms")
+    parser.add_argument("--jitter", type=float, default=20, help="uniform +/- jitter on the upstream latency in ms")
+    parser.add_argument("--discord-latency", type=float, default=30, help="simulated Discord API latency per response in ms")
+    asyncio.run(main(parser.parse_args()))
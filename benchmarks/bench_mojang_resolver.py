@@ -0,0 +1,97 @@
+"""Benchmark: per-name Mojang lookups vs. the micro-batching resolver.
+
+Starts a local fake Mojang API (single-name GET and bulk POST endpoints, with a
+fixed per-request latency), then fires many concurrent lookups both ways and
+reports throughput and how many upstream requests each approach cost.
+
+    python benchmarks/bench_mojang_resolver.py --lookups 2000 --players 500
+"""
+import argparse
+import asyncio
+import os
+import random
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(os.path.join(ROOT, "commands"))
+
+async def start_fake_mojang(players, latency):
+    from aiohttp import web
+
+    counters = {"requests": 0}
+    known = {name.lower(): {"id": f"{i:032x}", "name": name} for i, name in enumerate(players)}
+
+    async def single(request):
+        counters["requests"] += 1
+        await asyncio.sleep(latency)
+        profile = known.get(request.match_info["name"].lower())
+        if profile is None:
+            return web.Response(status=404)
+        return web.json_response(profile)
+
+    async def bulk(request):
+        counters["requests"] += 1
+        names = await request.json()
+        if len(names) > 10:
+            return web.json_response({"error": "Too many names"}, status=400)
+        await asyncio.sleep(latency)
+        return web.json_response([known[n.lower()] for n in names if n.lower() in known])
+
+    app = web.Application()
+    app.router.add_get("/users/profiles/minecraft/{name}", single)
+    app.router.add_post("/profiles/minecraft", bulk)
+    runner = web.AppRunner(app, access_log=None)
+    await runner.setup()
+    site = web.TCPSite(runner, "127.0.0.1", 0)
+    await site.start()
+    return runner, site._server.sockets[0].getsockname()[1], counters
+
+async def main(args):
+    import http_client
+    import mojang
+
+    players = [f"Player_{i}" for i in range(args.players)]
+    runner, port, counters = await start_fake_mojang(players, args.latency / 1000)
+    base = f"http://127.0.0.1:{port}"
+    mojang.MOJANG_API_URL = base
+
+    random.seed(1)
+    # Mix of known players and typos so not-found results are exercised too
+    names = [random.choice(players) if random.random() > 0.1 else f"Typo_{random.randint(0, 99)}"
+             for _ in range(args.lookups)]
+
+    async def per_name(name):
+        session = http_client.get_session()
+        async with http_client.upstream_slot("mojang"):
+            async with session.get(f"{base}/users/profiles/minecraft/{name}") as response:
+                return await response.json() if response.status == 200 else None
+
+    results = {}
+    for label, lookup in (("per-name GET", per_name), ("batched resolver", mojang.resolve_username)):
+        counters["requests"] = 0
+        started = time.perf_counter()
+        found = await asyncio.gather(*(lookup(name) for name in names))
+        elapsed = time.perf_counter() - started
+        results[label] = (elapsed, counters["requests"], sum(1 for f in found if f))
+
+    await http_client.close_session()
+    await runner.cleanup()
+
+    print(f"{args.lookups} concurrent lookups over {args.players} players, "
+          f"{args.latency} ms upstream latency, mojang concurrency {http_client.UPSTREAM_CONCURRENCY['mojang']}")
+    for label, (elapsed, requests, found) in results.items():
+        print(f"  {label:<17} {elapsed * 1000:8.1f} ms  {args.lookups / elapsed:8.0f} lookups/s  "
+              f"{requests:5d} upstream requests  {found} found")
+
+if __name__ == "__main__":
+    os.environ.setdefault("POLSU_KEY", "bench")
+    os.environ.setdefault("URCHIN_KEY", "bench")
+    # Measure the caches/batching, not the production rate limits
+    for upstream in ("MOJANG", "BWSTATS", "POLSU", "URCHIN"):
+        os.environ.setdefault(f"{upstream}_RATE", "0")
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--lookups", type=int, default=2000)
+    parser.add_argument("--players", type=int, default=500)
+    parser.add_argument("--latency", type=float, default=20, help="fake upstream latency in ms")
+    asyncio.run(main(parser.parse_args()))
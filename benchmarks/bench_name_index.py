@@ -0,0 +1,153 @@
+"""Benchmark: similar-name search with the trigram index vs. a SequenceMatcher scan.
+
+Builds an index of generated Minecraft-style usernames (with look-alike variants of some
+of them), then reports build time, index memory, top-k query latency and how long a
+linear SequenceMatcher scan over the same names takes per query. With --warm it also
+persists the names to a temporary disk cache and times loading them back, including the
+longest event loop stall while the load runs.
+
+    python benchmarks/bench_name_index.py --names 300000 --queries 2000
+"""
+import argparse
+import asyncio
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+from difflib import SequenceMatcher
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(os.path.join(ROOT, "commands"))
+
+# Keep the benchmark's persisted names out of the real cache database
+os.environ["CACHE_DB_PATH"] = os.path.join(tempfile.mkdtemp(prefix="bench_name_index_"), "cache.db")
+
+import psutil
+from nameindex import NameIndex, trigrams
+from diskcache import disk_cache
+
+WORDS = ["sniper", "dragon", "shadow", "ninja", "pro", "gamer", "wolf", "fire", "ice", "storm", "dark",
+         "king", "lord", "bed", "void", "sky", "craft", "pvp", "god", "tech", "blade", "hunter", "ghost"]
+
+def make_names(count, seed):
+    """Unique usernames built from words, digits and separators, plus look-alikes of earlier ones"""
+    rnd = random.Random(seed)
+    seen = set()
+    names = []
+    while len(names) < count:
+        if names and rnd.random() < 0.2:
+            # A variant of a recent name: digit suffix, xX wrapping, no separators or swapped case
+            base = rnd.choice(names[-1000:])
+            name = rnd.choice((base + str(rnd.randint(0, 99)), "x" + base + "x", base.replace("_", ""), base.swapcase()))
+        else:
+            parts = [rnd.choice(WORDS).capitalize() for _ in range(rnd.randint(1, 3))]
+            name = rnd.choice(("", "_")).join(parts) + (str(rnd.randint(0, 9999)) if rnd.random() < 0.6 else "")
+        name = name[:16]
+        if name.lower() not in seen:
+            seen.add(name.lower())
+            names.append(name)
+    return names
+
+def percentile(values, fraction):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * fraction))]
+
+def scan(names, query, limit):
+    """The previous approach, applied to every known name instead of one player's history"""
+    query = query.lower()
+    scored = [(SequenceMatcher(None, name.lower(), query).ratio(), name) for name in names]
+    return sorted(scored, reverse=True)[:limit]
+
+def brute_force(grams, query, limit, min_similarity):
+    """Exact top similarities by comparing the query with every name's trigram set"""
+    query_grams = trigrams(query.lower())
+    scores = (2 * len(query_grams & name_grams) / (len(query_grams) + len(name_grams)) for name_grams in grams)
+    return sorted((score for score in scores if score >= min_similarity), reverse=True)[1:limit + 1]
+
+async def measure_warm(names):
+    """Persist every name, then time NameIndex.warm() and the worst event loop stall during it"""
+    await disk_cache.open()
+    writer = NameIndex(maxsize=len(names))
+    for i, name in enumerate(names):
+        writer.add(name, f"{i:032x}")
+    await disk_cache.flush()
+
+    index = NameIndex(maxsize=len(names))
+    stalls = []
+
+    async def ticker():
+        while True:
+            tick = time.perf_counter()
+            await asyncio.sleep(0)
+            stalls.append(time.perf_counter() - tick)
+
+    ticking = asyncio.get_running_loop().create_task(ticker())
+    started = time.perf_counter()
+    loaded = await index.warm()
+    elapsed = time.perf_counter() - started
+    ticking.cancel()
+    await disk_cache.close()
+    return loaded, elapsed, max(stalls) if stalls else 0.0
+
+def main(args):
+    names = make_names(args.names, args.seed)
+    rss_before = psutil.Process().memory_info().rss
+    index = NameIndex(maxsize=len(names))
+    started = time.perf_counter()
+    for i, name in enumerate(names):
+        index.add(name, f"{i:032x}", persist=False)
+    build = time.perf_counter() - started
+    rss_after = psutil.Process().memory_info().rss
+    stats = index.stats()
+    print(f"{stats['names']:,} names, {stats['lists']:,} posting lists, {stats['postings']:,} postings")
+    print(f"  build {build:.2f}s ({build / len(names) * 1e6:.1f} us/name), ~{(rss_after - rss_before) / 1024 / 1024:.0f} MiB RSS")
+
+    rnd = random.Random(args.seed + 1)
+    queries = [rnd.choice(names) for _ in range(args.queries)]
+    timings = []
+    found = 0
+    for query in queries:
+        started = time.perf_counter()
+        results = index.similar(query, limit=args.limit, min_similarity=args.min_similarity)
+        timings.append(time.perf_counter() - started)
+        found += bool(results)
+    print(f"  index top-{args.limit} (min {args.min_similarity}): p50 {percentile(timings, 0.5) * 1000:.2f}ms  "
+          f"p99 {percentile(timings, 0.99) * 1000:.2f}ms  max {max(timings) * 1000:.2f}ms  "
+          f"mean {statistics.mean(timings) * 1000:.2f}ms  ({found}/{len(queries)} with matches)")
+    example = index.similar(queries[0], limit=args.limit, min_similarity=args.min_similarity)
+    print(f"  e.g. {queries[0]} -> " + ", ".join(f"{match['name']} {match['similarity']:.2f}" for match in example))
+
+    if args.check:
+        # The query itself is indexed and scores 1.0, hence brute_force skipping the first score
+        grams = [trigrams(name.lower()) for name in names]
+        mismatches = sum(
+            [round(match["similarity"], 9) for match in index.similar(query, limit=args.limit, min_similarity=args.min_similarity)]
+            != [round(score, 9) for score in brute_force(grams, query, args.limit, args.min_similarity)]
+            for query in queries[:args.check]
+        )
+        print(f"  exactness vs. brute force: {args.check - mismatches}/{args.check} queries match")
+
+    if args.scan_queries:
+        started = time.perf_counter()
+        for query in queries[:args.scan_queries]:
+            scan(names, query, args.limit)
+        per_query = (time.perf_counter() - started) / args.scan_queries
+        print(f"  SequenceMatcher scan: {per_query * 1000:.0f}ms per query ({args.scan_queries} queries)")
+
+    if args.warm:
+        loaded, elapsed, stall = asyncio.run(measure_warm(names))
+        print(f"  warm from disk cache: {loaded:,} names in {elapsed:.2f}s, longest event loop stall {stall * 1000:.1f}ms")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--names", type=int, default=300000)
+    parser.add_argument("--queries", type=int, default=2000)
+    parser.add_argument("--limit", type=int, default=5)
+    parser.add_argument("--min-similarity", type=float, default=0.6)
+    parser.add_argument("--scan-queries", type=int, default=3, help="SequenceMatcher scans to time (0 to skip)")
+    parser.add_argument("--check", type=int, default=20, help="Queries to verify against a brute-force scan (0 to skip)")
+    parser.add_argument("--warm", action="store_true", help="Also time loading the names back from the disk cache")
+    parser.add_argument("--seed", type=int, default=1)
+    main(parser.parse_args())
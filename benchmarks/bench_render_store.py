@@ -0,0 +1,92 @@
+"""Benchmark: render preference lookups and writes at 100k entries, SQLite store vs. JSON rewrite.
+
+Fills a temporary SQLite RenderStore with --entries players in one bulk import, then
+times lookups by UUID and by name and single /setrender writes through the async API.
+The JSON baseline rewrites the whole username -> render map the way
+save_render_type_data used to.
+
+    python benchmarks/bench_render_store.py --entries 100000 --samples 2000
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(os.path.join(ROOT, "commands"))
+
+from renders import RenderStore
+
+RENDER_TYPES = ["default", "walking", "cheering", "sleeping", "criss_cross", "head"]
+
+def percentiles(samples):
+    samples = sorted(samples)
+    pick = lambda q: samples[min(len(samples) - 1, int(q * len(samples)))] * 1e6
+    return f"p50 {pick(0.50):8.1f} us  p99 {pick(0.99):8.1f} us  mean {statistics.fmean(samples) * 1e6:8.1f} us"
+
+async def timed(samples, coro):
+    start = time.perf_counter()
+    await coro
+    samples.append(time.perf_counter() - start)
+
+async def bench_sqlite(directory, players, args):
+    store = RenderStore(os.path.join(directory, "renders.db"), os.path.join(directory, "missing.json"))
+    await store.open()
+    start = time.perf_counter()
+    await store.set_many(players)
+    print(f"  bulk import      {len(players):,} rows in {time.perf_counter() - start:.2f} s")
+
+    sample = random.sample(players, args.samples)
+    by_uuid, by_name, writes = [], [], []
+    for uuid, name, _ in sample:
+        await timed(by_uuid, store.get(uuid))
+    for uuid, name, _ in sample:
+        await timed(by_name, store.get(username=name.upper()))
+    for uuid, name, _ in sample[:args.writes]:
+        await timed(writes, store.set(uuid, name, random.choice(RENDER_TYPES)))
+    print(f"  get by uuid      {percentiles(by_uuid)}")
+    print(f"  get by name      {percentiles(by_name)}")
+    print(f"  set              {percentiles(writes)}")
+    await store.close()
+    return {"get_uuid": by_uuid, "get_name": by_name, "set": writes}
+
+def bench_json(directory, players, args):
+    path = os.path.join(directory, "rendertype.json")
+    data = {name: render for _, name, render in players}
+    sample = random.sample(players, args.writes)
+    lookups, writes = [], []
+    for _, name, _ in sample:
+        # The old commands re-read and re-parsed the file on every lookup
+        start = time.perf_counter()
+        with open(path if os.path.exists(path) else os.devnull, "r") as file:
+            json.loads(file.read() or "{}").get(name, "default")
+        lookups.append(time.perf_counter() - start)
+
+        start = time.perf_counter()
+        data[name] = random.choice(RENDER_TYPES)
+        with open(path, "w") as file:
+            json.dump(data, file, indent=4)
+        writes.append(time.perf_counter() - start)
+    print(f"  load + get       {percentiles(lookups[1:])}")
+    print(f"  full rewrite     {percentiles(writes)}")
+
+async def main(args):
+    random.seed(1)
+    players = [(f"{i:032x}", f"Player_{i}", random.choice(RENDER_TYPES)) for i in range(args.entries)]
+    with tempfile.TemporaryDirectory() as directory:
+        print(f"SQLite RenderStore ({args.entries:,} entries)")
+        await bench_sqlite(directory, players, args)
+        print(f"JSON rewrite ({args.entries:,} entries)")
+        bench_json(directory, players, args)
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--entries", type=int, default=100000)
+    parser.add_argument("--samples", type=int, default=2000)
+    parser.add_argument("--writes", type=int, default=50)
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,215 @@
+"""Offline benchmark suite: the bot's fetch pipelines against local fake upstreams.
+
+Starts the stand-ins from fake_upstreams.py (configurable latency, jitter, error rate
+and alts per player) and drives each scenario with a fixed concurrency, clearing the
+in-memory caches and circuit breakers first so every run starts cold:
+
+    bwstats    fetch_bwstats (uncached request + parse)
+    formatted  fetch_formatted_data (Polsu formatted name)
+    altcheck   Mojang lookup, stats, quickbuy and Urchin, then every alt
+    bedwars    Mojang lookup, stats, formatted name and render type
+
+Reports p50/p95/p99 latency and throughput per scenario and saves them, with the git
+commit and settings, as JSON so runs can be compared across commits:
+
+    python benchmarks/bench_suite.py --ops 500 --concurrency 20 --latency 50 --jitter 20
+    python benchmarks/bench_suite.py --compare benchmarks/results/<earlier run>.json
+"""
+import argparse
+import asyncio
+import json
+import math
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(os.path.join(ROOT, "commands"))
+
+from fake_upstreams import FakeUpstreams, make_players
+
+SCENARIOS = ("bwstats", "formatted", "altcheck", "bedwars")
+UPSTREAMS = ("mojang", "bwstats", "polsu", "urchin")
+
+async def run_bwstats(profile):
+    from bwstats import fetch_bwstats
+    return await fetch_bwstats(profile["id"])
+
+async def run_formatted(profile):
+    from polsu import fetch_formatted_data
+    return await fetch_formatted_data(profile["id"])
+
+async def run_altcheck(profile):
+    """The upstream work /altcheck does for one player"""
+    from mojang import resolve_username
+    from bwstats import get_bwstats
+    from polsu import fetch_quickbuy_alts
+    from urchin import fetch_urchin_data
+    from alts import resolve_alts
+
+    player = await resolve_username(profile["name"])
+    _, quickbuy, _ = await asyncio.gather(
+        get_bwstats(player["id"]),
+        fetch_quickbuy_alts(player["id"]),
+        fetch_urchin_data(player["name"]),
+        return_exceptions=True
+    )
+    if isinstance(quickbuy, list):
+        return await resolve_alts(quickbuy)
+
+async def run_bedwars(profile):
+    """The upstream and storage work /bedwars does for one player"""
+    from mojang import resolve_username
+    from bwstats import get_bwstats
+    from polsu import fetch_formatted_data
+    from renders import render_store
+
+    player = await resolve_username(profile["name"])
+    stats, _ = await get_bwstats(player["id"])
+    await fetch_formatted_data(player["id"])
+    await render_store.get(player["id"], player["name"])
+    return stats
+
+RUNNERS = {"bwstats": run_bwstats, "formatted": run_formatted, "altcheck": run_altcheck, "bedwars": run_bedwars}
+
+def percentile(ordered, q):
+    """Nearest-rank percentile of an already sorted list"""
+    if not ordered:
+        return None
+    return ordered[max(0, math.ceil(q * len(ordered)) - 1)]
+
+def reset_state():
+    """Drop in-memory caches and circuit state so each scenario starts cold"""
+    from cache import caches
+    from health import breakers
+
+    for cache in caches.values():
+        cache.clear()
+    breakers.clear()
+
+async def run_scenario(name, profiles, concurrency, upstreams):
+    runner = RUNNERS[name]
+    reset_state()
+    upstreams.counters.clear()
+    upstreams.errors.clear()
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies = []
+    errors = 0
+
+    async def one(profile):
+        nonlocal errors
+        async with semaphore:
+            started = time.perf_counter()
+            try:
+                await runner(profile)
+            except Exception:
+                errors += 1
+            latencies.append(time.perf_counter() - started)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(one(profile) for profile in profiles))
+    elapsed = time.perf_counter() - started
+    latencies.sort()
+    return {
+        "ops": len(latencies),
+        "errors": errors,
+        "elapsed_s": round(elapsed, 4),
+        "throughput": round(len(latencies) / elapsed, 2),
+        "mean_ms": round(statistics.fmean(latencies) * 1000, 2),
+        "p50_ms": round(percentile(latencies, 0.50) * 1000, 2),
+        "p95_ms": round(percentile(latencies, 0.95) * 1000, 2),
+        "p99_ms": round(percentile(latencies, 0.99) * 1000, 2),
+        "upstream_requests": {upstream: upstreams.counters[upstream] for upstream in UPSTREAMS},
+        "upstream_errors": {upstream: upstreams.errors[upstream] for upstream in UPSTREAMS}
+    }
+
+def git_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=ROOT, capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+def print_results(results, baseline=None):
+    print(f"{'scenario':<10} {'ops':>6} {'err':>5} {'ops/s':>9} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9}  upstream requests")
+    for name, result in results.items():
+        requests = "  ".join(f"{upstream} {count}" for upstream, count in result["upstream_requests"].items() if count)
+        print(f"{name:<10} {result['ops']:>6} {result['errors']:>5} {result['throughput']:>9.1f} "
+              f"{result['p50_ms']:>9.1f} {result['p95_ms']:>9.1f} {result['p99_ms']:>9.1f}  {requests}")
+        previous = (baseline or {}).get(name)
+        if previous:
+            changes = "  ".join(
+                f"{field} {(result[field] - previous[field]) / previous[field] * 100:+.1f}%"
+                for field in ("throughput", "p50_ms", "p95_ms", "p99_ms") if previous[field]
+            )
+            print(f"{'':<10} vs baseline: {changes}")
+
+async def main(args):
+    import http_client
+    from renders import render_store
+
+    scenarios = args.scenarios.split(",")
+    unknown = set(scenarios) - set(SCENARIOS)
+    if unknown:
+        raise SystemExit(f"Unknown scenarios: {', '.join(sorted(unknown))}")
+
+    players, mains, alts = make_players(args.ops, args.alts)
+    upstreams = FakeUpstreams(players, alts, args.latency / 1000, args.jitter / 1000, args.error_rate)
+    await upstreams.start()
+    upstreams.install()
+
+    print(f"{args.ops} ops per scenario, concurrency {args.concurrency}, {args.alts} alts per player, "
+          f"latency {args.latency}±{args.jitter} ms, error rate {args.error_rate:.0%}")
+    results = {}
+    with tempfile.TemporaryDirectory() as directory:
+        render_store.path = os.path.join(directory, "renders.db")
+        render_store.json_path = os.path.join(directory, "rendertype.json")
+        for name in scenarios:
+            results[name] = await run_scenario(name, mains, args.concurrency, upstreams)
+        await render_store.close()
+
+    await http_client.close_session()
+    await upstreams.stop()
+
+    baseline = None
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            baseline = json.load(f)["scenarios"]
+    print_results(results, baseline)
+
+    run = {
+        "commit": git_commit(),
+        "timestamp": datetime.now().isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "settings": {key: value for key, value in vars(args).items() if key not in ("output", "compare")},
+        "scenarios": results
+    }
+    output = args.output or os.path.join(
+        ROOT, "benchmarks", "results", f"{datetime.now():%Y%m%d-%H%M%S}-{run['commit'] or 'unknown'}.json")
+    os.makedirs(os.path.dirname(output) or ".", exist_ok=True)
+    with open(output, "w", encoding="utf-8") as f:
+        json.dump(run, f, indent=2)
+    print(f"Saved {output}")
+
+if __name__ == "__main__":
+    os.environ.setdefault("POLSU_KEY", "bench")
+    os.environ.setdefault("URCHIN_KEY", "bench")
+    # Measure the pipelines, not the production rate limits
+    for upstream in ("MOJANG", "BWSTATS", "POLSU", "URCHIN"):
+        os.environ.setdefault(f"{upstream}_RATE", "0")
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--scenarios", default=",".join(SCENARIOS), help="comma-separated subset of " + ", ".join(SCENARIOS))
+    parser.add_argument("--ops", type=int, default=300, help="operations (distinct players) per scenario")
+    parser.add_argument("--concurrency", type=int, default=20)
+    parser.add_argument("--alts", type=int, default=3, help="quickbuy alts per player")
+    parser.add_argument("--latency", type=float, default=50, help="fake upstream latency in ms")
+    parser.add_argument("--jitter", type=float, default=10, help="uniform +/- jitter on the latency in ms")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="share of upstream requests answered with 503")
+    parser.add_argument("--output", help="where to save the JSON results (default benchmarks/results/)")
+    parser.add_argument("--compare", help="earlier results JSON to print changes against")
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,128 @@
+"""Local aiohttp stand-ins for Mojang, bwstats, Polsu and Urchin, shared by the benchmarks.
+
+Every endpoint sleeps for the configured latency (plus or minus jitter), fails with
+HTTP 503 at the configured error rate, and counts its requests per upstream.
+"""
+import asyncio
+import os
+import random
+from collections import Counter
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+def make_players(count, alts_per_player, seed=1):
+    """Return (players, mains, alts): count mains, alts_per_player quickbuy alts each drawn from a separate pool"""
+    rng = random.Random(seed)
+    players = [{"id": f"{i:032x}", "name": f"Player_{i}"} for i in range(count * (alts_per_player + 1))]
+    mains = players[:count]
+    alt_pool = players[count:]
+    alts = {profile["id"]: [alt["name"] for alt in rng.sample(alt_pool, alts_per_player)] for profile in mains}
+    return players, mains, alts
+
+class FakeUpstreams:
+    """One local server answering the Mojang, bwstats, Polsu and Urchin routes the bot uses"""
+
+    def __init__(self, players, alts, latency=0.05, jitter=0.0, error_rate=0.0, tag_rate=0.1, seed=1):
+        self.by_name = {profile["name"].lower(): profile for profile in players}
+        self.by_id = {profile["id"]: profile for profile in players}
+        self.alts = alts
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.tag_rate = tag_rate
+        self.rng = random.Random(seed)
+        self.counters = Counter()
+        self.errors = Counter()
+        self.base_url = None
+        self._runner = None
+        with open(os.path.join(ROOT, "benchmarks", "samples", "bwstats_full.html"), encoding="utf-8") as f:
+            self.page = f.read()
+
+    async def _respond(self, upstream):
+        """Count the request, wait out the latency and return a 503 response if this one should fail"""
+        from aiohttp import web
+
+        self.counters[upstream] += 1
+        delay = self.latency + self.rng.uniform(-self.jitter, self.jitter)
+        await asyncio.sleep(max(0.0, delay))
+        if self.error_rate and self.rng.random() < self.error_rate:
+            self.errors[upstream] += 1
+            return web.Response(status=503)
+        return None
+
+    async def start(self):
+        from aiohttp import web
+
+        async def mojang_bulk(request):
+            failed = await self._respond("mojang")
+            if failed:
+                return failed
+            names = await request.json()
+            return web.json_response([self.by_name[n.lower()] for n in names if n.lower() in self.by_name])
+
+        async def mojang_profile(request):
+            failed = await self._respond("mojang")
+            if failed:
+                return failed
+            profile = self.by_id.get(request.match_info["uuid"])
+            return web.json_response(profile) if profile else web.Response(status=204)
+
+        async def bwstats(request):
+            failed = await self._respond("bwstats")
+            if failed:
+                return failed
+            if request.match_info["uuid"] not in self.by_id:
+                return web.Response(status=404)
+            return web.Response(text=self.page, content_type="text/html")
+
+        async def quickbuy(request):
+            failed = await self._respond("polsu")
+            if failed:
+                return failed
+            entries = [{"username": name} for name in self.alts.get(request.query["uuid"], [])]
+            return web.json_response({"success": True, "data": {"quickbuy": entries}})
+
+        async def formatted(request):
+            failed = await self._respond("polsu")
+            if failed:
+                return failed
+            profile = self.by_id.get(request.query["uuid"])
+            if profile is None:
+                return web.json_response({"success": False})
+            return web.json_response({"success": True, "data": {"formatted": f"§6[312✫] §b{profile['name']}"}})
+
+        async def urchin(request):
+            failed = await self._respond("urchin")
+            if failed:
+                return failed
+            tagged = self.rng.random() < self.tag_rate
+            return web.json_response({"tags": [{"type": "sniper"}] if tagged else []})
+
+        app = web.Application()
+        app.router.add_post("/profiles/minecraft", mojang_bulk)
+        app.router.add_get("/session/minecraft/profile/{uuid}", mojang_profile)
+        app.router.add_get("/user/{uuid}", bwstats)
+        app.router.add_get("/polsu/bedwars/quickbuy/all", quickbuy)
+        app.router.add_get("/polsu/bedwars/formatted", formatted)
+        app.router.add_get("/player/{name}", urchin)
+        self._runner = web.AppRunner(app, access_log=None)
+        await self._runner.setup()
+        site = web.TCPSite(self._runner, "127.0.0.1", 0)
+        await site.start()
+        self.base_url = f"http://127.0.0.1:{site._server.sockets[0].getsockname()[1]}"
+        return self.base_url
+
+    def install(self):
+        """Point the bot's fetchers at this server"""
+        import mojang
+        import bwstats
+        import polsu
+        import urchin
+
+        mojang.MOJANG_API_URL = mojang.MOJANG_SESSION_URL = self.base_url
+        bwstats.BWSTATS_URL = polsu.POLSU_API_URL = urchin.URCHIN_API_URL = self.base_url
+
+    async def stop(self):
+        if self._runner is not None:
+            await self._runner.cleanup()
+            self._runner = None
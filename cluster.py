@@ -0,0 +1,123 @@
+import os
+import sys
+import time
+import signal
+import asyncio
+from dotenv import load_dotenv
+
+# Add the commands directory to the Python path
+current_dir = os.path.dirname(os.path.abspath(__file__))
+commands_dir = os.path.join(current_dir, "commands")
+sys.path.append(commands_dir)
+
+# Load environment variables once; the bot processes inherit them
+load_dotenv(os.path.join(current_dir, "config", ".env"))
+load_dotenv()
+
+# One log file per process (RotatingFileHandler can't share a file across processes):
+# acm-launcher.jsonl for this launcher, acm-<cluster id>.jsonl for each bot process
+LOG_FILE_BASE, LOG_FILE_EXT = os.path.splitext(os.environ.get("LOG_FILE", "acm.jsonl"))
+os.environ["LOG_FILE"] = f"{LOG_FILE_BASE}-launcher{LOG_FILE_EXT}"
+
+from utils import log_error, log_info
+from ipc import ClusterServer
+from http_client import UPSTREAM_RATE, UPSTREAM_BURST
+from metrics import METRICS_PORT
+
+# Bot processes to run and the shards each one owns
+CLUSTER_PROCESSES = int(os.environ.get("CLUSTER_PROCESSES", "2"))
+SHARDS_PER_PROCESS = int(os.environ.get("SHARDS_PER_PROCESS", "1"))
+SHARD_COUNT = int(os.environ.get("SHARD_COUNT", "0")) or CLUSTER_PROCESSES * SHARDS_PER_PROCESS
+
+# Crashed processes are restarted after RESTART_DELAY, doubling per consecutive crash up to
+# RESTART_MAX_DELAY; a process that stayed up for RESTART_STABLE_AFTER resets the backoff
+RESTART_DELAY = float(os.environ.get("CLUSTER_RESTART_DELAY", "5"))
+RESTART_MAX_DELAY = float(os.environ.get("CLUSTER_RESTART_MAX_DELAY", "300"))
+RESTART_STABLE_AFTER = float(os.environ.get("CLUSTER_RESTART_STABLE_AFTER", "600"))
+
+def shard_ranges(shard_count, processes):
+    """Split shard IDs 0..shard_count-1 into contiguous, evenly sized ranges"""
+    return [list(range(i * shard_count // processes, (i + 1) * shard_count // processes)) for i in range(processes)]
+
+async def supervise(cluster_id, shards, address, server, stopping):
+    """Run one bot process for a range of shards, restarting it whenever it exits"""
+    label = f"cluster {cluster_id}"
+    env = {
+        **os.environ,
+        "CLUSTER_IPC": address,
+        "CLUSTER_ID": str(cluster_id),
+        "CLUSTER_SIZE": str(CLUSTER_PROCESSES),
+        "SHARD_IDS": ",".join(map(str, shards)),
+        "SHARD_COUNT": str(SHARD_COUNT),
+        # Each process serves its own /metrics on consecutive ports
+        "METRICS_PORT": str(METRICS_PORT + cluster_id if METRICS_PORT else 0),
+        "LOG_FILE": f"{LOG_FILE_BASE}-{cluster_id}{LOG_FILE_EXT}"
+    }
+    crashes = 0
+    process = None
+    try:
+        while not stopping.is_set():
+            process = await asyncio.create_subprocess_exec(sys.executable, os.path.join(current_dir, "acm.py"), env=env)
+            started = time.monotonic()
+            log_info("Cluster", "System", label, f"Started pid {process.pid} for shards {shards[0]}-{shards[-1]} of {SHARD_COUNT}")
+            # Wake up on either the process exiting or the launcher shutting down
+            exited = asyncio.ensure_future(process.wait())
+            stop = asyncio.ensure_future(stopping.wait())
+            await asyncio.wait((exited, stop), return_when=asyncio.FIRST_COMPLETED)
+            stop.cancel()
+            if stopping.is_set():
+                exited.cancel()
+                break
+            code = exited.result()
+            ran = time.monotonic() - started
+            crashes = 1 if ran >= RESTART_STABLE_AFTER else crashes + 1
+            delay = min(RESTART_MAX_DELAY, RESTART_DELAY * 2 ** (crashes - 1))
+            server.restarts[str(cluster_id)] = server.restarts.get(str(cluster_id), 0) + 1
+            log_error("Cluster Process Exited", "System", label,
+                      f"pid {process.pid} exited with code {code} after {ran:.0f}s; restarting in {delay:g}s")
+            try:
+                await asyncio.wait_for(stopping.wait(), delay)
+            except asyncio.TimeoutError:
+                pass
+    finally:
+        if process is not None and process.returncode is None:
+            process.terminate()
+            try:
+                await asyncio.wait_for(process.wait(), 30)
+            except asyncio.TimeoutError:
+                process.kill()
+                await process.wait()
+            log_info("Cluster", "System", label, f"Stopped pid {process.pid}")
+
+async def main():
+    if SHARD_COUNT < CLUSTER_PROCESSES:
+        raise SystemExit(f"SHARD_COUNT ({SHARD_COUNT}) must be at least CLUSTER_PROCESSES ({CLUSTER_PROCESSES})")
+
+    # Shared per-upstream quotas and shard reports live here, in front of every bot process
+    server = ClusterServer(UPSTREAM_RATE, UPSTREAM_BURST)
+    address = await server.start()
+
+    stopping = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        try:
+            loop.add_signal_handler(sig, stopping.set)
+        except (NotImplementedError, RuntimeError):
+            # Windows: Ctrl+C arrives as KeyboardInterrupt instead
+            pass
+
+    ranges = shard_ranges(SHARD_COUNT, CLUSTER_PROCESSES)
+    log_info("Cluster", "System", "main", f"Launching {CLUSTER_PROCESSES} processes for {SHARD_COUNT} shards")
+    try:
+        await asyncio.gather(*(
+            supervise(cluster_id, shards, address, server, stopping) for cluster_id, shards in enumerate(ranges)
+        ))
+    finally:
+        await server.close()
+
+# Run the cluster
+if __name__ == "__main__":
+    try:
+        asyncio.run(main())
+    except KeyboardInterrupt:
+        pass
@@ -0,0 +1,239 @@
+import discord
+from discord.ext import commands
+from discord import app_commands
+import os
+from utils import log_command, log_error, log_info
+from cache import caches
+from singleflight import flights
+from diskcache import disk_cache
+from nameindex import name_index
+from altgraph import alt_graph
+from http_client import limiters
+from health import breakers
+from metrics import summarize, instrument_tree
+from extensions import EXTENSIONS, load_timed, load_timings, load_failures
+from tree_sync import sync_commands
+
+# Load admin IDs from environment variable
+ADMIN_IDS = [int(id) for id in os.environ["ADMIN_IDS"].split(",")]
+
+def format_seconds(seconds):
+    """Render a latency in ms or s for embeds"""
+    if seconds is None:
+        return "n/a"
+    if seconds == float("inf"):
+        return "∞"
+    return f"{seconds * 1000:.0f}ms" if seconds < 1 else f"{seconds:.1f}s"
+
+async def setup(bot):
+    @bot.tree.command(name="cache", description="Inspect or purge the bot's in-memory caches (Admin only)")
+    @app_commands.describe(
+        action="What to do with the caches",
+        name="Cache to target (defaults to all caches)",
+        key="Single key to purge, e.g. a lowercase username"
+    )
+    @app_commands.choices(action=[
+        app_commands.Choice(name="Stats", value="stats"),
+        app_commands.Choice(name="Purge", value="purge")
+    ])
+    async def cache(interaction: discord.Interaction, action: str, name: str = None, key: str = None):
+        try:
+            log_command(interaction.user.name, "cache", f"{action} on {name or 'all caches'}")
+
+            if interaction.user.id not in ADMIN_IDS:
+                log_error("Unauthorized Access", interaction.user.name, "cache", "User is not an admin")
+                await interaction.response.send_message("You are not authorized to use this command.", ephemeral=True)
+                return
+
+            if name and name not in caches:
+                await interaction.response.send_message(
+                    f"Unknown cache `{name}`. Available: {', '.join(sorted(caches))}", ephemeral=True)
+                return
+            targets = {name: caches[name]} if name else caches
+
+            if action == "purge":
+                if key:
+                    removed = sum(1 for target in targets.values() if target.pop(key))
+                else:
+                    removed = sum(target.clear() for target in targets.values())
+                log_info("Cache Purge", interaction.user.name, "cache", f"Removed {removed} entries from {', '.join(targets)}")
+                await interaction.response.send_message(f"Removed {removed} entries.", ephemeral=True)
+                return
+
+            embed = discord.Embed(title="🗃️ Cache Stats", color=0x00ff00)
+            for cache_name, target in sorted(targets.items()):
+                stats = target.stats()
+                embed.add_field(
+                    name=cache_name,
+                    value=f"Size: `{stats['size']:,}/{stats['maxsize']:,}` (negative `{stats['negative']:,}`)\n"
+                          f"Hits: `{stats['hits']:,}` Misses: `{stats['misses']:,}` "
+                          f"Ratio: `{stats['hit_ratio'] * 100:.1f}%`\n"
+                          f"Evictions: `{stats['evictions']:,}` Expirations: `{stats['expirations']:,}`",
+                    inline=False
+                )
+
+            # Requests that joined an identical in-flight request instead of going upstream
+            flight_stats = flights.stats()
+            if flight_stats and not name:
+                embed.add_field(
+                    name="Coalesced Requests",
+                    value="\n".join(
+                        f"{upstream}: `{counts['coalesced']:,}` of `{counts['calls']:,}` calls"
+                        for upstream, counts in flight_stats.items()
+                    ),
+                    inline=False
+                )
+
+            # Second-tier SQLite cache behind the persistent caches above
+            if disk_cache.is_open and not name:
+                disk_stats = disk_cache.stats()
+                embed.add_field(
+                    name="Disk Cache",
+                    value=f"Hits: `{disk_stats['hits']:,}` Misses: `{disk_stats['misses']:,}`\n"
+                          f"Writes: `{disk_stats['writes']:,}` in `{disk_stats['flushes']:,}` flushes "
+                          f"(pending `{disk_stats['pending']:,}`)",
+                    inline=False
+                )
+
+            # Every username seen, for /altcheck's similar names
+            if not name:
+                index_stats = name_index.stats()
+                embed.add_field(
+                    name="Name Index",
+                    value=f"Names: `{index_stats['names']:,}/{index_stats['maxsize']:,}` "
+                          f"Posting lists: `{index_stats['lists']:,}` Postings: `{index_stats['postings']:,}`\n"
+                          f"Queries: `{index_stats['queries']:,}` Dropped (full): `{index_stats['dropped']:,}`",
+                    inline=False
+                )
+
+            # Alt clusters built from every altcheck
+            if not name:
+                graph_stats = alt_graph.stats()
+                embed.add_field(
+                    name="Alt Graph",
+                    value=f"Players: `{graph_stats['players']:,}` Edges: `{graph_stats['edges']:,}`\n"
+                          f"Clusters: `{graph_stats['clusters']:,}` Largest: `{graph_stats['largest']:,}`"
+                          + ("" if graph_stats["loaded"] else " (loading)"),
+                    inline=False
+                )
+
+            # Time requests spent queued behind each upstream's rate limit
+            if limiters and not name:
+                lines = []
+                for upstream, limiter in sorted(limiters.items()):
+                    limits = limiter.stats()
+                    waits = " / ".join(
+                        f"{priority} avg `{wait['avg'] * 1000:.0f}ms` max `{wait['max'] * 1000:.0f}ms`"
+                        for priority, wait in limits["waits"].items() if wait["count"]
+                    )
+                    lines.append(f"{upstream}: active `{limits['active']}` queued `{limits['queued']}`"
+                                 + (f" | {waits}" if waits else ""))
+                embed.add_field(name="Upstream Queues", value="\n".join(lines), inline=False)
+
+            # Circuit breaker state per upstream
+            if breakers and not name:
+                embed.add_field(
+                    name="Upstream Health",
+                    value="\n".join(
+                        f"{upstream}: `{health['state']}` failures `{health['failures']}` "
+                        f"trips `{health['trips']}` rejected `{health['rejected']:,}`"
+                        for upstream, health in ((upstream, breaker.stats()) for upstream, breaker in sorted(breakers.items()))
+                    ),
+                    inline=False
+                )
+            await interaction.response.send_message(embed=embed, ephemeral=True)
+
+        except Exception as e:
+            log_error("Command Error", interaction.user.name, "cache", str(e))
+            await interaction.response.send_message("An error occurred while accessing the caches.", ephemeral=True)
+
+    @bot.tree.command(name="stats", description="View command and upstream latency statistics (Admin only)")
+    async def stats(interaction: discord.Interaction):
+        try:
+            log_command(interaction.user.name, "stats", "Viewing metrics summary")
+
+            if interaction.user.id not in ADMIN_IDS:
+                log_error("Unauthorized Access", interaction.user.name, "stats", "User is not an admin")
+                await interaction.response.send_message("You are not authorized to use this command.", ephemeral=True)
+                return
+
+            summary = summarize()
+            embed = discord.Embed(title="📈 Bot Stats", description=f"Gateway latency: `{round(bot.latency * 1000)}ms`", color=0x00ff00)
+
+            embed.add_field(
+                name="Commands",
+                value="\n".join(
+                    f"/{command}: `{entry['calls']:,}` calls, `{entry['errors']:,}` errors | "
+                    f"defer `{format_seconds(entry['defer_avg'])}` | "
+                    f"p50 `≤{format_seconds(entry['p50'])}` p95 `≤{format_seconds(entry['p95'])}`"
+                    for command, entry in sorted(summary["commands"].items())
+                )[:1024] or "No commands run yet.",
+                inline=False
+            )
+            embed.add_field(
+                name="Upstreams",
+                value="\n".join(
+                    f"{upstream}: avg `{format_seconds(entry['avg'])}` p95 `≤{format_seconds(entry['p95'])}` | "
+                    + " ".join(f"{status}×{count:,}" for status, count in sorted(entry["statuses"].items()))
+                    for upstream, entry in sorted(summary["upstreams"].items())
+                )[:1024] or "No upstream requests yet.",
+                inline=False
+            )
+            embed.add_field(
+                name="Cache Hit Ratios",
+                value=" | ".join(
+                    f"{cache_name} `{target.stats()['hit_ratio'] * 100:.1f}%`" for cache_name, target in sorted(caches.items())
+                )[:1024] or "No caches.",
+                inline=False
+            )
+            await interaction.response.send_message(embed=embed, ephemeral=True)
+
+        except Exception as e:
+            log_error("Command Error", interaction.user.name, "stats", str(e))
+            await interaction.response.send_message("An error occurred while collecting stats.", ephemeral=True)
+
+    @bot.tree.command(name="reload", description="Reload a command module without restarting the bot (Admin only)")
+    @app_commands.describe(extension="The command module to reload")
+    @app_commands.choices(extension=[app_commands.Choice(name=name, value=name) for name in EXTENSIONS])
+    async def reload(interaction: discord.Interaction, extension: str):
+        try:
+            log_command(interaction.user.name, "reload", f"Reloading extension: {extension}")
+
+            if interaction.user.id not in ADMIN_IDS:
+                log_error("Unauthorized Access", interaction.user.name, "reload", "User is not an admin")
+                await interaction.response.send_message("You are not authorized to use this command.", ephemeral=True)
+                return
+
+            await interaction.response.defer(ephemeral=True)
+            try:
+                timing = await load_timed(bot, extension, reload=extension in bot.extensions)
+            except Exception as e:
+                # discord.py keeps the previous version loaded when a reload fails
+                log_error("Extension Reload", interaction.user.name, "reload", f"{extension}: {e}")
+                await interaction.followup.send(f"Reloading `{extension}` failed, the previous version is still loaded:\n```{e}```"[:2000], ephemeral=True)
+                return
+
+            # The reloaded module registered fresh callbacks; time them too, and push the tree only if it changed
+            instrument_tree(bot)
+            # Syncing while another module is missing would delete its commands from Discord
+            synced = 0 if load_failures else await sync_commands(bot)
+
+            embed = discord.Embed(title=f"🔄 Reloaded {extension}", color=0x00ff00)
+            embed.add_field(name="Setup", value=f"`{format_seconds(timing['setup'])}`", inline=True)
+            embed.add_field(name="Commands", value=f"`{timing['commands']}`", inline=True)
+            tree_status = "Not synced, failed to load: " + ", ".join(sorted(load_failures)) if load_failures else "Synced" if synced else "Unchanged"
+            embed.add_field(name="Command Tree", value=tree_status, inline=True)
+            embed.add_field(
+                name="Load Times (import + setup)",
+                value="\n".join(
+                    f"{name}: `{format_seconds(entry['import'])}` + `{format_seconds(entry['setup'])}`"
+                    for name, entry in load_timings.items()
+                )[:1024],
+                inline=False
+            )
+            await interaction.followup.send(embed=embed, ephemeral=True)
+            log_command(interaction.user.name, "reload", f"Reloaded {extension} in {format_seconds(timing['setup'])}")
+
+        except Exception as e:
+            log_error("Command Error", interaction.user.name, "reload", str(e))
+            await interaction.followup.send("An error occurred while reloading the extension.", ephemeral=True)
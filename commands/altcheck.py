@@ -1,111 +1,294 @@
 import discord
 from discord.ext import commands
 from discord import app_commands
-import aiohttp
 import os
-import json
-from dotenv import load_dotenv
+import re
+import time
+import asyncio
 from utils import log_command, log_error, log_info
-from difflib import SequenceMatcher
-from datetime import datetime
-
-load_dotenv()
-
-# API Keys
-POLSU_API_KEY = os.environ["POLSU_KEY"]
-URCHIN_API_KEY = os.environ["URCHIN_KEY"]
-
-def load_render_type_data():
+from health import UPSTREAM_ERRORS
+from mojang import resolve_username, VALID_USERNAME
+from bwstats import get_bwstats, get_final_kd, final_kd, calculate_fkdr
+from alts import resolve_alts
+from polsu import fetch_quickbuy_alts
+from urchin import fetch_urchin_data, format_urchin_tags
+from renders import render_store
+from tracing import span
+from nameindex import name_index
+from altgraph import alt_graph
+from singleflight import flights
+from ratelimit import background_priority
+from datetime import datetime, timezone
+
+# Alts shown when answering from a known cluster; the rest are only counted
+ALT_CLUSTER_LIMIT = int(os.environ.get("ALT_CLUSTER_LIMIT", "10"))
+
+# /lobbycheck: most names per check, the time budget shared by the whole lobby, and how
+# long (seconds) the player select menu keeps working
+LOBBY_MAX_PLAYERS = int(os.environ.get("LOBBY_MAX_PLAYERS", "16"))
+LOBBY_TIMEOUT = float(os.environ.get("LOBBY_TIMEOUT", "12"))
+LOBBY_VIEW_TIMEOUT = float(os.environ.get("LOBBY_VIEW_TIMEOUT", "840"))
+
+async def record_alts(uuid, username, quickbuy_array):
+    """Add a player's quickbuy alts to the alt graph (their UUIDs mostly come from the identity cache)"""
     try:
-        current_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
-        data_dir = os.path.join(current_dir, "data")
-        with open(os.path.join(data_dir, "rendertype.json"), "r") as f:
-            return json.load(f)
+        names = [entry.get("username") for entry in quickbuy_array if entry.get("username")]
+        profiles = await asyncio.gather(*(resolve_username(name) for name in names), return_exceptions=True)
+        # Alts that failed to resolve are missing, so leave the player due for another fetch
+        complete = not any(isinstance(profile, BaseException) for profile in profiles)
+        await alt_graph.record(
+            uuid, username, [(profile["id"], profile["name"]) for profile in profiles if isinstance(profile, dict)], complete
+        )
     except Exception as e:
-        log_error("Render Data Load", "System", "load_render_type_data", str(e))
-        return {}
-
-def calculate_name_similarity(name1, name2):
-    """Calculate similarity between two names using SequenceMatcher"""
-    return SequenceMatcher(None, name1.lower(), name2.lower()).ratio()
-
-async def fetch_name_history(uuid):
-    """Fetch name history from Mojang API"""
-    url = f"https://api.mojang.com/user/profiles/{uuid}/names"
-    async with aiohttp.ClientSession() as session:
-        async with session.get(url) as response:
-            if response.status == 200:
-                return await response.json()
-            return None
-
-async def fetch_similar_names(username):
-    """Fetch similar names from Mojang API"""
-    url = f"https://api.mojang.com/users/profiles/minecraft/{username}"
-    async with aiohttp.ClientSession() as session:
-        async with session.get(url) as response:
-            if response.status == 200:
-                data = await response.json()
-                uuid = data.get("id")
-                # Get name history to check for similar names
-                history = await fetch_name_history(uuid)
-                if history:
-                    similar_names = []
-                    for entry in history:
-                        name = entry.get("name")
-                        if name and calculate_name_similarity(name, username) >= 0.95:
-                            similar_names.append({
-                                "name": name,
-                                "changed_at": entry.get("changedToAt", 0),
-                                "similarity": calculate_name_similarity(name, username)
-                            })
-                    return similar_names
-            return None
-
-async def fetch_bwstats(uuid):
-    """Fetch Bedwars stats from bwstats.shivam.pro"""
-    url = f"https://bwstats.shivam.pro/user/{uuid}"
-    async with aiohttp.ClientSession() as session:
-        async with session.get(url) as response:
-            if response.status == 200:
-                html = await response.text()
-                # Extract stats from HTML
-                final_kills = extract_value(html, "<td>Final Kills</td><td>", "</td>").replace(",", "")
-                final_deaths = extract_value(html, "<td>Final Deaths</td><td>", "</td>").replace(",", "")
-                return int(final_kills), int(final_deaths)
-            return None, None
-
-def extract_value(text, start_delimiter, end_delimiter):
-    """Extract value between delimiters"""
-    start_index = text.find(start_delimiter)
-    if start_index == -1:
-        return "0"
-    start_index += len(start_delimiter)
-    end_index = text.find(end_delimiter, start_index)
-    return text[start_index:end_index].strip() if end_index != -1 else "0"
-
-async def fetch_urchin_data(username, api_key):
-    urchin_url = f"https://urchin.ws/player/{username}?api_key={api_key}"
+        log_error("Alt Graph", username, "record_alts", str(e))
+
+async def refresh_alts(uuid, username):
+    """Fetch a player's quickbuy alts again and record them; started in the background"""
+    quickbuy_array = await fetch_quickbuy_alts(uuid)
+    if quickbuy_array is not None:
+        await record_alts(uuid, username, quickbuy_array)
+
+async def find_alts(uuid, username):
+    """Return (alt entries, cluster) for a player; entries are None if Polsu failed
+
+    A player already linked to alts in the alt graph is answered from its whole cluster
+    right away and Polsu is only asked again, in the background, once the player's own alt
+    list is stale; otherwise the alts are fetched live (cluster is None) and recorded.
+    """
+    with span("alt graph"):
+        cluster = await alt_graph.cluster(uuid, limit=ALT_CLUSTER_LIMIT)
+    # An empty cluster is never trusted: "no alts" always comes from a live fetch
+    if cluster is not None and cluster["alts"]:
+        if alt_graph.stale(cluster):
+            with background_priority():
+                flights.start("altgraph", uuid, refresh_alts, uuid, username)
+        return [{"username": alt["name"]} for alt in cluster["alts"]], cluster
+    # Fetch alts using the quickbuy API; if Polsu is down the rest of the embed still shows
+    quickbuy_array = await fetch_quickbuy_alts(uuid)
+    if quickbuy_array is not None:
+        flights.start("altgraph", uuid, record_alts, uuid, username, quickbuy_array)
+    return quickbuy_array, None
+
+async def fetch_fkdr(uuid, requested_by):
+    """Return (FKDR text, when the stats were fetched) for a player, served from the stats cache when possible"""
     try:
-        async with aiohttp.ClientSession() as session:
-            async with session.get(urchin_url) as response:
-                if response.status == 200:
-                    data = await response.json()
-                    if data.get("detail") == "Invalid API key":
-                        return "API_DOWN"
-                    return data
-                return "API_ERROR"
-    except Exception as e:
-        log_error("Urchin API Error", username, "fetch_urchin_data", str(e))
-        return "API_ERROR"
-
-def calculate_fkdr(final_kills, final_deaths):
-    if final_deaths == 0 and final_kills > 0:
-        return final_kills
-    if final_kills is None or final_deaths is None or (final_kills == 0 and final_deaths == 0):
-        return "N/A"
-    return final_kills / final_deaths
-
-def setup(bot):
+        current_stats, stats_fetched_at = await get_bwstats(uuid)
+        current_kills, current_deaths = final_kd(current_stats)
+        current_fkdr = calculate_fkdr(current_kills, current_deaths)
+    except UPSTREAM_ERRORS as e:
+        log_error("bwstats Unavailable", requested_by, "altcheck", str(e))
+        return "bwstats unavailable", None
+    if isinstance(current_fkdr, float):
+        current_fkdr = f"{current_fkdr:.2f}"
+    return current_fkdr, stats_fetched_at
+
+async def build_altcheck_embed(mojang_data, username, requested_by):
+    """Run the full altcheck pipeline for a resolved player and return its embed"""
+    uuid = mojang_data.get("id")
+    correct_username = mojang_data.get("name")
+    name_mc_link = f"https://namemc.com/profile/{uuid}"
+
+    # Render type, Urchin tags, bwstats and alts come from different places, so fetch them together
+    current_render, urchin_data_main, (current_fkdr, stats_fetched_at), (quickbuy_array, cluster) = await asyncio.gather(
+        render_store.get(uuid, correct_username),
+        fetch_urchin_data(correct_username),
+        fetch_fkdr(uuid, requested_by),
+        find_alts(uuid, correct_username)
+    )
+    type_main = format_urchin_tags(urchin_data_main)
+
+    # Use the render_type (current_render) in the Lunar Eclipse skin viewer URL
+    skin_image_url = f"https://starlightskins.lunareclipse.studio/render/{current_render}/{username}/bust"
+
+    # Similar names among every player the bot has resolved (local index, no API call)
+    with span("similar names"):
+        similar_names = name_index.similar(correct_username)
+    similar_names_text = ""
+    if similar_names:
+        similar_names_text = "**Similar Names:**\n"
+        for entry in similar_names:
+            name = entry.get("name")
+            similarity = entry.get("similarity", 0)
+            # The index remembers names an account used before, so flag those
+            if entry.get("id") == uuid:
+                similar_names_text += f"• {name} ({similarity*100:.1f}% similar, previous name)\n"
+            else:
+                similar_names_text += f"• [{name}](https://namemc.com/profile/{entry.get('id')}) ({similarity*100:.1f}% similar)\n"
+
+    alts = []
+    if quickbuy_array is not None:
+        alts = await resolve_alts(quickbuy_array)
+
+    # Create the embed with the player's skin image as the thumbnail
+    embed = discord.Embed(title=f"Alt Check: {correct_username}", color=0x00ff00)
+    embed.set_thumbnail(url=skin_image_url)
+    embed.add_field(name="UUID", value=uuid, inline=False)
+    embed.add_field(name="NameMC Profile", value=f"[Link]({name_mc_link})", inline=False)
+    embed.add_field(name="FKDR", value=f"{current_fkdr}", inline=False)
+    embed.add_field(name="Urchin Tags", value=f"{type_main}", inline=False)
+    if stats_fetched_at:
+        embed.set_footer(text="Stats fetched")
+        embed.timestamp = datetime.fromtimestamp(stats_fetched_at, tz=timezone.utc)
+
+    if similar_names_text:
+        embed.add_field(name="Similar Names", value=similar_names_text, inline=False)
+
+    if quickbuy_array is None:
+        embed.add_field(name="Alts Found", value="Polsu unavailable, alts could not be checked.", inline=False)
+    elif cluster is not None and alts:
+        hidden = cluster["size"] - 1 - len(alts)
+        embed.add_field(
+            name=f"Alts Found (cluster of {cluster['size']})",
+            value="\n".join(alts) + (f"\n…and {hidden} more" if hidden > 0 else ""),
+            inline=False
+        )
+    elif alts:
+        embed.add_field(name="Alts Found", value="\n".join(alts), inline=False)
+    else:
+        embed.add_field(name="Alts Found", value="No alts found.", inline=False)
+    return embed
+
+def parse_lobby(text):
+    """Unique usernames in order from a space/comma separated list or pasted /who output, plus the invalid ones"""
+    names, invalid, seen = [], [], set()
+    for token in re.split(r"[\s,]+", re.sub(r"^\s*ONLINE:", "", text, flags=re.IGNORECASE)):
+        # Rank prefixes like [MVP+] are not part of the name
+        if not token or token.startswith("["):
+            continue
+        if not VALID_USERNAME.match(token):
+            invalid.append(token)
+        elif token.lower() not in seen:
+            seen.add(token.lower())
+            names.append(token)
+    return names, invalid
+
+async def check_lobby_player(profile):
+    """FKDR, Urchin tags and alt count for one lobby player, fetched concurrently"""
+    uuid, name = profile["id"], profile["name"]
+    with span("lobby player", username=name):
+        stats, urchin_data, found = await asyncio.gather(
+            get_final_kd(uuid), fetch_urchin_data(name), find_alts(uuid, name), return_exceptions=True
+        )
+    # One upstream being down only blanks that column
+    if isinstance(stats, BaseException):
+        if not isinstance(stats, UPSTREAM_ERRORS):
+            raise stats
+        stats = (None, None)
+    if isinstance(urchin_data, BaseException):
+        raise urchin_data
+    if isinstance(found, BaseException):
+        raise found
+    quickbuy_array, cluster = found
+    if cluster is not None:
+        alt_count = cluster["size"] - 1
+    else:
+        alt_count = None if quickbuy_array is None else len(quickbuy_array)
+    return {"fkdr": calculate_fkdr(*stats), "tags": format_urchin_tags(urchin_data), "alts": alt_count}
+
+async def check_lobby(names):
+    """Resolve every name in one batch, then check all players concurrently within LOBBY_TIMEOUT
+
+    Returns (players, not_found, timed_out) where players are (profile, row) pairs and row is
+    None for players that ran out of time or failed, and timed_out lists the names that could
+    not be resolved before the deadline.
+    """
+    deadline = time.monotonic() + LOBBY_TIMEOUT
+    loop = asyncio.get_running_loop()
+    # The Mojang resolver sends all of these as bulk lookups; a slow one must not use up the deadline
+    lookups = [loop.create_task(resolve_username(name)) for name in names]
+    _, pending = await asyncio.wait(lookups, timeout=LOBBY_TIMEOUT)
+    for task in pending:
+        task.cancel()
+    found, not_found, timed_out = [], [], []
+    for name, task in zip(names, lookups):
+        if task in pending:
+            timed_out.append(name)
+        elif task.exception() is not None:
+            # Names go out in shared bulk lookups, so one failing means Mojang is down for the lobby
+            raise task.exception()
+        elif task.result():
+            found.append(task.result())
+        else:
+            not_found.append(name)
+
+    tasks = [loop.create_task(check_lobby_player(profile)) for profile in found]
+    if tasks:
+        _, pending = await asyncio.wait(tasks, timeout=max(0.0, deadline - time.monotonic()))
+        # Upstream requests are shared flights, so giving up on a player never cancels them
+        for task in pending:
+            task.cancel()
+    players = []
+    for profile, task in zip(found, tasks):
+        row = None
+        if task.done() and not task.cancelled():
+            if task.exception() is None:
+                row = task.result()
+            else:
+                log_error("Lobby Player Error", profile["name"], "lobbycheck", str(task.exception()))
+        players.append((profile, row))
+    return players, not_found, timed_out
+
+def format_fkdr(fkdr):
+    return f"{fkdr:.2f}" if isinstance(fkdr, float) else str(fkdr)
+
+def format_lobby_table(players):
+    """Monospace summary table, highest FKDR first"""
+    def sort_key(entry):
+        row = entry[1]
+        fkdr = row["fkdr"] if row else None
+        return -fkdr if isinstance(fkdr, (int, float)) else float("inf")
+
+    lines = [f"{'Player':<16} {'FKDR':>7} {'Alts':>4}  Tags"]
+    for profile, row in sorted(players, key=sort_key):
+        if row is None:
+            lines.append(f"{profile['name']:<16} {'-':>7} {'-':>4}  Timed out")
+            continue
+        alts = "?" if row["alts"] is None else str(row["alts"])
+        lines.append(f"{profile['name']:<16} {format_fkdr(row['fkdr']):>7} {alts:>4}  {row['tags'][:30]}")
+    return "```\n" + "\n".join(lines) + "\n```"
+
+class LobbyView(discord.ui.View):
+    """Select menu under a /lobbycheck summary that opens the full altcheck for one player"""
+
+    def __init__(self, players):
+        super().__init__(timeout=LOBBY_VIEW_TIMEOUT)
+        self.profiles = {profile["id"]: profile for profile, _ in players}
+        self.message = None
+        self.select = discord.ui.Select(
+            placeholder="Full alt check for…",
+            options=[
+                discord.SelectOption(
+                    label=profile["name"], value=profile["id"],
+                    description=f"{format_fkdr(row['fkdr'])} FKDR | {row['tags']}"[:100] if row else "Timed out"
+                )
+                # Discord allows 25 options per select menu
+                for profile, row in players[:25]
+            ]
+        )
+        self.select.callback = self.show_player
+        self.add_item(self.select)
+
+    async def show_player(self, interaction: discord.Interaction):
+        profile = self.profiles[self.select.values[0]]
+        try:
+            # Only the staff member who picked the player sees the drill-down
+            await interaction.response.defer(ephemeral=True, thinking=True)
+            log_command(interaction.user.name, "lobbycheck", f"Drill-down for: {profile['name']}")
+            embed = await build_altcheck_embed(profile, profile["name"], interaction.user.name)
+            await interaction.followup.send(embed=embed, ephemeral=True)
+        except Exception as e:
+            log_error("Command Error", interaction.user.name, "lobbycheck", str(e))
+            await interaction.followup.send("An error occurred while checking alts.", ephemeral=True)
+
+    async def on_timeout(self):
+        self.select.disabled = True
+        if self.message is not None:
+            try:
+                await self.message.edit(view=self)
+            except discord.HTTPException:
+                pass
+
+async def setup(bot):
     @bot.tree.command(name="altcheck", description="Check for alts on a Minecraft account")
     @app_commands.describe(username="The Minecraft username to check")
     async def altcheck(interaction: discord.Interaction, username: str):
@@ -113,126 +296,70 @@ def setup(bot):
             await interaction.response.defer(ephemeral=False)
             log_command(interaction.user.name, "altcheck", f"Checking alts for: {username}")
 
-            async with aiohttp.ClientSession() as session:
-                # Fetch the correct UUID and name using the Mojang API
-                mojang_response = await session.get(f"https://api.mojang.com/users/profiles/minecraft/{username}")
-                if mojang_response.status != 200:
-                    await interaction.followup.send(f"Could not find player: {username}", ephemeral=False)
-                    return
-
-                mojang_data = await mojang_response.json()
-                uuid = mojang_data.get("id")
-                correct_username = mojang_data.get("name")
-                name_mc_link = f"https://namemc.com/profile/{uuid}"
-
-                # Use the render_type (current_render) in the Lunar Eclipse skin viewer URL
-                render_data = load_render_type_data()
-                current_render = render_data.get(username, "default")
-                skin_image_url = f"https://starlightskins.lunareclipse.studio/render/{current_render}/{username}/bust"
-
-                # Fetch similar names
-                similar_names = await fetch_similar_names(correct_username)
-                similar_names_text = ""
-                if similar_names:
-                    similar_names_text = "**Similar Names:**\n"
-                    for entry in similar_names:
-                        name = entry.get("name")
-                        changed_at = entry.get("changed_at", 0)
-                        similarity = entry.get("similarity", 0)
-                        if changed_at:
-                            date = datetime.fromtimestamp(changed_at/1000).strftime('%Y-%m-%d')
-                            similar_names_text += f"• {name} ({similarity*100:.1f}% similar, Changed: {date})\n"
-                        else:
-                            similar_names_text += f"• {name} ({similarity*100:.1f}% similar)\n"
-
-                # Fetch urchin data for the main username
-                urchin_data_main = await fetch_urchin_data(correct_username, URCHIN_API_KEY)
-                if urchin_data_main == "API_DOWN":
-                    type_main = "Urchin API is currently down"
-                elif urchin_data_main == "API_ERROR":
-                    type_main = "Error fetching Urchin data"
-                elif urchin_data_main and "tags" in urchin_data_main and len(urchin_data_main["tags"]) > 0:
-                    tags = [tag.get("type", "").title() for tag in urchin_data_main["tags"] if tag.get("type")]
-                    type_main = ", ".join(tags) if tags else "None"
-                else:
-                    type_main = "None"
-
-                # Fetch stats using bwstats API
-                current_kills, current_deaths = await fetch_bwstats(uuid)
-                current_fkdr = calculate_fkdr(current_kills, current_deaths)
-
-                if isinstance(current_fkdr, float):
-                    current_fkdr = f"{current_fkdr:.2f}"
-
-                alts = []
-
-                # Fetch alts using the quickbuy API
-                polsu_url_alts = f"https://api.polsu.xyz/polsu/bedwars/quickbuy/all?uuid={uuid}"
-                polsu_response_alts = await session.get(polsu_url_alts, headers={"API-Key": POLSU_API_KEY})
-
-                if polsu_response_alts.status != 200:
-                    await interaction.followup.send(f"Error fetching alts data from Polsu for {username}", ephemeral=False)
-                    return
-
-                polsu_data_alts = await polsu_response_alts.json()
-
-                if polsu_data_alts.get("success") and "data" in polsu_data_alts and "quickbuy" in polsu_data_alts["data"]:
-                    quickbuy_array = polsu_data_alts["data"]["quickbuy"]
-                    for entry in quickbuy_array:
-                        alt_username = entry.get("username", "Unknown")
-                        if alt_username == "Unknown":
-                            alts.append(f"{alt_username} | N/A FKDR")
-                            continue
-
-                        mojang_alt_response = await session.get(
-                            f"https://api.mojang.com/users/profiles/minecraft/{alt_username}")
-                        if mojang_alt_response.status != 200:
-                            alts.append(f"{alt_username} | N/A FKDR")
-                            continue
-                        mojang_alt_data = await mojang_alt_response.json()
-                        alt_uuid = mojang_alt_data.get("id")
-
-                        # Fetch stats for the alt
-                        alt_kills, alt_deaths = await fetch_bwstats(alt_uuid)
-                        alt_fkdr = calculate_fkdr(alt_kills, alt_deaths)
-                        if isinstance(alt_fkdr, float):
-                            alt_fkdr = f"{alt_fkdr:.2f}"
-
-                        # Fetch urchin data for the alt username
-                        urchin_data_alt = await fetch_urchin_data(alt_username, URCHIN_API_KEY)
-                        if urchin_data_alt == "API_DOWN":
-                            type_alt = "Urchin API is currently down"
-                        elif urchin_data_alt == "API_ERROR":
-                            type_alt = "Error fetching Urchin data"
-                        elif urchin_data_alt and "tags" in urchin_data_alt and len(urchin_data_alt["tags"]) > 0:
-                            tags = [tag.get("type", "").title() for tag in urchin_data_alt["tags"] if tag.get("type")]
-                            type_alt = ", ".join(tags) if tags else "None"
-                        else:
-                            type_alt = "None"
-
-                        alts.append(f"[{alt_username}](https://namemc.com/profile/{alt_uuid}) | {alt_fkdr} FKDR | {type_alt}")
-
-                alts.sort()
-
-                # Create the embed with the player's skin image as the thumbnail
-                embed = discord.Embed(title=f"Alt Check: {correct_username}", color=0x00ff00)
-                embed.set_thumbnail(url=skin_image_url)
-                embed.add_field(name="UUID", value=uuid, inline=False)
-                embed.add_field(name="NameMC Profile", value=f"[Link]({name_mc_link})", inline=False)
-                embed.add_field(name="FKDR", value=f"{current_fkdr}", inline=False)
-                embed.add_field(name="Urchin Tags", value=f"{type_main}", inline=False)
-                
-                if similar_names_text:
-                    embed.add_field(name="Similar Names", value=similar_names_text, inline=False)
-
-                if alts:
-                    embed.add_field(name="Alts Found", value="\n".join(alts), inline=False)
-                else:
-                    embed.add_field(name="Alts Found", value="No alts found.", inline=False)
+            # Fetch the correct UUID and name using the Mojang API
+            try:
+                mojang_data = await resolve_username(username)
+            except UPSTREAM_ERRORS as e:
+                log_error("Mojang Unavailable", interaction.user.name, "altcheck", str(e))
+                await interaction.followup.send("Mojang is unavailable right now, please try again shortly.", ephemeral=False)
+                return
+            if mojang_data is None:
+                await interaction.followup.send(f"Could not find player: {username}", ephemeral=False)
+                return
+
+            embed = await build_altcheck_embed(mojang_data, username, interaction.user.name)
+            await interaction.followup.send(embed=embed, ephemeral=False)
+            log_command(interaction.user.name, "altcheck", f"Successfully checked alts for: {username}")
+
+        except Exception as e:
+            log_error("Command Error", interaction.user.name, "altcheck", str(e))
+            await interaction.followup.send("An error occurred while checking alts.", ephemeral=False)
 
+    @bot.tree.command(name="lobbycheck", description="Check a whole lobby for alts, FKDR and Urchin tags at once")
+    @app_commands.describe(usernames="Minecraft usernames separated by spaces or commas (you can paste /who output)")
+    async def lobbycheck(interaction: discord.Interaction, usernames: str):
+        try:
+            await interaction.response.defer(ephemeral=False)
+            names, invalid = parse_lobby(usernames)
+            skipped = names[LOBBY_MAX_PLAYERS:]
+            names = names[:LOBBY_MAX_PLAYERS]
+            log_command(interaction.user.name, "lobbycheck", f"Checking {len(names)} players: {', '.join(names)}")
+            if not names:
+                await interaction.followup.send("No valid usernames given.", ephemeral=False)
+                return
+
+            try:
+                players, not_found, timed_out = await check_lobby(names)
+            except UPSTREAM_ERRORS as e:
+                log_error("Mojang Unavailable", interaction.user.name, "lobbycheck", str(e))
+                await interaction.followup.send("Mojang is unavailable right now, please try again shortly.", ephemeral=False)
+                return
+
+            embed = discord.Embed(title=f"Lobby Check: {len(players)} players", color=0x00ff00)
+            if players:
+                embed.description = format_lobby_table(players)
+            else:
+                embed.description = "Timed out looking up these players." if timed_out else "None of these players exist."
+            notes = []
+            if not_found:
+                notes.append(f"Not found: {', '.join(not_found)}")
+            if timed_out:
+                notes.append(f"Timed out looking up: {', '.join(timed_out)}")
+            if invalid:
+                notes.append(f"Invalid names: {', '.join(invalid)}")
+            if skipped:
+                notes.append(f"Only the first {LOBBY_MAX_PLAYERS} names were checked, skipped: {', '.join(skipped)}")
+            if notes:
+                embed.add_field(name="Notes", value="\n".join(notes)[:1024], inline=False)
+            embed.set_footer(text="Pick a player below for their full alt check")
+
+            if players:
+                view = LobbyView(players)
+                view.message = await interaction.followup.send(embed=embed, view=view, ephemeral=False, wait=True)
+            else:
                 await interaction.followup.send(embed=embed, ephemeral=False)
-                log_command(interaction.user.name, "altcheck", f"Successfully checked alts for: {username}")
+            log_command(interaction.user.name, "lobbycheck", f"Successfully checked {len(players)} players")
 
         except Exception as e:
-            log_error("Command Error", interaction.user.name, "altcheck", str(e))
-            await interaction.followup.send("An error occurred while checking alts.", ephemeral=False) 
\ No newline at end of file
+            log_error("Command Error", interaction.user.name, "lobbycheck", str(e))
+            await interaction.followup.send("An error occurred while checking the lobby.", ephemeral=False)
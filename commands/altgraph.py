@@ -0,0 +1,242 @@
+import os
+import time
+from array import array
+from sqlitedb import SQLiteStore, DATA_DIR
+from utils import log_error, log_info
+
+ALT_GRAPH_DB_PATH = os.environ.get("ALT_GRAPH_DB_PATH", os.path.join(DATA_DIR, "altgraph.db"))
+
+# A player's own quickbuy alts are fetched again in the background once they are this old (seconds)
+ALT_GRAPH_REFRESH = float(os.environ.get("ALT_GRAPH_REFRESH", "3600"))
+
+# Edges per keyset query while loading; each query is one trip to the database thread
+ALT_GRAPH_LOAD_CHUNK = 20000
+
+# Players are numbered by the database so every cluster process agrees on the IDs;
+# edges are undirected and stored once with a < b
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS players (
+    id INTEGER PRIMARY KEY,
+    uuid TEXT UNIQUE NOT NULL,
+    name TEXT NOT NULL,
+    checked_at REAL
+);
+CREATE TABLE IF NOT EXISTS edges (
+    a INTEGER NOT NULL,
+    b INTEGER NOT NULL,
+    seen_at REAL NOT NULL,
+    PRIMARY KEY (a, b)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS edges_b ON edges (b);
+CREATE INDEX IF NOT EXISTS edges_seen_at ON edges (seen_at);
+"""
+
+class AltGraph(SQLiteStore):
+    """Alt relationships from every altcheck in SQLite, clustered in memory with union-find
+
+    Every player ID has a slot in three arrays: its union-find parent, the size of the
+    cluster it roots, and the next member of its cluster. The next pointers form one
+    circular list per cluster, so merging two clusters is a pointer swap and listing a
+    cluster takes time proportional to its size. Edges are only ever added, so clusters
+    never split.
+    """
+
+    SCHEMA = SCHEMA
+
+    def __init__(self, path=ALT_GRAPH_DB_PATH):
+        super().__init__(path)
+        self._parent = array("I", [0])
+        self._size = array("I", [1])
+        self._next = array("I", [0])
+        self.loaded = False
+        self.clusters = 0
+        self.largest = 1
+        self.edges = 0
+        # Newest seen_at already unioned, so each sync only reads edges stored since
+        self._synced_at = 0.0
+
+    async def load(self):
+        """Build the clusters from every stored edge; until this finishes lookups return None"""
+        started = time.perf_counter()
+        try:
+            await self.open()
+            # Taken before the scan, so edges stored while it runs are picked up by the first sync
+            self._synced_at = await self._call(_max_seen_at)
+            self._grow(await self._call(_max_player_id))
+            after = (0, 0)
+            while rows := await self._call(_select_edges, after, ALT_GRAPH_LOAD_CHUNK):
+                for a, b in rows:
+                    self._union(a, b)
+                after = rows[-1]
+            # Counted once at the end: record() may have added edges either side of the scan's cursor
+            self.edges = await self._call(_count_edges)
+        except Exception as e:
+            log_error("Alt Graph", "System", "load", str(e))
+            return
+        self.loaded = True
+        log_info("Alt Graph", "System", "load",
+                 f"Loaded {self.edges:,} edges into {self.clusters:,} clusters in {time.perf_counter() - started:.1f}s")
+
+    def _grow(self, player_id):
+        """Give every ID up to player_id a slot, as its own single-member cluster"""
+        start = len(self._parent)
+        if player_id < start:
+            return
+        new_ids = range(start, player_id + 1)
+        self._parent.extend(new_ids)
+        self._next.extend(new_ids)
+        self._size.extend([1] * len(new_ids))
+
+    def _find(self, player_id):
+        parent = self._parent
+        while parent[player_id] != player_id:
+            # Path halving keeps later finds close to constant time
+            parent[player_id] = parent[parent[player_id]]
+            player_id = parent[player_id]
+        return player_id
+
+    def _union(self, a, b):
+        root_a, root_b = self._find(a), self._find(b)
+        if root_a == root_b:
+            return False
+        size = self._size
+        if size[root_a] < size[root_b]:
+            root_a, root_b = root_b, root_a
+        # Both single players form a new cluster; two clusters become one
+        self.clusters += 1 - (size[root_a] > 1) - (size[root_b] > 1)
+        self._parent[root_b] = root_a
+        size[root_a] += size[root_b]
+        self.largest = max(self.largest, size[root_a])
+        # Splice the two circular member lists into one
+        self._next[a], self._next[b] = self._next[b], self._next[a]
+        return True
+
+    def _members(self, player_id):
+        members = [player_id]
+        member = self._next[player_id]
+        while member != player_id:
+            members.append(member)
+            member = self._next[member]
+        return members
+
+    async def record(self, uuid, name, alts, complete=True):
+        """Store a player's alts as (uuid, name) pairs and link them into its cluster
+
+        An incomplete list (some alts could not be resolved) is stored without a checked_at,
+        so the player's alts are fetched again on the next check.
+        """
+        alts = [(alt_uuid.replace("-", "").lower(), alt_name) for alt_uuid, alt_name in alts]
+        player_id, alt_ids, added = await self._call(
+            _record, uuid.replace("-", "").lower(), name, alts, time.time() if complete else None
+        )
+        self._grow(max([player_id, *alt_ids]))
+        for alt_id in alt_ids:
+            if alt_id != player_id:
+                self._union(player_id, alt_id)
+        # Until load() finishes its count includes these
+        if self.loaded:
+            self.edges += added
+
+    async def cluster(self, uuid, limit=None):
+        """Everyone linked to a player, directly or through other alts, or None if it isn't known yet
+
+        Returns {"checked_at", "size", "alts": [{"id", "name"}]} with the first limit alts
+        the graph learned about, sorted by name; size counts the whole cluster, including the player.
+        """
+        if not self.loaded:
+            return None
+        row = await self._call(_select_player, uuid.replace("-", "").lower())
+        if row is None:
+            return None
+        player_id, checked_at = row
+        # Another cluster process may have recorded this player or its alts since this one loaded
+        self._grow(player_id)
+        await self._sync()
+        member_ids = sorted(member for member in self._members(player_id) if member != player_id)
+        alts = await self._call(_select_players, member_ids if limit is None else member_ids[:limit])
+        alts.sort(key=lambda alt: alt["name"].lower())
+        return {"checked_at": checked_at, "size": len(member_ids) + 1, "alts": alts}
+
+    async def _sync(self):
+        """Union every edge stored since the last sync, by any cluster process
+
+        An edge between two players this process already knew can still join their
+        clusters, so the newly stored edges are applied as a whole rather than only
+        those touching the player being looked up.
+        """
+        rows = await self._call(_select_edges_since, self._synced_at)
+        for a, b, seen_at in rows:
+            self._grow(max(a, b))
+            self._union(a, b)
+            self._synced_at = max(self._synced_at, seen_at)
+
+    def stale(self, cluster):
+        """Whether a cluster() result's player should have its alts fetched again"""
+        return cluster["checked_at"] is None or time.time() - cluster["checked_at"] >= ALT_GRAPH_REFRESH
+
+    def stats(self):
+        """Sizes for admin output"""
+        return {
+            "players": len(self._parent) - 1,
+            "edges": self.edges,
+            "clusters": self.clusters,
+            "largest": self.largest,
+            "loaded": self.loaded
+        }
+
+def _max_player_id(conn):
+    return conn.execute("SELECT COALESCE(MAX(id), 0) FROM players").fetchone()[0]
+
+def _select_edges(conn, after, limit):
+    # Keyset pagination in primary key order, so no statement stays open between chunks
+    return conn.execute(
+        "SELECT a, b FROM edges WHERE (a, b) > (?, ?) ORDER BY a, b LIMIT ?", (*after, limit)
+    ).fetchall()
+
+def _max_seen_at(conn):
+    return conn.execute("SELECT COALESCE(MAX(seen_at), 0) FROM edges").fetchone()[0]
+
+def _count_edges(conn):
+    return conn.execute("SELECT COUNT(*) FROM edges").fetchone()[0]
+
+def _select_edges_since(conn, seen_at):
+    return conn.execute("SELECT a, b, seen_at FROM edges WHERE seen_at >= ?", (seen_at,)).fetchall()
+
+def _record(conn, uuid, name, alts, checked_at):
+    with conn:
+        conn.execute("BEGIN IMMEDIATE")
+        # Taken under the write lock and never behind the newest edge, so seen_at follows
+        # commit order even if the clock steps back, and a sync from the last seen_at misses nothing
+        now = max(time.time(), _max_seen_at(conn))
+        conn.execute(
+            "INSERT INTO players (uuid, name, checked_at) VALUES (?, ?, ?) "
+            "ON CONFLICT (uuid) DO UPDATE SET name = excluded.name, checked_at = excluded.checked_at",
+            (uuid, name, checked_at)
+        )
+        conn.executemany(
+            "INSERT INTO players (uuid, name) VALUES (?, ?) ON CONFLICT (uuid) DO UPDATE SET name = excluded.name",
+            alts
+        )
+        player_id = conn.execute("SELECT id FROM players WHERE uuid = ?", (uuid,)).fetchone()[0]
+        alt_ids = [conn.execute("SELECT id FROM players WHERE uuid = ?", (alt_uuid,)).fetchone()[0] for alt_uuid, _ in alts]
+        edges = [(min(player_id, alt_id), max(player_id, alt_id)) for alt_id in alt_ids if alt_id != player_id]
+        before = conn.total_changes
+        conn.executemany("INSERT OR IGNORE INTO edges (a, b, seen_at) VALUES (?, ?, ?)", [(a, b, now) for a, b in edges])
+        added = conn.total_changes - before
+        conn.executemany("UPDATE edges SET seen_at = ? WHERE a = ? AND b = ?", [(now, a, b) for a, b in edges])
+    return player_id, alt_ids, added
+
+def _select_player(conn, uuid):
+    return conn.execute("SELECT id, checked_at FROM players WHERE uuid = ?", (uuid,)).fetchone()
+
+def _select_players(conn, player_ids):
+    players = []
+    # SQLite caps the number of bound parameters per statement
+    for start in range(0, len(player_ids), 500):
+        chunk = player_ids[start:start + 500]
+        players += conn.execute(
+            f"SELECT uuid, name FROM players WHERE id IN ({', '.join('?' * len(chunk))})", chunk
+        ).fetchall()
+    return [{"id": uuid, "name": name} for uuid, name in players]
+
+alt_graph = AltGraph()
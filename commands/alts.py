@@ -0,0 +1,62 @@
+import os
+import asyncio
+from utils import log_error
+from health import UPSTREAM_ERRORS
+from mojang import resolve_username
+from bwstats import get_final_kd, calculate_fkdr
+from urchin import fetch_urchin_data, format_urchin_tags
+from tracing import span
+
+# Per-alt time budget in seconds before the alt is reported as timed out
+ALT_TIMEOUT = float(os.environ.get("ALT_TIMEOUT", "8"))
+
+async def resolve_alt(alt_username):
+    """Resolve a single quickbuy alt into its embed line"""
+    with span("alt", username=alt_username):
+        return await _resolve_alt(alt_username)
+
+async def _resolve_alt(alt_username):
+    mojang_alt_data = await resolve_username(alt_username)
+    if mojang_alt_data is None:
+        return f"{alt_username} | N/A FKDR"
+    alt_uuid = mojang_alt_data.get("id")
+
+    # Fetch stats and urchin data for the alt at the same time
+    alt_stats, urchin_data_alt = await asyncio.gather(
+        get_final_kd(alt_uuid),
+        fetch_urchin_data(alt_username),
+        return_exceptions=True
+    )
+    # A bwstats outage only blanks this alt's FKDR
+    if isinstance(alt_stats, BaseException):
+        if not isinstance(alt_stats, UPSTREAM_ERRORS):
+            raise alt_stats
+        alt_stats = (None, None)
+    if isinstance(urchin_data_alt, BaseException):
+        raise urchin_data_alt
+    alt_kills, alt_deaths = alt_stats
+    alt_fkdr = calculate_fkdr(alt_kills, alt_deaths)
+    if isinstance(alt_fkdr, float):
+        alt_fkdr = f"{alt_fkdr:.2f}"
+    type_alt = format_urchin_tags(urchin_data_alt)
+
+    return f"[{alt_username}](https://namemc.com/profile/{alt_uuid}) | {alt_fkdr} FKDR | {type_alt}"
+
+async def resolve_alts(quickbuy_array):
+    """Resolve all quickbuy alts concurrently and return their sorted embed lines"""
+    async def resolve_entry(entry):
+        alt_username = entry.get("username", "Unknown")
+        if alt_username == "Unknown":
+            return f"{alt_username} | N/A FKDR"
+        try:
+            return await asyncio.wait_for(resolve_alt(alt_username), ALT_TIMEOUT)
+        except asyncio.TimeoutError:
+            log_error("Alt Timeout", alt_username, "resolve_alts", f"Gave up after {ALT_TIMEOUT}s")
+            return f"{alt_username} | N/A FKDR | Timed out"
+        except Exception as e:
+            log_error("Alt Error", alt_username, "resolve_alts", str(e))
+            return f"{alt_username} | N/A FKDR"
+
+    alts = await asyncio.gather(*(resolve_entry(entry) for entry in quickbuy_array))
+    alts.sort()
+    return alts
@@ -0,0 +1,198 @@
+import os
+import re
+import time
+import asyncio
+from dataclasses import dataclass, asdict
+from utils import log_error
+from http_client import upstream_request, BWSTATS_URL
+from cache import TTLCache, MISSING
+from singleflight import flights
+from ratelimit import background_priority
+from health import UpstreamUnavailable
+from tracing import span
+
+# Stats younger than STATS_FRESH_TTL are served as-is; older ones are served while a
+# background refresh runs, until STATS_STALE_TTL after which callers wait for a new fetch
+STATS_FRESH_TTL = float(os.environ.get("STATS_FRESH_TTL", "60"))
+STATS_STALE_TTL = float(os.environ.get("STATS_STALE_TTL", "3600"))
+STATS_CACHE_SIZE = int(os.environ.get("STATS_CACHE_SIZE", "5000"))
+
+# Table label on the bwstats page -> BedwarsStats field
+STAT_LABELS = {
+    "Final Kills": "final_kills",
+    "Final Deaths": "final_deaths",
+    "Wins": "wins",
+    "Losses": "losses",
+    "Beds Broken": "beds_broken",
+    "Beds Lost": "beds_lost",
+    "Kills": "kills",
+    "Deaths": "deaths"
+}
+
+# "<td>Label</td><td>value</td>" rows for the labels we read, and the "Level: N" star value.
+# Matching only known labels with numeric values keeps the scan cheap on large pages
+STAT_ROW = re.compile(
+    r"<td>(" + "|".join(sorted(map(re.escape, STAT_LABELS), key=len, reverse=True)) + r")</td>"
+    r"\s*<td>([\d,]+)</td>"
+)
+STAR_LEVEL = re.compile(r"Level:\s*([\d,]+)")
+STAT_FIELDS = (*STAT_LABELS.values(), "stars")
+
+@dataclass
+class BedwarsStats:
+    """Parsed bwstats page; fields absent from the page are listed in missing and left at 0"""
+    final_kills: int = 0
+    final_deaths: int = 0
+    wins: int = 0
+    losses: int = 0
+    beds_broken: int = 0
+    beds_lost: int = 0
+    kills: int = 0
+    deaths: int = 0
+    stars: int = 0
+    missing: tuple = ()
+
+    def has(self, field):
+        """True if the field was actually present on the page"""
+        return field not in self.missing
+
+def parse_bwstats(html):
+    """Extract the stat rows and star level from a bwstats page in one pass over the rows"""
+    values = {}
+    level = STAR_LEVEL.search(html)
+    if level:
+        values["stars"] = int(level.group(1).replace(",", ""))
+    wanted = len(STAT_FIELDS) if level else len(STAT_LABELS)
+    for row in STAT_ROW.finditer(html):
+        label, value = row.groups()
+        field = STAT_LABELS[label]
+        # The overall table comes first; later per-mode tables reuse the same labels
+        if field not in values:
+            values[field] = int(value.replace(",", ""))
+            # Stop as soon as every field is found instead of scanning the per-mode tables
+            if len(values) == wanted:
+                break
+    if len(values) == len(STAT_FIELDS):
+        return BedwarsStats(**values)
+    return BedwarsStats(**values, missing=tuple(field for field in STAT_FIELDS if field not in values))
+
+async def fetch_bwstats(uuid):
+    """Fetch Bedwars stats from bwstats.shivam.pro (uncached)"""
+    url = f"{BWSTATS_URL}/user/{uuid}"
+    async with upstream_request("bwstats", "GET", url) as response:
+        if response.status >= 500 or response.status == 429:
+            raise UpstreamUnavailable("bwstats", f"HTTP {response.status}")
+        if response.status != 200:
+            return None
+        html = await response.text()
+    with span("parse bwstats", size=len(html)):
+        return parse_bwstats(html)
+
+def encode_entry(entry):
+    """(BedwarsStats or None, fetched_at) -> JSON-friendly form for the disk cache"""
+    stats, fetched_at = entry
+    return [asdict(stats) if stats else None, fetched_at]
+
+def decode_entry(encoded):
+    stats, fetched_at = encoded
+    if stats is not None:
+        stats = BedwarsStats(**{**stats, "missing": tuple(stats["missing"])})
+    return stats, fetched_at
+
+class StatsCache:
+    """Stale-while-revalidate cache of parsed bwstats pages keyed by UUID"""
+
+    def __init__(self, fresh_ttl=STATS_FRESH_TTL, stale_ttl=STATS_STALE_TTL, maxsize=STATS_CACHE_SIZE):
+        self.fresh_ttl = fresh_ttl
+        # Entries are (stats or None, fetched_at) tuples and live until they are too stale to serve
+        self._entries = TTLCache("bwstats", maxsize, stale_ttl, persistent=True,
+                                 encode=encode_entry, decode=decode_entry)
+        self.stale_served = 0
+        self.refreshes = 0
+
+    async def get(self, uuid):
+        """Return (stats, fetched_at); only waits on the network when nothing usable is cached"""
+        key = uuid.replace("-", "").lower()
+        with span("bwstats stats", uuid=key) as step:
+            entry = await self._entries.lookup(key)
+            if entry is MISSING:
+                return await asyncio.shield(self._refresh(key))
+            if time.time() - entry[1] > self.fresh_ttl:
+                self.stale_served += 1
+                if step is not None:
+                    step.set(cache="stale")
+                # Nobody is waiting on this refresh, so let interactive requests go first
+                with background_priority():
+                    self._refresh(key)
+            elif step is not None:
+                step.set(cache="hit")
+            return entry
+
+    def _refresh(self, key):
+        """Start (or join) the fetch for a UUID and return its task"""
+        return flights.start("bwstats", key, self._fetch, key)
+
+    async def _fetch(self, key):
+        try:
+            stats = await fetch_bwstats(key)
+            entry = (stats, time.time())
+            self._entries.set(key, entry)
+            self.refreshes += 1
+            return entry
+        except Exception as e:
+            log_error("Stats Refresh", "System", "StatsCache", f"{key}: {e}")
+            stale = self._entries.get(key)
+            if stale is not MISSING:
+                return stale
+            raise
+
+    def age(self, uuid):
+        """Seconds since the cached stats for a UUID were fetched, or None if not cached"""
+        entry = self._entries.get(uuid.replace("-", "").lower())
+        return None if entry is MISSING else time.time() - entry[1]
+
+stats_cache = StatsCache()
+
+async def get_bwstats(uuid):
+    """Return (BedwarsStats or None, fetched_at timestamp) for /bedwars"""
+    return await stats_cache.get(uuid)
+
+def final_kd(stats):
+    """(final_kills, final_deaths) with None for anything the page did not include"""
+    if not stats:
+        return None, None
+    final_kills = stats.final_kills if stats.has("final_kills") else None
+    final_deaths = stats.final_deaths if stats.has("final_deaths") else None
+    return final_kills, final_deaths
+
+def calculate_fkdr(final_kills, final_deaths):
+    """FKDR for /altcheck, or "N/A" if either count is missing or both are 0"""
+    if final_kills is None or final_deaths is None or (final_kills == 0 and final_deaths == 0):
+        return "N/A"
+    if final_deaths == 0 and final_kills > 0:
+        return final_kills
+    return final_kills / final_deaths
+
+def stat_ratio(stats, numerator, denominator):
+    """Ratio of two stats fields, or None if the page did not include either of them"""
+    if not stats.has(numerator) or not stats.has(denominator):
+        return None
+    value1, value2 = getattr(stats, numerator), getattr(stats, denominator)
+    if value2 == 0:
+        return value1 if value1 > 0 else 0
+    return value1 / value2
+
+def format_count(stats, field):
+    """Format a stat with thousands separators, or N/A if the page did not include it"""
+    if not stats.has(field):
+        return "N/A"
+    return f"{getattr(stats, field):,}"
+
+def format_ratio(value):
+    """Format ratio to 2 decimal places, or N/A if it could not be calculated"""
+    return "N/A" if value is None else f"{value:.2f}"
+
+async def get_final_kd(uuid):
+    """Return the (final_kills, final_deaths) tuple used by /altcheck"""
+    stats, _ = await stats_cache.get(uuid)
+    return final_kd(stats)
@@ -0,0 +1,132 @@
+import time
+from collections import OrderedDict
+from diskcache import disk_cache
+from utils import log_info
+from tracing import span
+
+# Every cache registers itself here so admin commands can inspect or purge it by name
+caches = {}
+
+MISSING = object()
+
+def _identity(value):
+    return value
+
+class TTLCache:
+    """Bounded LRU cache with separate TTLs for found and not-found (None) values"""
+
+    def __init__(self, name, maxsize, ttl, negative_ttl=None, persistent=False, encode=None, decode=None):
+        self.name = name
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.negative_ttl = ttl if negative_ttl is None else negative_ttl
+        # Persistent caches write through to the disk cache and fill from it on a miss;
+        # encode/decode convert values to and from something JSON can store
+        self.persistent = persistent
+        self.encode = encode or _identity
+        self.decode = decode or _identity
+        self._entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        caches[name] = self
+
+    def get(self, key, default=MISSING):
+        """Return the cached value (None for a negative entry) or default on a miss"""
+        entry = self._entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return default
+        value, expires_at = entry
+        if expires_at <= time.monotonic():
+            del self._entries[key]
+            self.expirations += 1
+            self.misses += 1
+            return default
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return value
+
+    async def lookup(self, key, default=MISSING):
+        """Like get(), but on a miss fill the entry from the disk cache if it has one"""
+        value = self.get(key)
+        if value is not MISSING or not self.persistent:
+            return default if value is MISSING else value
+        with span("disk cache", cache=self.name) as step:
+            row = await disk_cache.get(self.name, key)
+            if step is not None:
+                step.set(hit=row is not None)
+        if row is None:
+            return default
+        encoded, expires_at = row
+        value = None if encoded is None else self.decode(encoded)
+        self._store(key, value, expires_at - time.time())
+        return value
+
+    def set(self, key, value):
+        """Store a value; None is stored as a negative entry with the shorter TTL"""
+        ttl = self.negative_ttl if value is None else self.ttl
+        if ttl <= 0:
+            return
+        self._store(key, value, ttl)
+        if self.persistent:
+            disk_cache.put(self.name, key, None if value is None else self.encode(value), time.time() + ttl)
+
+    def _store(self, key, value, ttl):
+        self._entries[key] = (value, time.monotonic() + ttl)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    async def warm(self):
+        """Load this cache's longest-lived persisted entries; returns how many were loaded"""
+        if not self.persistent:
+            return 0
+        rows = await disk_cache.load(self.name, self.maxsize)
+        now = time.time()
+        # Rows come longest-lived first; insert in reverse so they end up most recently used
+        for key, encoded, expires_at in reversed(rows):
+            self._store(key, None if encoded is None else self.decode(encoded), expires_at - now)
+        return len(rows)
+
+    def pop(self, key):
+        """Drop a single entry, returning True if it was present"""
+        if self.persistent:
+            disk_cache.discard(self.name, key)
+        return self._entries.pop(key, None) is not None
+
+    def clear(self):
+        """Drop every entry, returning how many were removed"""
+        count = len(self._entries)
+        self._entries.clear()
+        if self.persistent:
+            disk_cache.discard(self.name)
+        return count
+
+    def __len__(self):
+        return len(self._entries)
+
+    def stats(self):
+        """Counters and sizes for admin/metrics output"""
+        lookups = self.hits + self.misses
+        negative = sum(1 for value, _ in self._entries.values() if value is None)
+        return {
+            "size": len(self._entries),
+            "maxsize": self.maxsize,
+            "negative": negative,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": self.hits / lookups if lookups else 0.0,
+            "evictions": self.evictions,
+            "expirations": self.expirations
+        }
+
+async def warm_caches():
+    """Open the disk cache and refill every persistent cache from it (called at startup)"""
+    await disk_cache.open()
+    loaded = {name: await cache.warm() for name, cache in caches.items() if cache.persistent}
+    log_info("Cache Warm", "System", "warm_caches",
+             ", ".join(f"{name}: {count}" for name, count in loaded.items()) or "No persistent caches")
+    return loaded
@@ -4,7 +4,7 @@ from discord import app_commands
 from discord.ui import View, Button
 from utils import log_command, log_error, log_info
 
-def setup(bot):
+async def setup(bot):
     @bot.tree.command(name="discord", description="Get a link to join our Discord server!")
     async def discord_embed(interaction: discord.Interaction):
         try:
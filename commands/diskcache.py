@@ -0,0 +1,186 @@
+import os
+import json
+import time
+import asyncio
+from sqlitedb import SQLiteStore, StoreClosed, DATA_DIR
+from utils import log_error, log_info
+
+CACHE_DB_PATH = os.environ.get("CACHE_DB_PATH", os.path.join(DATA_DIR, "cache.db"))
+
+# Pending writes are flushed in one transaction every interval, or sooner once this many queue up
+CACHE_FLUSH_INTERVAL = float(os.environ.get("CACHE_FLUSH_INTERVAL", "2"))
+CACHE_FLUSH_BATCH = int(os.environ.get("CACHE_FLUSH_BATCH", "500"))
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS entries (
+    namespace TEXT NOT NULL,
+    key TEXT NOT NULL,
+    value TEXT NOT NULL,
+    expires_at REAL NOT NULL,
+    PRIMARY KEY (namespace, key)
+);
+CREATE INDEX IF NOT EXISTS entries_expires_at ON entries (expires_at);
+"""
+
+class DiskCache(SQLiteStore):
+    """SQLite second tier behind the in-memory caches; values are JSON with wall-clock expiry"""
+
+    SCHEMA = SCHEMA
+
+    def __init__(self, path=CACHE_DB_PATH, flush_interval=CACHE_FLUSH_INTERVAL, flush_batch=CACHE_FLUSH_BATCH):
+        super().__init__(path)
+        self.flush_interval = flush_interval
+        self.flush_batch = flush_batch
+        # (namespace, key) -> (json value, expires_at); later writes replace earlier ones
+        self._pending = {}
+        # (namespace, key or None for the whole namespace) deletes waiting for the next flush
+        self._deletes = set()
+        self._wake = None
+        self._writer = None
+        self._stopping = False
+        self.hits = 0
+        self.misses = 0
+        self.writes = 0
+        self.flushes = 0
+
+    def _connect(self):
+        conn = super()._connect()
+        # Expired rows are never served; drop them once per start
+        conn.execute("DELETE FROM entries WHERE expires_at <= ?", (time.time(),))
+        return conn
+
+    async def open(self):
+        """Open the database and start the background writer"""
+        if self._conn is not None:
+            return
+        await super().open()
+        self._stopping = False
+        self._wake = asyncio.Event()
+        self._writer = asyncio.get_running_loop().create_task(self._write_loop())
+        log_info("Disk Cache", "System", "DiskCache", f"Opened {self.path}")
+
+    async def close(self):
+        """Stop the writer, flush anything still queued and close the database"""
+        if self._conn is None:
+            return
+        # Let the writer finish the batch it may be applying instead of cancelling it mid-write
+        self._stopping = True
+        self._wake.set()
+        await self._writer
+        await self.flush()
+        await super().close()
+
+    def put(self, namespace, key, value, expires_at):
+        """Queue a write; never touches the disk on the caller's path"""
+        if self._conn is None:
+            return
+        try:
+            encoded = json.dumps(value, separators=(",", ":"))
+        except (TypeError, ValueError) as e:
+            log_error("Disk Cache", "System", "DiskCache", f"Cannot persist {namespace}/{key}: {e}")
+            return
+        self._pending[(namespace, str(key))] = (encoded, expires_at)
+        if len(self._pending) >= self.flush_batch:
+            self._wake.set()
+
+    def discard(self, namespace, key=None):
+        """Queue removal of one key, or of the whole namespace when key is None"""
+        if self._conn is None:
+            return
+        if key is None:
+            self._pending = {pending: row for pending, row in self._pending.items() if pending[0] != namespace}
+        else:
+            self._pending.pop((namespace, str(key)), None)
+        self._deletes.add((namespace, None if key is None else str(key)))
+        self._wake.set()
+
+    async def get(self, namespace, key):
+        """Return (value, expires_at) for an unexpired entry, or None"""
+        if self._conn is None:
+            return None
+        pending = self._pending.get((namespace, str(key)))
+        if pending is not None:
+            row = pending
+        elif (namespace, None) in self._deletes or (namespace, str(key)) in self._deletes:
+            row = None
+        else:
+            try:
+                row = await self._call(_select, namespace, str(key), time.time())
+            except StoreClosed:
+                row = None
+        if row is None or row[1] <= time.time():
+            self.misses += 1
+            return None
+        self.hits += 1
+        return json.loads(row[0]), row[1]
+
+    async def load(self, namespace, limit):
+        """Return up to limit unexpired (key, value, expires_at) rows, longest-lived first"""
+        if self._conn is None:
+            return []
+        # Decoded on the worker thread too, so a large namespace doesn't stall the event loop
+        return await self._call(_load_namespace, namespace, time.time(), limit)
+
+    async def flush(self):
+        """Apply queued deletes, then write every queued entry, in a single transaction"""
+        if not (self._pending or self._deletes) or self._conn is None:
+            return
+        pending, self._pending = self._pending, {}
+        deletes, self._deletes = self._deletes, set()
+        rows = [(namespace, key, value, expires_at) for (namespace, key), (value, expires_at) in pending.items()]
+        try:
+            await self._call(_apply, deletes, rows)
+            self.writes += len(rows)
+            self.flushes += 1
+        except Exception as e:
+            log_error("Disk Cache", "System", "DiskCache", f"Flush of {len(rows)} entries failed: {e}")
+
+    async def _write_loop(self):
+        while not self._stopping:
+            try:
+                await asyncio.wait_for(self._wake.wait(), self.flush_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wake.clear()
+            await self.flush()
+
+    def stats(self):
+        """Counters for admin/metrics output"""
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "pending": len(self._pending),
+            "writes": self.writes,
+            "flushes": self.flushes
+        }
+
+def _select(conn, namespace, key, now):
+    return conn.execute(
+        "SELECT value, expires_at FROM entries WHERE namespace = ? AND key = ? AND expires_at > ?",
+        (namespace, key, now)
+    ).fetchone()
+
+def _select_namespace(conn, namespace, now, limit):
+    return conn.execute(
+        "SELECT key, value, expires_at FROM entries WHERE namespace = ? AND expires_at > ? "
+        "ORDER BY expires_at DESC LIMIT ?",
+        (namespace, now, limit)
+    ).fetchall()
+
+def _load_namespace(conn, namespace, now, limit):
+    return [(key, json.loads(value), expires_at) for key, value, expires_at in _select_namespace(conn, namespace, now, limit)]
+
+def _apply(conn, deletes, rows):
+    with conn:
+        conn.execute("BEGIN IMMEDIATE")
+        for namespace, key in deletes:
+            if key is None:
+                conn.execute("DELETE FROM entries WHERE namespace = ?", (namespace,))
+            else:
+                conn.execute("DELETE FROM entries WHERE namespace = ? AND key = ?", (namespace, key))
+        conn.executemany(
+            "INSERT OR REPLACE INTO entries (namespace, key, value, expires_at) VALUES (?, ?, ?, ?)",
+            rows
+        )
+
+disk_cache = DiskCache()
@@ -0,0 +1,113 @@
+import sys
+import time
+import importlib.abc
+import importlib.machinery
+from utils import log_error, log_info
+
+# Command modules loaded as discord.py extensions, in registration order
+EXTENSIONS = (
+    "altcheck",
+    "setrender",
+    "suggest",
+    "requestchange",
+    "discord_invite",
+    "bedwars",
+    "utility",
+    "server",
+    "admin"
+)
+
+# Extension -> {"import": seconds, "setup": seconds, "commands": count} from the last (re)load
+load_timings = {}
+
+# Extensions whose last (re)load failed; while any are listed the command tree is incomplete
+load_failures = set()
+
+class _TimedLoader(importlib.abc.Loader):
+    """Wraps an extension's loader to time running its module body"""
+
+    def __init__(self, loader):
+        self.loader = loader
+        self.seconds = 0.0
+
+    def create_module(self, spec):
+        return self.loader.create_module(spec)
+
+    def exec_module(self, module):
+        started = time.perf_counter()
+        try:
+            self.loader.exec_module(module)
+        finally:
+            self.seconds = time.perf_counter() - started
+
+    def __getattr__(self, name):
+        # get_source and friends, for tracebacks and inspect
+        return getattr(self.loader, name)
+
+class _TimedFinder(importlib.abc.MetaPathFinder):
+    """Hands load_extension a timed loader for one module, so it is imported exactly once"""
+
+    def __init__(self, name):
+        self.name = name
+        self.loader = None
+
+    def find_spec(self, fullname, path, target=None):
+        if fullname != self.name:
+            return None
+        spec = importlib.machinery.PathFinder.find_spec(fullname, path)
+        if spec is not None and spec.loader is not None:
+            self.loader = spec.loader = _TimedLoader(spec.loader)
+        return spec
+
+def _command_count(bot, name):
+    return sum(1 for command in bot.tree.walk_commands() if command.module == name)
+
+async def load_timed(bot, name, reload=False):
+    """(Re)load one extension, recording how long its import and its setup(bot) took
+
+    The import time covers the module body, including the shared modules it imports for
+    the first time; the rest of the load is setup(bot).
+    """
+    finder = _TimedFinder(name)
+    sys.meta_path.insert(0, finder)
+    started = time.perf_counter()
+    try:
+        if reload:
+            await bot.reload_extension(name)
+        else:
+            await bot.load_extension(name)
+    except Exception:
+        # A failed reload keeps the previous version loaded; a failed load leaves the module out
+        if not reload:
+            load_failures.add(name)
+        raise
+    finally:
+        sys.meta_path.remove(finder)
+    finished = time.perf_counter()
+    imported = finder.loader.seconds if finder.loader is not None else 0.0
+    load_failures.discard(name)
+    load_timings[name] = {
+        "import": imported,
+        "setup": finished - started - imported,
+        "commands": _command_count(bot, name)
+    }
+    return load_timings[name]
+
+async def load_extensions(bot, names=EXTENSIONS):
+    """Load every command extension and log a per-module startup report; returns the names that failed"""
+    started = time.perf_counter()
+    failed = []
+    for name in names:
+        try:
+            await load_timed(bot, name)
+        except Exception as e:
+            failed.append(name)
+            log_error("Extension Load", "System", name, str(e))
+    total = time.perf_counter() - started
+    report = ", ".join(
+        f"{name} {timing['import'] * 1000:.0f}+{timing['setup'] * 1000:.0f}ms"
+        for name, timing in sorted(load_timings.items(), key=lambda item: -(item[1]["import"] + item[1]["setup"]))
+    )
+    log_info("Startup", "System", "load_extensions",
+             f"Loaded {len(load_timings)}/{len(names)} extensions in {total * 1000:.0f}ms (import+setup): {report}")
+    return failed
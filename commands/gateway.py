@@ -0,0 +1,56 @@
+import os
+import discord
+import psutil
+from cache import caches
+
+# "low" skips member chunking and the caches no command reads; "full" is discord.py's default behaviour
+MEMORY_PROFILE = os.environ.get("MEMORY_PROFILE", "low").lower()
+
+# Messages kept in discord.py's message cache (0 disables it); defaults to 0 for "low" and 1000 for "full"
+MESSAGE_CACHE_SIZE = int(os.environ.get("MESSAGE_CACHE_SIZE", "0" if MEMORY_PROFILE == "low" else "1000"))
+
+def gateway_options():
+    """Intents and cache settings for the bot constructor, per MEMORY_PROFILE"""
+    intents = discord.Intents.default()
+    intents.guilds = True
+    if MEMORY_PROFILE == "full":
+        intents.members = True
+        return {
+            "intents": intents,
+            "max_messages": MESSAGE_CACHE_SIZE or None
+        }
+
+    # Commands only use the interaction payload (user, permissions), the channel cache and
+    # HTTP calls, so member lists, presences, voice states and typing events are never read
+    intents.members = False
+    intents.presences = False
+    intents.voice_states = False
+    intents.typing = False
+    return {
+        "intents": intents,
+        "member_cache_flags": discord.MemberCacheFlags.none(),
+        "chunk_guilds_at_startup": False,
+        "max_messages": MESSAGE_CACHE_SIZE or None
+    }
+
+def memory_report(bot):
+    """Process RSS and the number of objects in each discord.py and bot cache"""
+    guilds = bot.guilds
+    return {
+        "rss": psutil.Process().memory_info().rss,
+        "guilds": len(guilds),
+        "channels": sum(len(guild.channels) for guild in guilds),
+        "roles": sum(len(guild.roles) for guild in guilds),
+        "members": sum(len(guild.members) for guild in guilds),
+        "users": len(bot.users),
+        "emojis": len(bot.emojis),
+        "stickers": len(bot.stickers),
+        "voice_states": sum(len(guild._voice_states) for guild in guilds),
+        "messages": len(bot.cached_messages),
+        "bot_cache_entries": sum(len(cache) for cache in caches.values())
+    }
+
+def format_memory_report(report):
+    """One-line summary of a memory_report() for logs and embeds"""
+    counts = ", ".join(f"{name.replace('_', ' ')} {count:,}" for name, count in report.items() if name != "rss")
+    return f"RSS {report['rss'] / 1024 / 1024:.1f} MiB ({MEMORY_PROFILE} profile) | {counts}"
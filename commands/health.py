@@ -0,0 +1,97 @@
+import os
+import time
+import asyncio
+import aiohttp
+from utils import log_error, log_info
+
+# Consecutive failures that open a circuit, and how long it stays open before a probe is let through
+CIRCUIT_FAILURES = int(os.environ.get("CIRCUIT_FAILURES", "5"))
+CIRCUIT_RESET = float(os.environ.get("CIRCUIT_RESET", "30"))
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+class UpstreamUnavailable(Exception):
+    """Raised when an upstream's circuit is open or a request to it failed outright"""
+
+    def __init__(self, upstream, reason="circuit open"):
+        super().__init__(f"{upstream} unavailable ({reason})")
+        self.upstream = upstream
+        self.reason = reason
+
+# Everything a fetcher can raise when an upstream is down, slow or unreachable
+UPSTREAM_ERRORS = (UpstreamUnavailable, aiohttp.ClientError, asyncio.TimeoutError)
+
+class CircuitBreaker:
+    """Opens after repeated failures, fails fast while open, then lets a single probe through"""
+
+    def __init__(self, name, failure_threshold=CIRCUIT_FAILURES, reset_timeout=CIRCUIT_RESET):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self._state = CLOSED
+        self._failures = 0
+        self._opened_at = 0.0
+        self._probing = False
+        self.trips = 0
+        self.rejected = 0
+
+    @property
+    def state(self):
+        if self._state == OPEN and time.monotonic() - self._opened_at >= self.reset_timeout:
+            return HALF_OPEN
+        return self._state
+
+    def is_available(self):
+        """True if a request may be attempted right now"""
+        state = self.state
+        return state == CLOSED or (state == HALF_OPEN and not self._probing)
+
+    def before_request(self):
+        """Reserve the right to call the upstream, raising UpstreamUnavailable if the circuit is open"""
+        if not self.is_available():
+            self.rejected += 1
+            raise UpstreamUnavailable(self.name)
+        if self.state == HALF_OPEN:
+            self._probing = True
+
+    def record_success(self):
+        if self._state != CLOSED:
+            log_info("Circuit Closed", "System", self.name, "Probe succeeded, resuming requests")
+        self._state = CLOSED
+        self._failures = 0
+        self._probing = False
+
+    def record_failure(self, reason):
+        self._failures += 1
+        probe_failed = self._probing
+        self._probing = False
+        if probe_failed or (self._state == CLOSED and self._failures >= self.failure_threshold):
+            self._state = OPEN
+            self._opened_at = time.monotonic()
+            self.trips += 1
+            log_error("Circuit Open", "System", self.name,
+                      f"{reason}; failing fast for {self.reset_timeout:.0f}s after {self._failures} failures")
+
+    def release(self):
+        """End a request without a verdict (e.g. it was cancelled) so another probe can run"""
+        self._probing = False
+
+    def stats(self):
+        """State and counters for admin/metrics output"""
+        return {
+            "state": self.state,
+            "failures": self._failures,
+            "trips": self.trips,
+            "rejected": self.rejected
+        }
+
+breakers = {}
+
+def circuit(upstream):
+    """Return the circuit breaker for an upstream"""
+    breaker = breakers.get(upstream)
+    if breaker is None:
+        breaker = breakers[upstream] = CircuitBreaker(upstream)
+    return breaker
@@ -0,0 +1,170 @@
+import os
+import time
+import asyncio
+import aiohttp
+from contextlib import asynccontextmanager
+from utils import log_info
+from ratelimit import UpstreamLimiter, SharedLimiter
+from health import circuit
+from metrics import observe_upstream
+from tracing import span
+from ipc import cluster_client, CLUSTER_SIZE
+
+# Upstream base URLs (overridable so benchmarks can point at local stand-ins)
+MOJANG_API_URL = os.environ.get("MOJANG_API_URL", "https://api.mojang.com")
+MOJANG_SESSION_URL = os.environ.get("MOJANG_SESSION_URL", "https://sessionserver.mojang.com")
+BWSTATS_URL = os.environ.get("BWSTATS_URL", "https://bwstats.shivam.pro")
+POLSU_API_URL = os.environ.get("POLSU_API_URL", "https://api.polsu.xyz")
+URCHIN_API_URL = os.environ.get("URCHIN_API_URL", "https://urchin.ws")
+
+# Connection pool settings
+HTTP_LIMIT = int(os.environ.get("HTTP_LIMIT", "100"))
+HTTP_LIMIT_PER_HOST = int(os.environ.get("HTTP_LIMIT_PER_HOST", "10"))
+HTTP_DNS_CACHE_TTL = int(os.environ.get("HTTP_DNS_CACHE_TTL", "300"))
+HTTP_KEEPALIVE = float(os.environ.get("HTTP_KEEPALIVE", "30"))
+
+# Default request timeouts in seconds
+HTTP_TOTAL_TIMEOUT = float(os.environ.get("HTTP_TOTAL_TIMEOUT", "15"))
+HTTP_CONNECT_TIMEOUT = float(os.environ.get("HTTP_CONNECT_TIMEOUT", "5"))
+HTTP_READ_TIMEOUT = float(os.environ.get("HTTP_READ_TIMEOUT", "10"))
+
+# Total time budget per upstream request; connect/read timeouts above still apply within it
+UPSTREAM_TIMEOUT = {
+    "mojang": float(os.environ.get("MOJANG_TIMEOUT", "5")),
+    "bwstats": float(os.environ.get("BWSTATS_TIMEOUT", "8")),
+    "polsu": float(os.environ.get("POLSU_TIMEOUT", "8")),
+    "urchin": float(os.environ.get("URCHIN_TIMEOUT", "5"))
+}
+
+# Max concurrent in-flight requests per upstream
+UPSTREAM_CONCURRENCY = {
+    "mojang": int(os.environ.get("MOJANG_CONCURRENCY", "5")),
+    "bwstats": int(os.environ.get("BWSTATS_CONCURRENCY", "5")),
+    "polsu": int(os.environ.get("POLSU_CONCURRENCY", "5")),
+    "urchin": int(os.environ.get("URCHIN_CONCURRENCY", "5"))
+}
+
+# Token bucket per upstream: sustained requests per second (0 = unlimited) and burst size
+UPSTREAM_RATE = {
+    "mojang": float(os.environ.get("MOJANG_RATE", "10")),
+    "bwstats": float(os.environ.get("BWSTATS_RATE", "10")),
+    "polsu": float(os.environ.get("POLSU_RATE", "5")),
+    "urchin": float(os.environ.get("URCHIN_RATE", "5"))
+}
+UPSTREAM_BURST = {
+    "mojang": int(os.environ.get("MOJANG_BURST", "20")),
+    "bwstats": int(os.environ.get("BWSTATS_BURST", "20")),
+    "polsu": int(os.environ.get("POLSU_BURST", "10")),
+    "urchin": int(os.environ.get("URCHIN_BURST", "10"))
+}
+
+_session = None
+limiters = {}
+
+def create_session():
+    """Create a pooled ClientSession with keep-alive, DNS caching and default timeouts"""
+    connector = aiohttp.TCPConnector(
+        limit=HTTP_LIMIT,
+        limit_per_host=HTTP_LIMIT_PER_HOST,
+        ttl_dns_cache=HTTP_DNS_CACHE_TTL,
+        keepalive_timeout=HTTP_KEEPALIVE
+    )
+    timeout = aiohttp.ClientTimeout(
+        total=HTTP_TOTAL_TIMEOUT,
+        connect=HTTP_CONNECT_TIMEOUT,
+        sock_read=HTTP_READ_TIMEOUT
+    )
+    return aiohttp.ClientSession(connector=connector, timeout=timeout)
+
+async def start_session():
+    """Create the bot-wide session (called once from the bot's setup hook)"""
+    global _session
+    if _session is None or _session.closed:
+        _session = create_session()
+        log_info("HTTP Session", "System", "start_session", f"Pool started (limit={HTTP_LIMIT}, per_host={HTTP_LIMIT_PER_HOST})")
+    return _session
+
+async def close_session():
+    """Close the bot-wide session and release pooled connections"""
+    global _session
+    if _session is not None and not _session.closed:
+        await _session.close()
+        log_info("HTTP Session", "System", "close_session", "Pool closed")
+    _session = None
+
+def get_session():
+    """Return the shared session, creating it lazily if the setup hook has not run yet"""
+    global _session
+    if _session is None or _session.closed:
+        _session = create_session()
+    return _session
+
+def upstream_slot(upstream):
+    """Return the limiter that queues requests to an upstream by priority within its rate and concurrency"""
+    limiter = limiters.get(upstream)
+    if limiter is None:
+        concurrency = UPSTREAM_CONCURRENCY.get(upstream, HTTP_LIMIT_PER_HOST)
+        rate = UPSTREAM_RATE.get(upstream, 0)
+        burst = UPSTREAM_BURST.get(upstream, 1)
+        if cluster_client.enabled and rate:
+            # In a shard cluster the rate is enforced by the launcher so the quota stays global
+            limiter = SharedLimiter(
+                UpstreamLimiter(upstream, concurrency, 0, 1),
+                UpstreamLimiter(upstream, concurrency, rate / CLUSTER_SIZE, max(1, burst // CLUSTER_SIZE)),
+                cluster_client
+            )
+        else:
+            limiter = UpstreamLimiter(upstream, concurrency, rate, burst)
+        limiters[upstream] = limiter
+    return limiter
+
+@asynccontextmanager
+async def upstream_request(upstream, method, url, **kwargs):
+    """Send one request through the upstream's circuit breaker, rate limiter and timeout"""
+    breaker = circuit(upstream)
+    # Fail fast while the circuit is open instead of queueing behind the rate limiter
+    if not breaker.is_available():
+        observe_upstream(upstream, "circuit_open")
+        breaker.before_request()
+    limiter = upstream_slot(upstream)
+    # The query string is left out of traces since it can carry API keys
+    with span(f"{upstream} {method}", url=url.split("?", 1)[0]) as request_span:
+        with span("queue"):
+            await limiter.acquire()
+        try:
+            if not breaker.is_available():
+                observe_upstream(upstream, "circuit_open")
+            breaker.before_request()
+            timeout = aiohttp.ClientTimeout(
+                total=UPSTREAM_TIMEOUT.get(upstream, HTTP_TOTAL_TIMEOUT),
+                connect=HTTP_CONNECT_TIMEOUT,
+                sock_read=HTTP_READ_TIMEOUT
+            )
+            started = time.perf_counter()
+            status = "cancelled"
+            failed = False
+            try:
+                async with get_session().request(method, url, timeout=timeout, **kwargs) as response:
+                    status = response.status
+                    if request_span is not None:
+                        request_span.set(status=status)
+                    # Connection errors, timeouts, 5xx and 429 all count towards opening the circuit
+                    if response.status >= 500 or response.status == 429:
+                        failed = True
+                        breaker.record_failure(f"HTTP {response.status}")
+                    yield response
+                # Only once the caller has read the body, since that can still time out
+                if not failed:
+                    breaker.record_success()
+            except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+                status = type(e).__name__
+                if not failed:
+                    breaker.record_failure(f"{type(e).__name__}: {e}")
+                raise
+            except BaseException:
+                breaker.release()
+                raise
+            finally:
+                observe_upstream(upstream, status, time.perf_counter() - started)
+        finally:
+            limiter.release()
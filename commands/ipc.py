@@ -0,0 +1,206 @@
+import os
+import sys
+import json
+import math
+import time
+import asyncio
+from utils import log_error, log_info
+from ratelimit import UpstreamLimiter, request_priority
+
+# Set by the cluster launcher for each bot process; CLUSTER_IPC empty means a standalone bot
+CLUSTER_IPC = os.environ.get("CLUSTER_IPC", "")
+CLUSTER_ID = int(os.environ.get("CLUSTER_ID", "0"))
+CLUSTER_SIZE = int(os.environ.get("CLUSTER_SIZE", "1"))
+SHARD_IDS = [int(shard_id) for shard_id in os.environ.get("SHARD_IDS", "").split(",") if shard_id.strip()]
+SHARD_COUNT = int(os.environ.get("SHARD_COUNT", "0")) or None
+
+# How often each process reports its shards to the launcher
+CLUSTER_REPORT_INTERVAL = float(os.environ.get("CLUSTER_REPORT_INTERVAL", "15"))
+
+# Discord allows one IDENTIFY per 5 seconds per bot (max_concurrency 1) across all processes
+IDENTIFY_INTERVAL = 5.0
+
+# Replies slower than this mean the launcher is stuck; callers fall back to local behaviour
+IPC_TIMEOUT = float(os.environ.get("IPC_TIMEOUT", "30"))
+
+class ClusterServer:
+    """Runs in the launcher: one token bucket per upstream for the whole cluster, plus shard reports
+
+    The protocol is one JSON object per line over local TCP: requests carry an "id" and an
+    "op", replies echo the id with "ok" and a "result" or "error".
+    """
+
+    def __init__(self, rates, bursts):
+        # Concurrency stays per process; only the request rate is shared
+        self.limiters = {
+            upstream: UpstreamLimiter(upstream, sys.maxsize, rate, bursts.get(upstream, 1))
+            for upstream, rate in rates.items()
+        }
+        self.identify_limiter = UpstreamLimiter("identify", sys.maxsize, 1 / IDENTIFY_INTERVAL, 1)
+        self.reports = {}
+        self.restarts = {}
+        self._server = None
+
+    async def start(self, host="127.0.0.1", port=0):
+        self._server = await asyncio.start_server(self._handle_connection, host, port)
+        host, port = self._server.sockets[0].getsockname()[:2]
+        log_info("Cluster IPC", "System", "ClusterServer", f"Listening on {host}:{port}")
+        return f"{host}:{port}"
+
+    async def close(self):
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+            self._server = None
+
+    async def _handle_connection(self, reader, writer):
+        pending = set()
+        try:
+            while line := await reader.readline():
+                task = asyncio.create_task(self._handle_request(json.loads(line), writer))
+                pending.add(task)
+                task.add_done_callback(pending.discard)
+        except (ConnectionError, json.JSONDecodeError) as e:
+            log_error("Cluster IPC", "System", "ClusterServer", f"Dropping connection: {e}")
+        finally:
+            for task in pending:
+                task.cancel()
+            writer.close()
+
+    async def _handle_request(self, request, writer):
+        try:
+            result = await self.dispatch(request.get("op"), request)
+            reply = {"id": request.get("id"), "ok": True, "result": result}
+        except Exception as e:
+            reply = {"id": request.get("id"), "ok": False, "error": str(e)}
+        if not writer.is_closing():
+            writer.write(json.dumps(reply).encode("utf-8") + b"\n")
+
+    async def dispatch(self, op, request):
+        if op == "acquire":
+            limiter = self.limiters.get(request["upstream"])
+            if limiter is None:
+                return 0.0
+            # Queue at the caller's priority so interactive work stays ahead cluster-wide
+            request_priority.set(request.get("priority", 0))
+            waited = await limiter.acquire()
+            limiter.release()
+            return waited
+        if op == "identify":
+            waited = await self.identify_limiter.acquire()
+            self.identify_limiter.release()
+            return waited
+        if op == "report":
+            self.reports[str(request["cluster"])] = {**request["report"], "received_at": time.time()}
+            return None
+        if op == "cluster_stats":
+            return {"clusters": self.reports, "restarts": self.restarts}
+        raise ValueError(f"Unknown op {op!r}")
+
+class ClusterClient:
+    """Runs in each bot process: talks to the launcher's ClusterServer"""
+
+    def __init__(self, address=CLUSTER_IPC):
+        self.address = address
+        self._reader = None
+        self._writer = None
+        self._replies = {}
+        self._next_id = 0
+        self._read_task = None
+        self._connect_lock = asyncio.Lock()
+
+    @property
+    def enabled(self):
+        return bool(self.address)
+
+    @property
+    def connected(self):
+        return self._writer is not None and not self._writer.is_closing()
+
+    async def connect(self):
+        async with self._connect_lock:
+            if self.connected:
+                return
+            host, port = self.address.rsplit(":", 1)
+            self._reader, self._writer = await asyncio.open_connection(host, int(port))
+            self._read_task = asyncio.get_running_loop().create_task(self._read_loop())
+            log_info("Cluster IPC", "System", "ClusterClient", f"Cluster {CLUSTER_ID} connected to {self.address}")
+
+    async def close(self):
+        if self._writer is not None:
+            self._writer.close()
+            self._writer = None
+        if self._read_task is not None:
+            self._read_task.cancel()
+            self._read_task = None
+
+    async def _read_loop(self):
+        try:
+            while line := await self._reader.readline():
+                reply = json.loads(line)
+                future = self._replies.pop(reply.get("id"), None)
+                if future is None or future.done():
+                    continue
+                if reply.get("ok"):
+                    future.set_result(reply.get("result"))
+                else:
+                    future.set_exception(RuntimeError(reply.get("error")))
+        except (ConnectionError, json.JSONDecodeError) as e:
+            log_error("Cluster IPC", "System", "ClusterClient", f"Connection lost: {e}")
+        finally:
+            self._writer = None
+            for future in self._replies.values():
+                if not future.done():
+                    future.set_exception(ConnectionError("cluster IPC connection lost"))
+            self._replies.clear()
+
+    async def request(self, op, **fields):
+        """Send one request and wait for its reply
+
+        Raises ConnectionError if the launcher is unreachable and RuntimeError if it replied with an error.
+        """
+        self._next_id += 1
+        request_id = self._next_id
+        try:
+            if not self.connected:
+                await self.connect()
+            future = asyncio.get_running_loop().create_future()
+            self._replies[request_id] = future
+            self._writer.write(json.dumps({"id": request_id, "op": op, **fields}).encode("utf-8") + b"\n")
+            return await asyncio.wait_for(future, IPC_TIMEOUT)
+        except (OSError, asyncio.TimeoutError) as e:
+            raise ConnectionError(f"cluster IPC unavailable: {e}") from e
+        finally:
+            self._replies.pop(request_id, None)
+
+    async def acquire(self, upstream, priority):
+        """Wait for a token from the cluster-wide bucket for an upstream"""
+        return await self.request("acquire", upstream=upstream, priority=priority)
+
+    async def identify(self, shard_id):
+        """Wait for this shard's turn to IDENTIFY with the gateway"""
+        return await self.request("identify", shard=shard_id)
+
+    async def report(self, report):
+        return await self.request("report", cluster=CLUSTER_ID, report=report)
+
+    async def cluster_stats(self):
+        return await self.request("cluster_stats")
+
+cluster_client = ClusterClient()
+
+# Shard ID -> when it last connected, for per-shard uptime
+shard_connected_at = {}
+
+def shard_report(bot):
+    """This process's shards with their guild counts, latency and connection time"""
+    shards = {}
+    for shard_id in (bot.shard_ids or [0]):
+        shard = bot.get_shard(shard_id) if hasattr(bot, "get_shard") else None
+        latency = shard.latency if shard is not None else bot.latency
+        shards[str(shard_id)] = {
+            "guilds": sum(1 for guild in bot.guilds if (guild.shard_id or 0) == shard_id),
+            "latency": latency if math.isfinite(latency) else None,
+            "connected_at": shard_connected_at.get(shard_id)
+        }
+    return {"pid": os.getpid(), "started": bot.start_time.timestamp(), "shards": shards}
@@ -0,0 +1,259 @@
+import os
+import time
+import bisect
+import functools
+import contextvars
+import discord
+from aiohttp import web
+from discord.interactions import InteractionResponse
+from utils import log_info, error_hooks
+from cache import caches
+from diskcache import disk_cache
+from tracing import trace_interaction
+
+# Local Prometheus endpoint; 0 disables it
+METRICS_HOST = os.environ.get("METRICS_HOST", "127.0.0.1")
+METRICS_PORT = int(os.environ.get("METRICS_PORT", "9108"))
+
+# Histogram bucket upper bounds in seconds
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30)
+
+class Histogram:
+    """Prometheus-style histogram with fixed buckets, one series per label set"""
+
+    def __init__(self, name, help_text, labels, buckets=LATENCY_BUCKETS):
+        self.name = name
+        self.help_text = help_text
+        self.labels = labels
+        self.buckets = buckets
+        # label values -> [per-bucket counts (+Inf last), sum, count]
+        self.series = {}
+
+    def observe(self, label_values, value):
+        series = self.series.get(label_values)
+        if series is None:
+            series = self.series[label_values] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+        series[0][bisect.bisect_left(self.buckets, value)] += 1
+        series[1] += value
+        series[2] += 1
+
+    def quantile(self, label_values, q):
+        """Upper bound of the bucket holding the q-th observation (None if there is none)"""
+        series = self.series.get(label_values)
+        if not series or not series[2]:
+            return None
+        rank = q * series[2]
+        seen = 0
+        for bound, count in zip(self.buckets + (float("inf"),), series[0]):
+            seen += count
+            if seen >= rank:
+                return bound
+        return float("inf")
+
+    def mean(self, label_values):
+        series = self.series.get(label_values)
+        return series[1] / series[2] if series and series[2] else None
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} histogram"]
+        for label_values, (counts, total, count) in sorted(self.series.items()):
+            labels = _labels(self.labels, label_values)
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets + (float("inf"),), counts):
+                cumulative += bucket_count
+                le = "+Inf" if bound == float("inf") else repr(float(bound))
+                lines.append(f"{self.name}_bucket{{{labels}{',' if labels else ''}le=\"{le}\"}} {cumulative}")
+            lines.append(f"{self.name}_sum{{{labels}}} {total}")
+            lines.append(f"{self.name}_count{{{labels}}} {count}")
+        return lines
+
+class Counter:
+    """Monotonic counter, one value per label set"""
+
+    def __init__(self, name, help_text, labels):
+        self.name = name
+        self.help_text = help_text
+        self.labels = labels
+        self.series = {}
+
+    def inc(self, label_values, amount=1):
+        self.series[label_values] = self.series.get(label_values, 0) + amount
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} counter"]
+        for label_values, value in sorted(self.series.items()):
+            lines.append(f"{self.name}{{{_labels(self.labels, label_values)}}} {value}")
+        return lines
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+def _labels(names, values):
+    return ",".join(f'{name}="{_escape(value)}"' for name, value in zip(names, values))
+
+command_calls = Counter("acm_command_calls_total", "Slash command invocations by outcome", ("command", "outcome"))
+command_defer = Histogram("acm_command_defer_seconds", "Time from handler start to the first interaction response", ("command",))
+command_latency = Histogram("acm_command_duration_seconds", "Total slash command handler time", ("command",))
+upstream_latency = Histogram("acm_upstream_request_seconds", "Upstream request latency", ("upstream",))
+upstream_responses = Counter("acm_upstream_responses_total", "Upstream responses by status code or error", ("upstream", "status"))
+
+# Outcome of the command running in the current task; handlers catch their own exceptions
+# and report them through log_error("Command Error", ...), so that is what marks a failure
+_invocation = contextvars.ContextVar("invocation", default=None)
+
+def _on_error(error_type, user, command):
+    invocation = _invocation.get()
+    if invocation is not None and error_type == "Command Error":
+        invocation["outcome"] = "error"
+
+error_hooks.append(_on_error)
+
+def observe_upstream(upstream, status, seconds=None):
+    """Record one upstream request; status is the HTTP code or an error name"""
+    if seconds is not None:
+        upstream_latency.observe((upstream,), seconds)
+    upstream_responses.inc((upstream, str(status)))
+
+class TimedResponse(InteractionResponse):
+    """InteractionResponse that records how long the handler took to send its first response"""
+
+    __slots__ = ("_started", "_command")
+
+    def __init__(self, parent, command, started):
+        super().__init__(parent)
+        self._command = command
+        self._started = started
+
+    def _record(self):
+        if self._started is not None:
+            command_defer.observe((self._command,), time.perf_counter() - self._started)
+            self._started = None
+
+    async def defer(self, *args, **kwargs):
+        result = await super().defer(*args, **kwargs)
+        self._record()
+        return result
+
+    async def send_message(self, *args, **kwargs):
+        result = await super().send_message(*args, **kwargs)
+        self._record()
+        return result
+
+    async def edit_message(self, *args, **kwargs):
+        result = await super().edit_message(*args, **kwargs)
+        self._record()
+        return result
+
+    async def send_modal(self, *args, **kwargs):
+        result = await super().send_modal(*args, **kwargs)
+        self._record()
+        return result
+
+def instrument_command(command):
+    """Wrap an app command's callback to record defer time, total latency and outcome, and trace sampled calls"""
+    callback = command._callback
+    if getattr(callback, "__instrumented__", False):
+        return
+    name = command.qualified_name
+
+    @functools.wraps(callback)
+    async def wrapper(*args, **kwargs):
+        interaction = next((arg for arg in args if isinstance(arg, discord.Interaction)), None)
+        started = time.perf_counter()
+        if interaction is not None and not interaction.response.is_done():
+            interaction._cs_response = TimedResponse(interaction, name, started)
+        invocation = {"outcome": "ok"}
+        token = _invocation.set(invocation)
+        try:
+            with trace_interaction(name, interaction.id if interaction is not None else None):
+                return await callback(*args, **kwargs)
+        except BaseException:
+            invocation["outcome"] = "error"
+            raise
+        finally:
+            _invocation.reset(token)
+            command_latency.observe((name,), time.perf_counter() - started)
+            command_calls.inc((name, invocation["outcome"]))
+
+    wrapper.__instrumented__ = True
+    command._callback = wrapper
+
+def instrument_tree(bot):
+    """Instrument every registered command (again after a reload; already wrapped callbacks are skipped)"""
+    for command in bot.tree.walk_commands():
+        if isinstance(command, discord.app_commands.Command):
+            instrument_command(command)
+
+def cache_lines():
+    """Gauges and counters for the in-memory and disk caches, read at scrape time"""
+    lines = [
+        "# HELP acm_cache_hits_total Cache hits", "# TYPE acm_cache_hits_total counter",
+    ]
+    snapshot = {name: cache.stats() for name, cache in sorted(caches.items())}
+    lines += [f'acm_cache_hits_total{{cache="{name}"}} {stats["hits"]}' for name, stats in snapshot.items()]
+    lines += ["# HELP acm_cache_misses_total Cache misses", "# TYPE acm_cache_misses_total counter"]
+    lines += [f'acm_cache_misses_total{{cache="{name}"}} {stats["misses"]}' for name, stats in snapshot.items()]
+    lines += ["# HELP acm_cache_hit_ratio Cache hit ratio since start", "# TYPE acm_cache_hit_ratio gauge"]
+    lines += [f'acm_cache_hit_ratio{{cache="{name}"}} {stats["hit_ratio"]:.4f}' for name, stats in snapshot.items()]
+    lines += ["# HELP acm_cache_entries Cached entries", "# TYPE acm_cache_entries gauge"]
+    lines += [f'acm_cache_entries{{cache="{name}"}} {stats["size"]}' for name, stats in snapshot.items()]
+    if disk_cache.is_open:
+        disk = disk_cache.stats()
+        lines += ["# HELP acm_disk_cache_hits_total Disk cache hits", "# TYPE acm_disk_cache_hits_total counter",
+                  f"acm_disk_cache_hits_total {disk['hits']}",
+                  "# HELP acm_disk_cache_misses_total Disk cache misses", "# TYPE acm_disk_cache_misses_total counter",
+                  f"acm_disk_cache_misses_total {disk['misses']}"]
+    return lines
+
+def summarize():
+    """Per-command and per-upstream figures for the /stats command"""
+    commands = {}
+    for (command, outcome), count in command_calls.series.items():
+        entry = commands.setdefault(command, {"calls": 0, "errors": 0})
+        entry["calls"] += count
+        if outcome == "error":
+            entry["errors"] += count
+    for command, entry in commands.items():
+        entry["defer_avg"] = command_defer.mean((command,))
+        entry["p50"] = command_latency.quantile((command,), 0.5)
+        entry["p95"] = command_latency.quantile((command,), 0.95)
+
+    upstreams = {}
+    for (upstream, status), count in upstream_responses.series.items():
+        upstreams.setdefault(upstream, {"statuses": {}})["statuses"][status] = count
+    for upstream, entry in upstreams.items():
+        entry["avg"] = upstream_latency.mean((upstream,))
+        entry["p95"] = upstream_latency.quantile((upstream,), 0.95)
+    return {"commands": commands, "upstreams": upstreams}
+
+def render_metrics():
+    """All metrics in Prometheus text exposition format"""
+    lines = []
+    for metric in (command_calls, command_defer, command_latency, upstream_latency, upstream_responses):
+        lines += metric.render()
+    lines += cache_lines()
+    return "\n".join(lines) + "\n"
+
+_runner = None
+
+async def start_metrics_server():
+    """Serve /metrics on METRICS_HOST:METRICS_PORT (called from the bot's setup hook)"""
+    global _runner
+    if not METRICS_PORT or _runner is not None:
+        return
+
+    async def handle(request):
+        return web.Response(text=render_metrics(), content_type="text/plain", charset="utf-8")
+
+    app = web.Application()
+    app.router.add_get("/metrics", handle)
+    _runner = web.AppRunner(app, access_log=None)
+    await _runner.setup()
+    await web.TCPSite(_runner, METRICS_HOST, METRICS_PORT).start()
+    log_info("Metrics", "System", "start_metrics_server", f"Serving /metrics on {METRICS_HOST}:{METRICS_PORT}")
+
+async def stop_metrics_server():
+    global _runner
+    if _runner is not None:
+        await _runner.cleanup()
+        _runner = None
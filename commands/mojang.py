@@ -0,0 +1,150 @@
+import os
+import re
+import asyncio
+import aiohttp
+from utils import log_error
+from http_client import upstream_request, MOJANG_API_URL, MOJANG_SESSION_URL
+from health import UpstreamUnavailable
+from cache import TTLCache, MISSING
+from singleflight import flights
+from ratelimit import request_priority
+from tracing import span
+from nameindex import name_index
+
+# How long to collect lookups before sending a batch, and Mojang's max names per request
+MOJANG_BATCH_WINDOW = float(os.environ.get("MOJANG_BATCH_WINDOW_MS", "5")) / 1000
+MOJANG_BATCH_SIZE = 10
+
+# Identity cache sizing; not-found entries expire sooner so new accounts show up quickly
+IDENTITY_CACHE_SIZE = int(os.environ.get("IDENTITY_CACHE_SIZE", "10000"))
+IDENTITY_CACHE_TTL = float(os.environ.get("IDENTITY_CACHE_TTL", "3600"))
+IDENTITY_NEGATIVE_TTL = float(os.environ.get("IDENTITY_NEGATIVE_TTL", "300"))
+
+# Names Mojang accepts; anything else would make the whole bulk request fail
+VALID_USERNAME = re.compile(r"^[A-Za-z0-9_]{1,16}$")
+
+class MojangError(UpstreamUnavailable):
+    """Raised when a lookup fails, so callers can tell errors apart from not-found"""
+
+    def __init__(self, reason):
+        super().__init__("mojang", reason)
+
+class MojangResolver:
+    """Collects username lookups from all in-flight commands and resolves them in bulk"""
+
+    def __init__(self, window=MOJANG_BATCH_WINDOW, batch_size=MOJANG_BATCH_SIZE):
+        self.window = window
+        self.batch_size = batch_size
+        self._pending = {}
+        self._priority = None
+        self._flush_task = None
+        self.lookups = 0
+        self.requests = 0
+
+    async def resolve(self, username):
+        """Return {"id", "name"} for a username, or None if the player does not exist"""
+        if not username or not VALID_USERNAME.match(username):
+            return None
+        self.lookups += 1
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._pending.setdefault(username.lower(), []).append(future)
+        # A batch goes out at the most urgent priority of anyone waiting on it
+        priority = request_priority.get()
+        self._priority = priority if self._priority is None else min(self._priority, priority)
+        if self._flush_task is None:
+            self._flush_task = loop.create_task(self._flush_after_window())
+        return await future
+
+    async def _flush_after_window(self):
+        await asyncio.sleep(self.window)
+        pending, self._pending = self._pending, {}
+        request_priority.set(self._priority)
+        self._priority = None
+        self._flush_task = None
+        names = list(pending)
+        chunks = [names[i:i + self.batch_size] for i in range(0, len(names), self.batch_size)]
+        await asyncio.gather(*(self._resolve_chunk(chunk, pending) for chunk in chunks))
+
+    async def _resolve_chunk(self, names, pending):
+        try:
+            profiles = await self._fetch_profiles(names)
+        except Exception as e:
+            log_error("Mojang Bulk Lookup", "System", "MojangResolver", str(e))
+            # Transport errors become MojangError; anything else reaches the callers unchanged
+            if isinstance(e, (aiohttp.ClientError, asyncio.TimeoutError)):
+                e = MojangError(str(e))
+            for name in names:
+                for future in pending[name]:
+                    if not future.done():
+                        future.set_exception(e)
+            return
+
+        for name in names:
+            profile = profiles.get(name)
+            for future in pending[name]:
+                if not future.done():
+                    future.set_result(dict(profile) if profile else None)
+
+    async def _fetch_profiles(self, names):
+        """POST one chunk to the bulk profiles endpoint and index the result by lowercase name"""
+        self.requests += 1
+        async with upstream_request("mojang", "POST", f"{MOJANG_API_URL}/profiles/minecraft", json=names) as response:
+            if response.status != 200:
+                raise MojangError(f"Bulk lookup returned HTTP {response.status}")
+            data = await response.json()
+        return {profile["name"].lower(): profile for profile in data if profile.get("name")}
+
+resolver = MojangResolver()
+
+# Lowercase username -> profile (None when the name does not exist), and UUID -> profile
+names_cache = TTLCache("identity_names", IDENTITY_CACHE_SIZE, IDENTITY_CACHE_TTL, IDENTITY_NEGATIVE_TTL, persistent=True)
+uuids_cache = TTLCache("identity_uuids", IDENTITY_CACHE_SIZE, IDENTITY_CACHE_TTL, IDENTITY_NEGATIVE_TTL, persistent=True)
+
+def remember_profile(profile):
+    """Store a resolved profile under both its name and its UUID, and index the name for similarity search"""
+    names_cache.set(profile["name"].lower(), profile)
+    uuids_cache.set(profile["id"], profile)
+    name_index.add(profile["name"], profile["id"])
+
+async def resolve_username(username):
+    """Resolve a username to its Mojang profile, answering from the identity cache when possible"""
+    key = (username or "").lower()
+    with span("resolve username", username=username) as step:
+        profile = await names_cache.lookup(key)
+        if profile is not MISSING:
+            if step is not None:
+                step.set(cache="hit")
+            return dict(profile) if profile else None
+        profile = await flights.do("mojang", key, resolver.resolve, username)
+    # The bulk endpoint matches names case-insensitively, so remember_profile stores this key
+    if profile:
+        remember_profile(profile)
+    else:
+        names_cache.set(key, None)
+    return dict(profile) if profile else None
+
+async def _fetch_uuid_profile(uuid):
+    async with upstream_request("mojang", "GET", f"{MOJANG_SESSION_URL}/session/minecraft/profile/{uuid}") as response:
+        if response.status == 200:
+            data = await response.json()
+            return {"id": data["id"], "name": data["name"]}
+        if response.status in (204, 404):
+            return None
+        raise MojangError(f"Profile lookup returned HTTP {response.status}")
+
+async def resolve_uuid(uuid):
+    """Resolve a UUID to its current profile (canonical name), using the identity cache"""
+    key = uuid.replace("-", "").lower()
+    with span("resolve uuid", uuid=key) as step:
+        profile = await uuids_cache.lookup(key)
+        if profile is not MISSING:
+            if step is not None:
+                step.set(cache="hit")
+            return dict(profile) if profile else None
+        profile = await flights.do("mojang", ("uuid", key), _fetch_uuid_profile, key)
+    if profile:
+        remember_profile(profile)
+    else:
+        uuids_cache.set(key, None)
+    return dict(profile) if profile else None
@@ -0,0 +1,172 @@
+import os
+import math
+import time
+import heapq
+import asyncio
+from array import array
+from collections import Counter
+from bisect import bisect_left
+from diskcache import disk_cache
+from utils import log_info
+
+# Names held in memory, and how long a name stays in the persisted index after it was last seen
+NAME_INDEX_SIZE = int(os.environ.get("NAME_INDEX_SIZE", "500000"))
+NAME_INDEX_TTL = float(os.environ.get("NAME_INDEX_TTL", str(90 * 24 * 3600)))
+
+# warm() yields to the event loop after indexing this many names
+NAME_INDEX_WARM_CHUNK = 5000
+
+# Minimum trigram similarity (0-1) for a name to count as similar
+SIMILAR_NAME_MIN = float(os.environ.get("SIMILAR_NAME_MIN", "0.6"))
+
+def trigrams(name):
+    """Distinct trigrams of a lowercase name, padded so short names and prefixes still match"""
+    padded = f"$${name}$"
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+class NameIndex:
+    """Every username the bot has resolved, searchable by trigram similarity
+
+    Posting lists are keyed by (trigram count, trigram), as in simstring's CPMerge, so a
+    query only reads the lists for name sizes that could reach the threshold and can use a
+    tighter overlap bound per size. Each name gets an integer ID in insertion order, so
+    every list is an append-only, already sorted array of IDs (4 bytes each) that can be
+    binary searched. Names are never removed from memory; a name that moves to another
+    account keeps its ID and gets the new UUID.
+    """
+
+    def __init__(self, name="name_index", maxsize=NAME_INDEX_SIZE, ttl=NAME_INDEX_TTL):
+        self.name = name
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._ids = {}
+        self._names = []
+        self._uuids = []
+        self._postings = {}
+        self._max_size = 0
+        self.queries = 0
+        self.dropped = 0
+
+    def __len__(self):
+        return len(self._names)
+
+    def add(self, name, uuid, persist=True, replace=True):
+        """Record that a name belongs to a UUID; returns False once the index is full"""
+        key = name.lower()
+        if persist:
+            disk_cache.put(self.name, key, [name, uuid], time.time() + self.ttl)
+        name_id = self._ids.get(key)
+        if name_id is not None:
+            if not replace:
+                return True
+            self._names[name_id] = name
+            self._uuids[name_id] = uuid
+            return True
+        if len(self._names) >= self.maxsize:
+            # Still persisted above, so the most recently seen names win on the next start
+            self.dropped += 1
+            return False
+        name_id = len(self._names)
+        self._ids[key] = name_id
+        self._names.append(name)
+        self._uuids.append(uuid)
+        grams = trigrams(key)
+        size = len(grams)
+        self._max_size = max(self._max_size, size)
+        for gram in grams:
+            postings = self._postings.get((size, gram))
+            if postings is None:
+                postings = self._postings[(size, gram)] = array("I")
+            postings.append(name_id)
+        return True
+
+    def get(self, name):
+        """Return {"name", "id"} for an indexed name, or None"""
+        name_id = self._ids.get(name.lower())
+        if name_id is None:
+            return None
+        return {"name": self._names[name_id], "id": self._uuids[name_id]}
+
+    def similar(self, name, limit=5, min_similarity=SIMILAR_NAME_MIN, exclude_self=True):
+        """Top names by Dice similarity of their trigram sets, best first; [{"name", "id", "similarity"}]"""
+        self.queries += 1
+        key = name.lower()
+        query = trigrams(key)
+        self_id = self._ids.get(key) if exclude_self else None
+        # A strict threshold only touches rare trigrams, so start high and relax it until
+        # limit names qualify; everything a stricter pass missed scores below it, so the
+        # top names are the same as one pass at min_similarity
+        for threshold in [step for step in (0.9, 0.8, 0.7) if step > min_similarity] + [min_similarity]:
+            best = self._search(query, threshold, limit, self_id)
+            if len(best) >= limit:
+                break
+        return [
+            {"name": self._names[name_id], "id": self._uuids[name_id], "similarity": similarity}
+            for similarity, name_id in best
+        ]
+
+    def _search(self, query, min_similarity, limit, self_id):
+        """(similarity, id) of the best names scoring at least min_similarity"""
+        query_size = len(query)
+        # Dice similarity s needs s * q / (2 - s) <= size <= (2 - s) * q / s
+        smallest = max(1, math.ceil(min_similarity * query_size / (2 - min_similarity)))
+        largest = min(self._max_size, math.floor((2 - min_similarity) * query_size / min_similarity))
+        scored = []
+        for size in range(smallest, largest + 1):
+            needed = math.ceil(min_similarity * (query_size + size) / 2)
+            for name_id, count in self._overlaps(query, size, needed).items():
+                if name_id != self_id:
+                    scored.append((2 * count / (query_size + size), name_id))
+        return heapq.nlargest(limit, scored)
+
+    def _overlaps(self, query, size, needed):
+        """IDs of names with size trigrams sharing at least needed of the query's, with the count
+
+        Any such name is in at least one of the q - needed + 1 rarest posting lists, so
+        candidates are only gathered from those; the common lists are binary searched for
+        the candidates that can still make it.
+        """
+        postings = sorted((self._postings.get((size, gram), ()) for gram in query), key=len)
+        rare_count = len(query) - needed + 1
+        shared = Counter()
+        for ids in postings[:rare_count]:
+            shared.update(ids)
+        common = postings[rare_count:]
+        for position, ids in enumerate(common):
+            # Drop candidates that can no longer reach needed even if every remaining list has them
+            remaining = len(common) - position
+            shared = {name_id: count for name_id, count in shared.items() if count + remaining >= needed}
+            size = len(ids)
+            for name_id in shared:
+                index = bisect_left(ids, name_id)
+                if index < size and ids[index] == name_id:
+                    shared[name_id] += 1
+        return {name_id: count for name_id, count in shared.items() if count >= needed}
+
+    async def warm(self):
+        """Load the most recently seen persisted names; returns how many were loaded
+
+        Runs alongside commands: names they resolve in the meantime are newer than anything
+        on disk, so persisted rows never replace an entry that is already indexed.
+        """
+        rows = await disk_cache.load(self.name, self.maxsize)
+        # Rows come most recently seen first, so a reused name keeps its newest owner
+        for start in range(0, len(rows), NAME_INDEX_WARM_CHUNK):
+            for _, (name, uuid), _ in rows[start:start + NAME_INDEX_WARM_CHUNK]:
+                self.add(name, uuid, persist=False, replace=False)
+            await asyncio.sleep(0)
+        log_info("Name Index", "System", "warm", f"Loaded {len(self._names):,} names into {len(self._postings):,} posting lists")
+        return len(rows)
+
+    def stats(self):
+        """Sizes and counters for admin output"""
+        return {
+            "names": len(self._names),
+            "maxsize": self.maxsize,
+            "lists": len(self._postings),
+            "postings": sum(len(ids) for ids in self._postings.values()),
+            "queries": self.queries,
+            "dropped": self.dropped
+        }
+
+name_index = NameIndex()
@@ -0,0 +1,76 @@
+import os
+from utils import log_error
+from http_client import upstream_request, POLSU_API_URL
+from health import UPSTREAM_ERRORS
+from singleflight import flights
+from cache import TTLCache, MISSING
+from tracing import span
+
+# API Keys
+POLSU_API_KEY = os.environ["POLSU_KEY"]
+
+# Quickbuy alt lists change rarely; keep them (including empty lists) across restarts
+QUICKBUY_CACHE_SIZE = int(os.environ.get("QUICKBUY_CACHE_SIZE", "5000"))
+QUICKBUY_CACHE_TTL = float(os.environ.get("QUICKBUY_CACHE_TTL", "1800"))
+
+quickbuy_cache = TTLCache("quickbuy", QUICKBUY_CACHE_SIZE, QUICKBUY_CACHE_TTL, persistent=True)
+
+def remove_color_codes(text):
+    """Remove Minecraft color codes from text"""
+    if not text:
+        return text
+    # Remove § and any character after it
+    return ''.join(char for i, char in enumerate(text) if char != '§' and (i == 0 or text[i-1] != '§'))
+
+async def _fetch_formatted_data(uuid):
+    url = f"{POLSU_API_URL}/polsu/bedwars/formatted?uuid={uuid}"
+    try:
+        async with upstream_request("polsu", "GET", url, headers={"API-Key": POLSU_API_KEY}) as response:
+            if response.status != 200:
+                return None
+            data = await response.json()
+    except UPSTREAM_ERRORS as e:
+        log_error("Polsu API Error", uuid, "fetch_formatted_data", str(e))
+        return None
+    if data.get("success"):
+        formatted_data = data.get("data", {})
+        # Remove color codes from formatted name if it exists
+        if "formatted" in formatted_data:
+            formatted_data["formatted"] = remove_color_codes(formatted_data["formatted"])
+        return formatted_data
+    return None
+
+async def fetch_formatted_data(uuid):
+    """Fetch formatted data from Polsu API"""
+    key = uuid.replace("-", "").lower()
+    with span("polsu formatted", uuid=key):
+        return await flights.do("polsu", ("formatted", key), _fetch_formatted_data, key)
+
+async def _fetch_quickbuy_alts(uuid):
+    url = f"{POLSU_API_URL}/polsu/bedwars/quickbuy/all?uuid={uuid}"
+    try:
+        async with upstream_request("polsu", "GET", url, headers={"API-Key": POLSU_API_KEY}) as response:
+            if response.status != 200:
+                return None
+            data = await response.json()
+    except UPSTREAM_ERRORS as e:
+        log_error("Polsu API Error", uuid, "fetch_quickbuy_alts", str(e))
+        return None
+    if data.get("success") and "data" in data and "quickbuy" in data["data"]:
+        return data["data"]["quickbuy"]
+    return []
+
+async def fetch_quickbuy_alts(uuid):
+    """Fetch the quickbuy alt entries for a UUID; None if the Polsu request failed"""
+    key = uuid.replace("-", "").lower()
+    with span("polsu quickbuy", uuid=key) as step:
+        alts = await quickbuy_cache.lookup(key)
+        if alts is not MISSING:
+            if step is not None:
+                step.set(cache="hit")
+            return alts
+        alts = await flights.do("polsu", ("quickbuy", key), _fetch_quickbuy_alts, key)
+    # None means the request failed, which should not be cached
+    if alts is not None:
+        quickbuy_cache.set(key, alts)
+    return alts
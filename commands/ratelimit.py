@@ -0,0 +1,181 @@
+import time
+import heapq
+import asyncio
+import contextvars
+from contextlib import contextmanager
+from utils import log_info
+
+# Lower runs first: slash command work goes ahead of cache refreshes and help rebuilds
+INTERACTIVE = 0
+BACKGROUND = 1
+PRIORITY_NAMES = {INTERACTIVE: "interactive", BACKGROUND: "background"}
+
+# Queue waits longer than this are logged
+SLOW_WAIT = 1.0
+
+request_priority = contextvars.ContextVar("request_priority", default=INTERACTIVE)
+
+@contextmanager
+def background_priority():
+    """Run upstream requests made in this block (and tasks created in it) at background priority"""
+    token = request_priority.set(BACKGROUND)
+    try:
+        yield
+    finally:
+        request_priority.reset(token)
+
+class UpstreamLimiter:
+    """Token bucket plus concurrency cap for one upstream, granting queued requests by priority"""
+
+    def __init__(self, name, concurrency, rate, burst):
+        self.name = name
+        self.concurrency = concurrency
+        # rate is requests per second; 0 disables the token bucket and leaves only the concurrency cap
+        self.rate = rate
+        self.burst = max(1, burst)
+        self._tokens = float(self.burst)
+        self._updated = time.monotonic()
+        self._active = 0
+        self._waiters = []
+        self._seq = 0
+        self._timer = None
+        # priority -> [granted requests, total wait, max wait]
+        self._waits = {priority: [0, 0.0, 0.0] for priority in PRIORITY_NAMES}
+
+    def _refill(self):
+        if not self.rate:
+            return
+        now = time.monotonic()
+        self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def _can_start(self):
+        self._refill()
+        return self._active < self.concurrency and (not self.rate or self._tokens >= 1)
+
+    def _take(self):
+        self._active += 1
+        if self.rate:
+            self._tokens -= 1
+
+    def _dispatch(self):
+        """Hand free capacity to the highest-priority waiters, or wait for the next token"""
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        while self._waiters:
+            if not self._can_start():
+                if self._active < self.concurrency and self._timer is None:
+                    delay = (1 - self._tokens) / self.rate
+                    self._timer = asyncio.get_running_loop().call_later(delay, self._dispatch)
+                return
+            _, _, future = heapq.heappop(self._waiters)
+            if future.done():
+                continue
+            self._take()
+            future.set_result(None)
+
+    def _record(self, priority, waited):
+        stats = self._waits[priority]
+        stats[0] += 1
+        stats[1] += waited
+        stats[2] = max(stats[2], waited)
+        if waited >= SLOW_WAIT:
+            log_info("Rate Limit", "System", self.name,
+                     f"{PRIORITY_NAMES[priority]} request waited {waited:.2f}s ({len(self._waiters)} still queued)")
+
+    async def acquire(self):
+        """Wait for a slot and a token; returns how long the request was queued"""
+        priority = request_priority.get()
+        if not self._waiters and self._can_start():
+            self._take()
+            self._record(priority, 0.0)
+            return 0.0
+        started = time.monotonic()
+        future = asyncio.get_running_loop().create_future()
+        self._seq += 1
+        heapq.heappush(self._waiters, (priority, self._seq, future))
+        if self._timer is None:
+            self._dispatch()
+        try:
+            await future
+        except asyncio.CancelledError:
+            # Granted just before the cancel landed; give the slot to the next waiter
+            if future.done() and not future.cancelled():
+                self.release()
+            raise
+        waited = time.monotonic() - started
+        self._record(priority, waited)
+        return waited
+
+    def release(self):
+        self._active -= 1
+        self._dispatch()
+
+    async def __aenter__(self):
+        await self.acquire()
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        self.release()
+
+    def stats(self):
+        """Queue depth, tokens and per-priority wait times for admin/metrics output"""
+        self._refill()
+        return {
+            "active": self._active,
+            "queued": sum(1 for _, _, future in self._waiters if not future.done()),
+            "tokens": round(self._tokens, 2) if self.rate else None,
+            "waits": {
+                PRIORITY_NAMES[priority]: {
+                    "count": count,
+                    "avg": total / count if count else 0.0,
+                    "max": longest
+                }
+                for priority, (count, total, longest) in self._waits.items()
+            }
+        }
+
+class SharedLimiter:
+    """Concurrency cap in this process, with the token bucket shared by every process in the cluster"""
+
+    def __init__(self, local, fallback, client):
+        # local has no rate of its own: it only orders this process's requests and caps concurrency
+        self.name = local.name
+        self.local = local
+        # This process's share of the rate, used while the launcher cannot be reached
+        self.fallback = fallback
+        self.client = client
+        self.fallbacks = 0
+
+    async def acquire(self):
+        waited = await self.local.acquire()
+        started = time.monotonic()
+        try:
+            try:
+                await self.client.acquire(self.name, request_priority.get())
+            except (ConnectionError, RuntimeError):
+                # Unreachable launcher or an error reply: either way this process paces itself
+                self.fallbacks += 1
+                await self.fallback.acquire()
+                self.fallback.release()
+        except BaseException:
+            self.release()
+            raise
+        return waited + time.monotonic() - started
+
+    def release(self):
+        self.local.release()
+
+    async def __aenter__(self):
+        await self.acquire()
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        self.release()
+
+    def stats(self):
+        stats = self.local.stats()
+        stats["tokens"] = None
+        stats["fallbacks"] = self.fallbacks
+        return stats
@@ -0,0 +1,168 @@
+import os
+import json
+import time
+import asyncio
+from sqlitedb import SQLiteStore, DATA_DIR
+from utils import log_error, log_info
+from mojang import resolve_username
+from health import UPSTREAM_ERRORS
+from ratelimit import background_priority
+from tracing import span
+
+RENDER_DB_PATH = os.environ.get("RENDER_DB_PATH", os.path.join(DATA_DIR, "renders.db"))
+
+# Legacy username-keyed file, imported once into the database
+RENDER_DATA_PATH = os.path.join(DATA_DIR, "rendertype.json")
+
+# Bumped whenever the schema changes; version 1 also marks the JSON migration as done
+SCHEMA_VERSION = 1
+
+# Seconds between attempts at the JSON migration while Mojang fails some of its names
+RENDER_MIGRATION_RETRY = 300
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS renders (
+    uuid TEXT PRIMARY KEY NOT NULL,
+    name TEXT NOT NULL,
+    name_lower TEXT NOT NULL,
+    render_type TEXT NOT NULL,
+    updated_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS renders_name_lower ON renders (name_lower);
+"""
+
+UPSERT = """
+INSERT INTO renders (uuid, name, name_lower, render_type, updated_at) VALUES (?, ?, ?, ?, ?)
+ON CONFLICT (uuid) DO UPDATE SET
+    name = excluded.name, name_lower = excluded.name_lower,
+    render_type = excluded.render_type, updated_at = excluded.updated_at
+"""
+
+class RenderStore(SQLiteStore):
+    """Render type preferences in SQLite, keyed by UUID with a lowercase-name index"""
+
+    SCHEMA = SCHEMA
+
+    def __init__(self, path=RENDER_DB_PATH, json_path=RENDER_DATA_PATH):
+        super().__init__(path)
+        self.json_path = json_path
+
+    async def migrate(self):
+        """Run the one-time rendertype.json import; started in the background at startup
+
+        Lookups work throughout and fall back to the default render for names not imported
+        yet. The import is only marked done once every name has been resolved or found not
+        to exist, so a Mojang outage delays it instead of losing render types.
+        """
+        while await self._call(_get_version) < SCHEMA_VERSION:
+            try:
+                failed = await self._migrate_json()
+            except Exception as e:
+                log_error("Render Migration", "System", "RenderStore", str(e))
+                return
+            if not failed:
+                await self._call(_set_version, SCHEMA_VERSION)
+                return
+            log_error("Render Migration", "System", "RenderStore",
+                      f"Mojang failed for {len(failed)} names, retrying in {RENDER_MIGRATION_RETRY}s: {', '.join(failed[:20])}")
+            await asyncio.sleep(RENDER_MIGRATION_RETRY)
+
+    async def _migrate_json(self):
+        """Import the legacy file; returns the names that failed with upstream errors"""
+        try:
+            legacy = await asyncio.to_thread(_read_json, self.json_path)
+        except FileNotFoundError:
+            return []
+
+        # Legacy entries are keyed by name; resolve them through the batched Mojang resolver,
+        # behind any command that needs Mojang at the same time
+        names = list(legacy)
+        with background_priority():
+            profiles = await asyncio.gather(*(resolve_username(name) for name in names), return_exceptions=True)
+        rows, missing, failed = [], [], []
+        for name, profile in zip(names, profiles):
+            if isinstance(profile, dict):
+                rows.append((profile["id"], profile["name"], legacy[name]))
+            elif isinstance(profile, UPSTREAM_ERRORS):
+                failed.append(name)
+            elif isinstance(profile, BaseException):
+                raise profile
+            else:
+                missing.append(name)
+        # Never overwrite a render type set with /setrender since the last attempt
+        await self._call(_insert_missing, rows)
+        log_info("Render Migration", "System", "RenderStore",
+                 f"Imported {len(rows)} render types from rendertype.json"
+                 + (f", no such player: {', '.join(missing)}" if missing else ""))
+        return failed
+
+    async def get(self, uuid=None, username=None, default="default"):
+        """Return the render type for a player by UUID, falling back to a case-insensitive name lookup"""
+        with span("render store"):
+            row = await self._call(_select, uuid.replace("-", "").lower() if uuid else None,
+                                   username.lower() if username else None)
+        return row[0] if row else default
+
+    async def set(self, uuid, username, render_type):
+        """Set a player's render type and return the previous value"""
+        return await self._call(_replace, uuid.replace("-", "").lower(), username, render_type)
+
+    async def set_many(self, entries):
+        """Store (uuid, username, render_type) entries in a single transaction"""
+        rows = [(uuid.replace("-", "").lower(), username, render_type) for uuid, username, render_type in entries]
+        await self._call(_upsert_many, rows)
+        return len(rows)
+
+    async def count(self):
+        return await self._call(_count)
+
+def _read_json(path):
+    with open(path, "r") as file:
+        return json.load(file)
+
+def _get_version(conn):
+    return conn.execute("PRAGMA user_version").fetchone()[0]
+
+def _set_version(conn, version):
+    conn.execute(f"PRAGMA user_version = {int(version)}")
+
+def _select(conn, uuid, name_lower):
+    if uuid:
+        row = conn.execute("SELECT render_type FROM renders WHERE uuid = ?", (uuid,)).fetchone()
+        if row:
+            return row
+    if name_lower:
+        # A name can briefly map to two UUIDs after a name change; prefer the newest entry
+        return conn.execute(
+            "SELECT render_type FROM renders WHERE name_lower = ? ORDER BY updated_at DESC LIMIT 1",
+            (name_lower,)
+        ).fetchone()
+    return None
+
+def _replace(conn, uuid, name, render_type):
+    with conn:
+        conn.execute("BEGIN IMMEDIATE")
+        row = conn.execute("SELECT render_type FROM renders WHERE uuid = ?", (uuid,)).fetchone()
+        conn.execute(UPSERT, (uuid, name, name.lower(), render_type, time.time()))
+    return row[0] if row else "default"
+
+def _upsert_many(conn, rows):
+    now = time.time()
+    with conn:
+        conn.execute("BEGIN IMMEDIATE")
+        conn.executemany(UPSERT, ((uuid, name, name.lower(), render_type, now) for uuid, name, render_type in rows))
+
+def _insert_missing(conn, rows):
+    now = time.time()
+    with conn:
+        conn.execute("BEGIN IMMEDIATE")
+        conn.executemany(
+            "INSERT INTO renders (uuid, name, name_lower, render_type, updated_at) VALUES (?, ?, ?, ?, ?) "
+            "ON CONFLICT (uuid) DO NOTHING",
+            ((uuid, name, name.lower(), render_type, now) for uuid, name, render_type in rows)
+        )
+
+def _count(conn):
+    return conn.execute("SELECT COUNT(*) FROM renders").fetchone()[0]
+
+render_store = RenderStore()
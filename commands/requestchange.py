@@ -1,26 +1,22 @@
 import discord
 from discord.ext import commands
 from discord import app_commands
-import json
 import os
-from dotenv import load_dotenv
+import asyncio
 from utils import log_command, log_error, log_info
-
-load_dotenv()
+from renders import render_store
+from mojang import resolve_username
+from health import UPSTREAM_ERRORS
+from ratelimit import background_priority
 
 # Load render channel from environment variable
 RENDER_CHANNEL = os.environ["RENDERS"]
 
-def load_render_type_data():
-    try:
-        current_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
-        data_dir = os.path.join(current_dir, "data")
-        with open(os.path.join(data_dir, "rendertype.json"), "r") as file:
-            return json.load(file)
-    except FileNotFoundError:
-        return {}
+# Seconds to wait for the player's UUID before falling back to a name lookup; the
+# command answers without deferring, so this has to stay well inside Discord's 3s
+REQUEST_RESOLVE_TIMEOUT = 1.5
 
-def setup(bot):
+async def setup(bot):
     @bot.tree.command(
         name="requestchange", 
         description="Request a change for your player model rendering"
@@ -70,11 +66,17 @@ def setup(bot):
                 await interaction.response.send_message(f"❌ Invalid render type. Please choose a valid type from [Lunar Eclipse Docs](<https://docs.lunareclipse.studio/>).", ephemeral=True)
                 return
 
-            # Load render type data
-            render_data = load_render_type_data()
+            # Render types are stored by UUID, so look the player up first to find one set
+            # before a rename (the identity cache answers most of these)
+            try:
+                with background_priority():
+                    profile = await asyncio.wait_for(resolve_username(username), REQUEST_RESOLVE_TIMEOUT)
+            except UPSTREAM_ERRORS as e:
+                log_error("Mojang Unavailable", interaction.user.name, "requestchange", str(e))
+                profile = None
 
             # Get the current render type (defaults to "default" if not found)
-            current_render = render_data.get(username, "default")
+            current_render = await render_store.get(uuid=profile["id"] if profile else None, username=username)
             log_info("Current Render", interaction.user.name, "requestchange", f"Current render for {username}: {current_render}")
 
             # Create an embed for the request change
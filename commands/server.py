@@ -3,7 +3,7 @@ from discord.ext import commands
 from discord import app_commands
 from utils import log_command, log_error, log_info
 
-def setup(bot):
+async def setup(bot):
     @bot.tree.command(name="announce", description="Make an announcement")
     @app_commands.describe(
         channel="The channel to announce in",
@@ -1,34 +1,68 @@
 import discord
 from discord.ext import commands
 from discord import app_commands
-import json
 import os
-from dotenv import load_dotenv
+import json
+import asyncio
 from utils import log_command, log_error, log_info
-
-load_dotenv()
+from renders import render_store
+from mojang import resolve_username
+from health import UPSTREAM_ERRORS
 
 # Load admin IDs from environment variable
 ADMIN_IDS = [int(id) for id in os.environ["ADMIN_IDS"].split(",")]
 
-def load_render_type_data():
-    try:
-        current_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
-        data_dir = os.path.join(current_dir, "data")
-        with open(os.path.join(data_dir, "rendertype.json"), "r") as file:
-            return json.load(file)
-    except FileNotFoundError:
-        return {}
+# Largest import file accepted by /setrender
+RENDER_IMPORT_MAX_BYTES = int(os.environ.get("RENDER_IMPORT_MAX_BYTES", str(2 * 1024 * 1024)))
+
+VALID_RENDER_TYPES = {
+    "default", "marching", "walking", "crouching", "crossed", "criss_cross", "ultimate", "isometric",
+    "head", "custom", "cheering", "relaxing", "trudging", "cowering", "pointing", "lunging", "dungeons",
+    "facepalm", "sleeping", "dead", "archer", "kicking", "mojavatar", "high_ground", "clown"
+}
+
+def parse_render_import(content):
+    """Parse a JSON object of username -> render type, or "username,render_type" lines"""
+    text = content.decode("utf-8-sig").strip()
+    if text.startswith("{"):
+        return [(str(name), str(render)) for name, render in json.loads(text).items()]
+    entries = []
+    for line in text.splitlines():
+        line = line.strip()
+        if not line or line.startswith("#"):
+            continue
+        name, _, render = line.replace(",", " ").partition(" ")
+        entries.append((name.strip(), render.strip()))
+    return entries
+
+async def import_render_types(entries):
+    """Resolve and store imported entries; returns (imported count, rejected lines, names Mojang failed on)"""
+    rejected = [f"{name} ({render or 'no render type'})" for name, render in entries if render not in VALID_RENDER_TYPES]
+    entries = [(name, render) for name, render in entries if render in VALID_RENDER_TYPES]
 
-def save_render_type_data(data):
-    current_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
-    data_dir = os.path.join(current_dir, "data")
-    with open(os.path.join(data_dir, "rendertype.json"), "w") as file:
-        json.dump(data, file, indent=4)
+    # Names in one import are resolved together by the batched Mojang resolver
+    profiles = await asyncio.gather(*(resolve_username(name) for name, _ in entries), return_exceptions=True)
+    rows, failed = [], []
+    for (name, render), profile in zip(entries, profiles):
+        if isinstance(profile, dict):
+            rows.append((profile["id"], profile["name"], render))
+        elif profile is None:
+            rejected.append(f"{name} (not found)")
+        elif isinstance(profile, UPSTREAM_ERRORS):
+            # The name may well exist; these are worth importing again later
+            failed.append(name)
+        else:
+            raise profile
+    imported = await render_store.set_many(rows)
+    return imported, rejected, failed
 
-def setup(bot):
+async def setup(bot):
     @bot.tree.command(name="setrender", description="Set render type for a Minecraft username")
-    @app_commands.describe(username="The Minecraft username", render_type="The render type to set")
+    @app_commands.describe(
+        username="The Minecraft username",
+        render_type="The render type to set",
+        file="JSON or \"username,render_type\" lines to import in bulk"
+    )
     @app_commands.choices(render_type=[
         app_commands.Choice(name="Default", value="default"),
         app_commands.Choice(name="Marching", value="marching"),
@@ -56,9 +90,13 @@ def setup(bot):
         app_commands.Choice(name="High Ground", value="high_ground"),
         app_commands.Choice(name="Clown", value="clown")
     ])
-    async def set_render_type(interaction: discord.Interaction, username: str, render_type: str):
+    async def set_render_type(interaction: discord.Interaction, username: str = None, render_type: str = None,
+                              file: discord.Attachment = None):
         try:
-            log_command(interaction.user.name, "setrender", f"Attempting to set render type for {username} to {render_type}")
+            if file:
+                log_command(interaction.user.name, "setrender", f"Attempting to import render types from {file.filename}")
+            else:
+                log_command(interaction.user.name, "setrender", f"Attempting to set render type for {username} to {render_type}")
             
             # Check if the user's ID is in the list of admin IDs
             if interaction.user.id not in ADMIN_IDS:
@@ -66,20 +104,44 @@ def setup(bot):
                 await interaction.response.send_message("You are not authorized to use this command.", ephemeral=False)
                 return
 
-            # Load existing render type data
-            render_data = load_render_type_data()
-            current_render = render_data.get(username, "default")
-            log_info("Current Render", interaction.user.name, "setrender", f"Current render for {username}: {current_render}")
+            if file:
+                if file.size > RENDER_IMPORT_MAX_BYTES:
+                    await interaction.response.send_message("That file is too large to import.", ephemeral=False)
+                    return
+                await interaction.response.defer(ephemeral=False)
+                entries = parse_render_import(await file.read())
+                imported, rejected, failed = await import_render_types(entries)
+                log_command(interaction.user.name, "setrender",
+                            f"Imported {imported} render types, rejected {len(rejected)}, Mojang failed on {len(failed)}")
+                message = f"Imported {imported} render types."
+                if rejected:
+                    message += f"\nSkipped {len(rejected)}: " + ", ".join(rejected[:20]) + (" ..." if len(rejected) > 20 else "")
+                if failed:
+                    message += (f"\nMojang unavailable, import these again later ({len(failed)}): "
+                                + ", ".join(failed[:20]) + (" ..." if len(failed) > 20 else ""))
+                await interaction.followup.send(message[:2000], ephemeral=False)
+                return
+
+            if not username or not render_type:
+                await interaction.response.send_message("Provide a username and render type, or attach a file to import.", ephemeral=False)
+                return
 
-            # Update the render type for the specified username
-            render_data[username] = render_type
+            await interaction.response.defer(ephemeral=False)
+            profile = await resolve_username(username)
+            if profile is None:
+                await interaction.followup.send(f"Could not find player: {username}", ephemeral=False)
+                return
 
-            # Save the updated data back to the JSON file
-            save_render_type_data(render_data)
+            # Render types are stored by UUID so they survive name changes
+            current_render = await render_store.set(profile["id"], profile["name"], render_type)
+            log_info("Current Render", interaction.user.name, "setrender", f"Current render for {username}: {current_render}")
             log_command(interaction.user.name, "setrender", f"Successfully updated render type for {username} from {current_render} to {render_type}")
 
-            await interaction.response.send_message(f"Render type for {username} has been set to {render_type}.", ephemeral=False)
+            await interaction.followup.send(f"Render type for {profile['name']} has been set to {render_type}.", ephemeral=False)
 
         except Exception as e:
             log_error("Command Error", interaction.user.name, "setrender", str(e))
-            await interaction.response.send_message("An error occurred while updating the render type.", ephemeral=False) 
\ No newline at end of file
+            if interaction.response.is_done():
+                await interaction.followup.send("An error occurred while updating the render type.", ephemeral=False)
+            else:
+                await interaction.response.send_message("An error occurred while updating the render type.", ephemeral=False) 
\ No newline at end of file
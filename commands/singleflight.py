@@ -0,0 +1,43 @@
+import asyncio
+from collections import Counter
+
+class SingleFlight:
+    """Coalesces concurrent calls for the same (upstream, key) into one in-flight task"""
+
+    def __init__(self):
+        self._inflight = {}
+        self.calls = Counter()
+        self.coalesced = Counter()
+
+    def start(self, upstream, key, func, *args):
+        """Return the in-flight task for the key, starting func(*args) if there is none"""
+        flight_key = (upstream, key)
+        self.calls[upstream] += 1
+        task = self._inflight.get(flight_key)
+        if task is not None:
+            self.coalesced[upstream] += 1
+            return task
+        task = asyncio.get_running_loop().create_task(func(*args))
+        self._inflight[flight_key] = task
+        task.add_done_callback(lambda done: self._finish(flight_key, done))
+        return task
+
+    async def do(self, upstream, key, func, *args):
+        """Await the shared result; cancelling one waiter never cancels the shared request"""
+        return await asyncio.shield(self.start(upstream, key, func, *args))
+
+    def _finish(self, flight_key, task):
+        if self._inflight.get(flight_key) is task:
+            del self._inflight[flight_key]
+        # Mark the exception as retrieved in case every waiter was cancelled
+        if not task.cancelled():
+            task.exception()
+
+    def stats(self):
+        """Per-upstream call and coalesced counts for admin/metrics output"""
+        return {
+            upstream: {"calls": self.calls[upstream], "coalesced": self.coalesced[upstream]}
+            for upstream in sorted(self.calls)
+        }
+
+flights = SingleFlight()
@@ -0,0 +1,71 @@
+import os
+import asyncio
+import sqlite3
+import threading
+
+DATA_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "data")
+
+class StoreClosed(RuntimeError):
+    """Raised by a store used after close()"""
+
+class SQLiteStore:
+    """Base for the SQLite-backed stores: one WAL-mode connection used from to_thread workers
+
+    Subclasses set SCHEMA and keep their queries as module-level functions taking the
+    connection, which _call runs off the event loop.
+    """
+
+    SCHEMA = ""
+
+    def __init__(self, path):
+        self.path = path
+        self._conn = None
+        # One connection shared by the to_thread workers, so access is serialized
+        self._db_lock = threading.Lock()
+        self._open_lock = asyncio.Lock()
+        self._closed = False
+
+    @property
+    def is_open(self):
+        return self._conn is not None
+
+    def _connect(self):
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        conn = sqlite3.connect(self.path, check_same_thread=False, isolation_level=None)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.executescript(self.SCHEMA)
+        return conn
+
+    def _run(self, func, *args):
+        with self._db_lock:
+            if self._conn is None:
+                raise StoreClosed(f"{self.path} is closed")
+            return func(self._conn, *args)
+
+    def _close_connection(self):
+        # Under the lock, so a call already running in another worker finishes first
+        with self._db_lock:
+            conn, self._conn = self._conn, None
+            if conn is not None:
+                conn.close()
+
+    async def _call(self, func, *args):
+        """Run a database function off the event loop, opening the database on first use"""
+        if self._conn is None:
+            # A late background caller must not reopen the database during shutdown
+            if self._closed:
+                raise StoreClosed(f"{self.path} is closed")
+            await self.open()
+        return await asyncio.to_thread(self._run, func, *args)
+
+    async def open(self):
+        async with self._open_lock:
+            self._closed = False
+            if self._conn is None:
+                self._conn = await asyncio.to_thread(self._connect)
+
+    async def close(self):
+        self._closed = True
+        if self._conn is not None:
+            await asyncio.to_thread(self._close_connection)
@@ -2,15 +2,12 @@ import discord
 from discord.ext import commands
 from discord import app_commands
 import os
-from dotenv import load_dotenv
 from utils import log_command, log_error, log_info
 
-load_dotenv()
-
 # Load suggestion channel from environment variable
 SUGGESTION_CHANNEL = os.environ["SUGGESTIONS"]
 
-def setup(bot):
+async def setup(bot):
     @bot.tree.command(name="suggest", description="Send a suggestion to the Admins.")
     @app_commands.describe(suggestion="Your suggestion to send")
     async def suggest(interaction: discord.Interaction, suggestion: str):
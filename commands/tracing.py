@@ -0,0 +1,134 @@
+import os
+import json
+import time
+import random
+import asyncio
+import contextvars
+from contextlib import contextmanager
+from utils import log_error
+
+# Fraction of interactions traced (0 disables tracing, 1 traces everything)
+TRACE_SAMPLE = float(os.environ.get("TRACE_SAMPLE", "0"))
+
+# Where trace files go, and how many of the newest ones are kept
+TRACE_DIR = os.environ.get("TRACE_DIR", os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "logs", "traces"))
+TRACE_KEEP = int(os.environ.get("TRACE_KEEP", "200"))
+
+# The span the current task is inside, or None when the interaction is not being traced
+_current = contextvars.ContextVar("trace_span", default=None)
+
+class Trace:
+    """Spans recorded for one interaction, written out as a Chrome trace event file"""
+
+    def __init__(self, command, interaction_id):
+        self.command = command
+        self.interaction_id = interaction_id
+        # Chrome traces use microsecond timestamps; wall clock start keeps separate files comparable
+        self.origin = time.perf_counter()
+        self.wall_start = time.time() * 1_000_000
+        self.events = []
+        self.threads = {}
+        self.closed = False
+
+    def thread_for(self, name):
+        """Each asyncio task gets its own row so concurrent spans do not overlap in the viewer"""
+        task = asyncio.current_task()
+        tid = self.threads.get(task)
+        if tid is None:
+            tid = self.threads[task] = len(self.threads) + 1
+            self.events.append({
+                "name": "thread_name", "ph": "M", "pid": 1, "tid": tid,
+                "args": {"name": name if tid > 1 else f"{self.command} {self.interaction_id}"}
+            })
+        return tid
+
+    def timestamp(self, at):
+        return self.wall_start + (at - self.origin) * 1_000_000
+
+    def to_json(self):
+        return {
+            "traceEvents": self.events,
+            "displayTimeUnit": "ms",
+            "otherData": {"command": self.command, "interaction": str(self.interaction_id)}
+        }
+
+class Span:
+    """One timed step; extra args (status codes, cache hits) can be attached while it runs"""
+
+    def __init__(self, trace, name, args):
+        self.trace = trace
+        self.name = name
+        self.args = args
+        self.tid = trace.thread_for(name)
+        self.started = time.perf_counter()
+
+    def set(self, **args):
+        self.args.update(args)
+
+    def finish(self):
+        # Work left running after the interaction finished (e.g. background refreshes) is dropped
+        if self.trace.closed:
+            return
+        ended = time.perf_counter()
+        self.trace.events.append({
+            "name": self.name,
+            "cat": self.trace.command,
+            "ph": "X",
+            "ts": round(self.trace.timestamp(self.started), 1),
+            "dur": round((ended - self.started) * 1_000_000, 1),
+            "pid": 1,
+            "tid": self.tid,
+            "args": {"interaction": str(self.trace.interaction_id), **self.args}
+        })
+
+@contextmanager
+def span(name, **args):
+    """Time a step as a child of the current span; does nothing when the interaction is not traced"""
+    parent = _current.get()
+    if parent is None or parent.trace.closed:
+        yield None
+        return
+    current = Span(parent.trace, name, args)
+    token = _current.set(current)
+    try:
+        yield current
+    except BaseException as e:
+        current.set(error=type(e).__name__)
+        raise
+    finally:
+        _current.reset(token)
+        current.finish()
+
+@contextmanager
+def trace_interaction(command, interaction_id):
+    """Root span for one command invocation, sampled at TRACE_SAMPLE and saved when it ends"""
+    if TRACE_SAMPLE <= 0 or random.random() >= TRACE_SAMPLE or _current.get() is not None:
+        yield None
+        return
+    trace = Trace(command, interaction_id)
+    root = Span(trace, command, {})
+    token = _current.set(root)
+    try:
+        yield root
+    except BaseException as e:
+        root.set(error=type(e).__name__)
+        raise
+    finally:
+        _current.reset(token)
+        root.finish()
+        trace.closed = True
+        asyncio.get_running_loop().run_in_executor(None, write_trace, trace)
+
+def write_trace(trace):
+    """Save a trace as <command>-<interaction id>.json and prune the oldest files past TRACE_KEEP"""
+    try:
+        os.makedirs(TRACE_DIR, exist_ok=True)
+        path = os.path.join(TRACE_DIR, f"{trace.command.replace(' ', '_')}-{trace.interaction_id}.json")
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(trace.to_json(), f)
+        files = sorted((entry for entry in os.scandir(TRACE_DIR) if entry.name.endswith(".json")),
+                       key=lambda entry: entry.stat().st_mtime)
+        for entry in files[:max(0, len(files) - TRACE_KEEP)]:
+            os.remove(entry.path)
+    except OSError as e:
+        log_error("Trace Write", "System", trace.command, str(e))
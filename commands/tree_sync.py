@@ -0,0 +1,70 @@
+import os
+import json
+import hashlib
+import discord
+from sqlitedb import DATA_DIR
+from utils import log_error, log_info
+
+# Hashes of the last command tree pushed to Discord, per application and scope
+COMMAND_SYNC_STATE = os.environ.get("COMMAND_SYNC_STATE", os.path.join(DATA_DIR, "command_sync.json"))
+
+# Comma-separated guild IDs; when set, commands are synced to these guilds (instant) instead of globally
+DEV_GUILD_IDS = [int(guild_id) for guild_id in os.environ.get("DEV_GUILD_IDS", "").split(",") if guild_id.strip()]
+
+# Set to 1 to push the tree even if its hash has not changed
+FORCE_COMMAND_SYNC = os.environ.get("FORCE_COMMAND_SYNC", "0") == "1"
+
+def tree_hash(tree, guild=None):
+    """Stable hash of the command payloads Discord would receive for a scope"""
+    payload = sorted(
+        (command.to_dict(tree) for command in tree.get_commands(guild=guild)),
+        key=lambda command: (command.get("type", 1), command["name"])
+    )
+    encoded = json.dumps(payload, sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.sha256(encoded.encode("utf-8")).hexdigest()
+
+def load_sync_state(path=COMMAND_SYNC_STATE):
+    try:
+        with open(path, "r") as file:
+            return json.load(file)
+    except FileNotFoundError:
+        return {}
+    except (OSError, json.JSONDecodeError) as e:
+        log_error("Command Sync", "System", "load_sync_state", f"Ignoring unreadable {path}: {e}")
+        return {}
+
+def save_sync_state(state, path=COMMAND_SYNC_STATE):
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    temp_path = f"{path}.tmp"
+    with open(temp_path, "w") as file:
+        json.dump(state, file, indent=2, sort_keys=True)
+    os.replace(temp_path, path)
+
+async def sync_commands(bot, guild_ids=DEV_GUILD_IDS, force=FORCE_COMMAND_SYNC):
+    """Push the command tree to Discord only for scopes whose hash changed since the last sync"""
+    state = load_sync_state()
+    scopes = [discord.Object(id=guild_id) for guild_id in guild_ids] or [None]
+    synced = 0
+    for guild in scopes:
+        if guild is not None:
+            bot.tree.copy_global_to(guild=guild)
+        scope = "global" if guild is None else f"guild:{guild.id}"
+        key = f"{bot.application_id}:{scope}"
+        digest = tree_hash(bot.tree, guild)
+        if not force and state.get(key) == digest:
+            log_info("Command Sync", "System", "sync_commands", f"{scope} unchanged, skipping sync")
+            continue
+        try:
+            commands = await bot.tree.sync(guild=guild)
+        except discord.HTTPException as e:
+            log_error("Command Sync", "System", "sync_commands", f"{scope}: {e}")
+            continue
+        state[key] = digest
+        synced += 1
+        log_info("Command Sync", "System", "sync_commands", f"Synced {len(commands)} commands to {scope}")
+    if synced:
+        try:
+            save_sync_state(state)
+        except OSError as e:
+            log_error("Command Sync", "System", "save_sync_state", str(e))
+    return synced
@@ -0,0 +1,56 @@
+import os
+from utils import log_error
+from http_client import upstream_request, URCHIN_API_URL
+from health import UPSTREAM_ERRORS
+from singleflight import flights
+from cache import TTLCache, MISSING
+from tracing import span
+
+# API Keys
+URCHIN_API_KEY = os.environ["URCHIN_KEY"]
+
+# Urchin tag lookups by lowercase username; only successful responses are cached
+URCHIN_CACHE_SIZE = int(os.environ.get("URCHIN_CACHE_SIZE", "5000"))
+URCHIN_CACHE_TTL = float(os.environ.get("URCHIN_CACHE_TTL", "600"))
+
+urchin_cache = TTLCache("urchin", URCHIN_CACHE_SIZE, URCHIN_CACHE_TTL, persistent=True)
+
+async def _fetch_urchin_data(username, api_key):
+    urchin_url = f"{URCHIN_API_URL}/player/{username}?api_key={api_key}"
+    try:
+        async with upstream_request("urchin", "GET", urchin_url) as response:
+            if response.status == 404:
+                return {}
+            if response.status != 200:
+                return None
+            data = await response.json()
+    except UPSTREAM_ERRORS as e:
+        log_error("Urchin API Error", username, "fetch_urchin_data", str(e))
+        return None
+    if data.get("detail") == "Invalid API key":
+        log_error("Urchin API Error", username, "fetch_urchin_data", "Invalid API key")
+        return None
+    return data
+
+async def fetch_urchin_data(username, api_key=URCHIN_API_KEY):
+    """Fetch Urchin tags for a username; None if Urchin could not be reached"""
+    key = username.lower()
+    with span("urchin tags", username=username) as step:
+        data = await urchin_cache.lookup(key)
+        if data is not MISSING:
+            if step is not None:
+                step.set(cache="hit")
+            return data
+        data = await flights.do("urchin", key, _fetch_urchin_data, username, api_key)
+    if isinstance(data, dict):
+        urchin_cache.set(key, data)
+    return data
+
+def format_urchin_tags(urchin_data):
+    """Turn an Urchin response into the tag text shown in embeds"""
+    if urchin_data is None:
+        return "Urchin unavailable"
+    if "tags" in urchin_data and len(urchin_data["tags"]) > 0:
+        tags = [tag.get("type", "").title() for tag in urchin_data["tags"] if tag.get("type")]
+        return ", ".join(tags) if tags else "None"
+    return "None"
@@ -1,13 +1,137 @@
+import os
+import sys
+import json
+import queue
+import atexit
+import random
+import logging
 from datetime import datetime
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
+
+# Minimum level written (DEBUG, INFO, COMMAND, WARNING, ERROR)
+LOG_LEVEL = os.environ.get("LOG_LEVEL", "INFO").upper()
+
+# JSON lines log file with size-based rotation; set LOG_DIR empty to disable
+LOG_DIR = os.environ.get("LOG_DIR", os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "logs"))
+LOG_MAX_BYTES = int(os.environ.get("LOG_MAX_BYTES", str(10 * 1024 * 1024)))
+LOG_BACKUPS = int(os.environ.get("LOG_BACKUPS", "5"))
+# File name inside LOG_DIR; cluster.py gives the launcher and every bot process their own,
+# since rotation is not safe with several processes writing one file
+LOG_FILE = os.environ.get("LOG_FILE", "acm.jsonl")
+
+# Keep this fraction of INFO events (commands and errors are always kept)
+LOG_INFO_SAMPLE = float(os.environ.get("LOG_INFO_SAMPLE", "1"))
+
+# Console output in the original text format, and the max events waiting for the writer thread
+LOG_STDOUT = os.environ.get("LOG_STDOUT", "1") != "0"
+LOG_QUEUE_SIZE = int(os.environ.get("LOG_QUEUE_SIZE", "10000"))
+
+COMMAND = 25
+logging.addLevelName(COMMAND, "COMMAND")
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per line"""
+
+    def format(self, record):
+        return json.dumps({
+            "ts": datetime.fromtimestamp(record.created).isoformat(timespec="milliseconds"),
+            "level": record.levelname,
+            "event": record.event,
+            "user": str(record.user),
+            "command": record.command,
+            "details": str(record.details)
+        }, ensure_ascii=False)
+
+class TextFormatter(logging.Formatter):
+    """The bot's original "[timestamp] [LEVEL] ..." console lines"""
+
+    def format(self, record):
+        timestamp = datetime.fromtimestamp(record.created).strftime("%Y-%m-%d %H:%M:%S")
+        if record.levelno == COMMAND:
+            return f"[{timestamp}] [COMMAND] {record.command} | User: {record.user} | Details: {record.details}"
+        return (f"[{timestamp}] [{record.levelname}] {record.event} | User: {record.user} | "
+                f"Command: {record.command} | Details: {record.details}")
+
+class InfoSampler(logging.Filter):
+    """Drops a share of INFO events before they are queued"""
+
+    def __init__(self, rate):
+        super().__init__()
+        self.rate = rate
+
+    def filter(self, record):
+        return record.levelno != logging.INFO or self.rate >= 1 or random.random() < self.rate
+
+class DroppingQueueHandler(QueueHandler):
+    """Hands records to the writer thread as-is; drops them rather than block when the queue is full"""
+
+    def __init__(self, log_queue):
+        super().__init__(log_queue)
+        self.dropped = 0
+
+    def prepare(self, record):
+        # Formatting happens on the writer thread
+        return record
+
+    def enqueue(self, record):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+logger = logging.getLogger("acm")
+logger.setLevel(LOG_LEVEL)
+logger.propagate = False
+
+_queue_handler = DroppingQueueHandler(queue.Queue(LOG_QUEUE_SIZE))
+_queue_handler.addFilter(InfoSampler(LOG_INFO_SAMPLE))
+logger.addHandler(_queue_handler)
+
+def _create_handlers():
+    handlers = []
+    if LOG_STDOUT:
+        console = logging.StreamHandler(sys.stdout)
+        console.setFormatter(TextFormatter())
+        handlers.append(console)
+    if LOG_DIR:
+        os.makedirs(LOG_DIR, exist_ok=True)
+        log_file = RotatingFileHandler(os.path.join(LOG_DIR, LOG_FILE), maxBytes=LOG_MAX_BYTES,
+                                       backupCount=LOG_BACKUPS, encoding="utf-8")
+        log_file.setFormatter(JsonFormatter())
+        handlers.append(log_file)
+    return handlers
+
+_handlers = _create_handlers()
+_listener = QueueListener(_queue_handler.queue, *_handlers, respect_handler_level=True)
+_listener.start()
+
+def shutdown_logging():
+    """Write out everything still queued and close the log files"""
+    global _listener
+    if _listener is None:
+        return
+    _listener.stop()
+    _listener = None
+    for handler in _handlers:
+        handler.flush()
+        handler.close()
+
+atexit.register(shutdown_logging)
+
+# Called as hook(error_type, user, command) for every log_error, e.g. to count command failures
+error_hooks = []
+
+def _log(level, event, user, command, details):
+    if logger.isEnabledFor(level):
+        logger.log(level, event, extra={"event": event, "user": user, "command": command, "details": details})
 
 def log_command(user, command, details=None):
-    timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-    print(f"[{timestamp}] [COMMAND] {command} | User: {user} | Details: {details}")
+    _log(COMMAND, command, user, command, details)
 
 def log_error(error_type, user, command, error_details):
-    timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-    print(f"[{timestamp}] [ERROR] {error_type} | User: {user} | Command: {command} | Details: {error_details}")
+    for hook in error_hooks:
+        hook(error_type, user, command)
+    _log(logging.ERROR, error_type, user, command, error_details)
 
 def log_info(info_type, user, command, info_details):
-    timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-    print(f"[{timestamp}] [INFO] {info_type} | User: {user} | Command: {command} | Details: {info_details}") 
\ No newline at end of file
+    _log(logging.INFO, info_type, user, command, info_details)